@@ -1,31 +1,77 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 import os
 from dotenv import load_dotenv
+from app.utils.metrics import MongoCommandTimer
 
 load_dotenv()
 
+DATABASE_NAME = "voiceinvoice_db"
+
+def _pool_options() -> dict:
+    """Connection pool settings shared by the sync and async clients"""
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", 0)),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", 60000)),
+        "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 10000)),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+    }
+
 class DatabaseManager:
+    """Creates clients on first use, never at import.
+
+    MongoClient is not fork-safe, so a client is only reused in the process
+    that created it; a worker forked from a parent that already connected
+    gets its own client instead of sharing the parent's sockets.
+    """
     _instance = None
     _client = None
     _database = None
-    
+    _async_client = None
+    _async_database = None
+    _async_pid = None
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
         return cls._instance
-    
-    def connect(self):
+
+    def connect(self) -> Database:
+        """Blocking client for scripts such as init_mongodb.py"""
         if self._client is None:
             mongodb_url = os.getenv("MONGODB_URL")
-            self._client = MongoClient(mongodb_url)
-            self._database = self._client.voiceinvoice_db
+            self._client = MongoClient(mongodb_url, **_pool_options())
+            self._database = self._client[DATABASE_NAME]
         return self._database
-    
+
+    def connect_async(self) -> AsyncDatabase:
+        """Non-blocking client used by the API services, one per process"""
+        if self._async_pid != os.getpid():
+            # Inherited across fork: drop it without closing the parent's connections
+            self._async_client = None
+            self._async_database = None
+        if self._async_client is None:
+            mongodb_url = os.getenv("MONGODB_URL")
+            self._async_client = AsyncMongoClient(
+                mongodb_url, event_listeners=[MongoCommandTimer()], **_pool_options()
+            )
+            self._async_database = self._async_client[DATABASE_NAME]
+            self._async_pid = os.getpid()
+        return self._async_database
+
     def close(self):
         if self._client:
             self._client.close()
+            self._client = None
+            self._database = None
+
+    async def close_async(self):
+        if self._async_client:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_database = None
 
-# Global database instance
+# Clients are created by the app lifespan (or a script) when first needed
 db_manager = DatabaseManager()
-database = db_manager.connect()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Query Plan Diagnostics for VoiceInvoice
+Runs explain() on every query shape the services issue and fails if any
+of them would scan a whole collection.
+
+Usage: python -m app.database.diagnostics [--ensure-indexes]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Iterator, List
+from app.database.connection import db_manager
+from app.database.indexes import QUERY_SHAPES, ensure_indexes
+
+def _plan_stages(plan: dict) -> Iterator[str]:
+    """Yield every stage name in an explain plan tree"""
+    if "queryPlan" in plan:
+        plan = plan["queryPlan"]
+    if "stage" in plan:
+        yield plan["stage"]
+    for child_key in ("inputStage", "outerStage", "innerStage"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+def explain_shape(database, shape: dict) -> List[str]:
+    """Stages of the winning plan for one query shape"""
+    cursor = database[shape["collection"]].find(shape["filter"])
+    if "sort" in shape:
+        cursor = cursor.sort(shape["sort"])
+    explanation = cursor.explain()
+    return list(_plan_stages(explanation["queryPlanner"]["winningPlan"]))
+
+def check_query_plans(database) -> bool:
+    """Print each shape's plan; False if any shape does a COLLSCAN"""
+    all_indexed = True
+    for shape in QUERY_SHAPES:
+        stages = explain_shape(database, shape)
+        if "COLLSCAN" in stages:
+            all_indexed = False
+            print(f"❌ {shape['name']} ({shape['collection']}): COLLSCAN [{' -> '.join(stages)}]")
+        else:
+            print(f"✅ {shape['name']} ({shape['collection']}): {' -> '.join(stages)}")
+    return all_indexed
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if any service query shape does a collection scan")
+    parser.add_argument("--ensure-indexes", action="store_true",
+                        help="create the service indexes before checking plans")
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        async def bootstrap():
+            await ensure_indexes(db_manager.connect_async())
+            await db_manager.close_async()
+        asyncio.run(bootstrap())
+
+    print("🔍 Checking query plans...")
+    try:
+        ok = check_query_plans(db_manager.connect())
+    finally:
+        db_manager.close()
+
+    if not ok:
+        print("\n❌ Some queries are not covered by an index")
+        sys.exit(1)
+    print("\n🎉 All service queries use an index")
+
+if __name__ == "__main__":
+    main()
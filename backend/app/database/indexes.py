@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Every index the services rely on, per collection
+INDEX_SPECS = {
+    "users": [
+        {"keys": [("email", ASCENDING)], "unique": True},
+        {"keys": [("created_at", ASCENDING)]},
+        # UserCacheInvalidator polling when change streams are unavailable
+        {"keys": [("updated_at", ASCENDING)]},
+    ],
+    # otp_codes holds one record per (email, purpose); expiry is left to the TTL monitor
+    "otp_codes": [
+        {"keys": [("email", ASCENDING), ("purpose", ASCENDING)], "unique": True},
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    "email_outbox": [
+        {"keys": [("status", ASCENDING), ("next_attempt_at", ASCENDING)]},
+        # Undelivered codes are useless once the OTP expires
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    # Token buckets are looked up by _id; idle ones are full again once expired
+    "rate_limits": [
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    # Outstanding refresh tokens by jti (_id); revoke_all deletes by email
+    "refresh_tokens": [
+        {"keys": [("email", ASCENDING)]},
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    # One per InvoiceService.SORT_KEYS entry, so every list page is an index range
+    "invoices": [
+        {"keys": [("user_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("user_id", ASCENDING), ("total", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("user_id", ASCENDING), ("client_lower", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("user_id", ASCENDING), ("status", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)]},
+    ],
+}
+
+# Query shapes issued by the services, checked by app.database.diagnostics.
+# Values are placeholders; only the shape matters to the query planner.
+_SAMPLE_EMAIL = "shape@example.com"
+QUERY_SHAPES = [
+    {"name": "UserService.get_user", "collection": "users",
+     "filter": {"email": _SAMPLE_EMAIL}},
+    {"name": "UserCacheInvalidator._poll", "collection": "users",
+     "filter": {"updated_at": {"$gt": datetime(2000, 1, 1)}},
+     "sort": [("updated_at", ASCENDING)]},
+    {"name": "OTPStore.save (upsert)", "collection": "otp_codes",
+     "filter": {"email": _SAMPLE_EMAIL, "purpose": "login"}},
+    {"name": "OTPStore.verify", "collection": "otp_codes",
+     "filter": {"email": _SAMPLE_EMAIL, "purpose": "login", "is_used": False,
+                "expires_at": {"$gt": datetime(2000, 1, 1)},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}}},
+    {"name": "OTPStore.delete_expired", "collection": "otp_codes",
+     "filter": {"expires_at": {"$lt": datetime(2000, 1, 1)}}},
+    {"name": "EmailOutbox._claim", "collection": "email_outbox",
+     "filter": {"$or": [
+         {"status": "pending", "next_attempt_at": {"$lte": datetime(2000, 1, 1)}},
+         {"status": "sending", "locked_until": {"$lt": datetime(2000, 1, 1)}}
+     ]},
+     "sort": [("next_attempt_at", ASCENDING)]},
+    {"name": "EmailOutbox.stats", "collection": "email_outbox",
+     "filter": {"status": {"$in": ["pending", "sending"]}}},
+    {"name": "RefreshTokenStore.revoke_all", "collection": "refresh_tokens",
+     "filter": {"email": _SAMPLE_EMAIL}},
+    {"name": "InvoiceService.get_invoice", "collection": "invoices",
+     "filter": {"_id": ObjectId("0" * 24), "user_id": _SAMPLE_EMAIL}},
+    {"name": "InvoiceService.list_invoices (date)", "collection": "invoices",
+     "filter": {"user_id": _SAMPLE_EMAIL, "date": {"$gte": "2000-01-01", "$lte": "2000-12-31"}},
+     "sort": [("date", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "InvoiceService.list_invoices (status)", "collection": "invoices",
+     "filter": {"user_id": _SAMPLE_EMAIL, "status": {"$in": ["sent", "overdue"]}},
+     "sort": [("date", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "InvoiceService.list_invoices (client)", "collection": "invoices",
+     "filter": {"user_id": _SAMPLE_EMAIL, "client_lower": {"$regex": "^acme"}},
+     "sort": [("client_lower", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "InvoiceService.list_invoices (amount)", "collection": "invoices",
+     "filter": {"user_id": _SAMPLE_EMAIL, "total": {"$gte": 100.0, "$lte": 1000.0}},
+     "sort": [("total", DESCENDING), ("_id", DESCENDING)]},
+]
+
+async def _ensure_ttl(database, collection_name: str, field: str, expire_after_seconds: int):
+    """Make sure the index on field is a TTL index with this expiry, converting it in place"""
+    async for index in await database[collection_name].list_indexes():
+        if dict(index["key"]) == {field: ASCENDING} and index.get("expireAfterSeconds") != expire_after_seconds:
+            await database.command(
+                "collMod", collection_name,
+                index={"keyPattern": {field: ASCENDING}, "expireAfterSeconds": expire_after_seconds}
+            )
+            logger.info("Converted %s.%s index to TTL", collection_name, field)
+            return
+
+async def _replace_conflicting(database, collection_name: str, spec: dict, options: dict):
+    """Drop an index on the same keys with other options and create the one the services need.
+
+    Fails startup when that is not possible (for example duplicates blocking a
+    unique index), since the services rely on these options for correctness.
+    """
+    collection = database[collection_name]
+    keys = dict(spec["keys"])
+    async for index in await collection.list_indexes():
+        if dict(index["key"]) == keys:
+            logger.warning("Replacing index %s on %s with %s", index["name"], collection_name, options)
+            await collection.drop_index(index["name"])
+            break
+    try:
+        await collection.create_index(spec["keys"], **options)
+    except OperationFailure as e:
+        raise RuntimeError(f"Index {spec['keys']} on {collection_name} could not be created: {e}") from e
+
+async def _create_indexes(database, collection_name: str, specs: list):
+    collection = database[collection_name]
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k != "keys"}
+        try:
+            await collection.create_index(spec["keys"], **options)
+        except OperationFailure:
+            if "expireAfterSeconds" in options:
+                await _ensure_ttl(database, collection_name, spec["keys"][0][0], options["expireAfterSeconds"])
+            else:
+                # An older index with different options (e.g. the non-unique email_1_purpose_1)
+                await _replace_conflicting(database, collection_name, spec, options)
+
+async def ensure_indexes(database):
+    """Create or verify every service index (idempotent, safe on every startup)"""
+    for collection_name, specs in INDEX_SPECS.items():
+        await _create_indexes(database, collection_name, specs)
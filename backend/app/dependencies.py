@@ -0,0 +1,58 @@
+from fastapi import Request
+from app.services.email_outbox import EmailOutbox
+from app.services.email_service import EmailService
+from app.services.invoice_service import InvoiceService
+from app.services.otp_service import OTPService
+from app.services.otp_store import create_otp_store
+from app.services.rate_limiter import RateLimiter, create_rate_limit_backend
+from app.services.refresh_tokens import RefreshTokenStore
+from app.services.user_service import UserService
+
+class Services:
+    """Database-backed services of one worker, built by the lifespan after fork"""
+
+    def __init__(self, database):
+        self.database = database
+        self.email_service = EmailService()
+        self.email_outbox = EmailOutbox(self.email_service, database.email_outbox)
+        self.otp_service = OTPService(create_otp_store(database=database))
+        self.rate_limiter = RateLimiter(create_rate_limit_backend(database=database))
+        self.user_service = UserService(database)
+        self.refresh_tokens = RefreshTokenStore(database.refresh_tokens)
+        self.invoice_service = InvoiceService(database)
+
+    async def start(self):
+        await self.email_outbox.start()
+        await self.user_service.cache_invalidator.start()
+
+    async def close(self):
+        await self.email_outbox.stop()
+        await self.user_service.cache_invalidator.stop()
+        await self.otp_service.store.close()
+        await self.rate_limiter.backend.close()
+        await self.email_service.close()
+
+# Getters are async so FastAPI calls them inline instead of on the threadpool
+async def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+async def get_user_service(request: Request) -> UserService:
+    return request.app.state.services.user_service
+
+async def get_refresh_tokens(request: Request) -> RefreshTokenStore:
+    return request.app.state.services.refresh_tokens
+
+async def get_invoice_service(request: Request) -> InvoiceService:
+    return request.app.state.services.invoice_service
+
+async def get_otp_service(request: Request) -> OTPService:
+    return request.app.state.services.otp_service
+
+async def get_email_outbox(request: Request) -> EmailOutbox:
+    return request.app.state.services.email_outbox
+
+def rate_limit(endpoint: str):
+    """Dependency applying the worker's rate limiter to one endpoint"""
+    async def dependency(request: Request):
+        await request.app.state.services.rate_limiter.check(endpoint, request)
+    return dependency
@@ -0,0 +1,128 @@
+"""Production entry point: python -m app.launcher [--workers N]
+
+Runs N uvicorn worker processes (WEB_CONCURRENCY, default 1; "auto" means
+one per usable CPU) behind a supervisor that shares one listening socket. Each worker imports the app
+and connects to MongoDB in its own lifespan.
+
+Some state is still per process: transcription jobs (polled by id), the
+memory rate limiter and the memory OTP store. More than one worker is
+refused while any of them is in use, since a request landing on another
+worker would see a 404, a wrong limit or an unknown code.
+
+Signals sent to the supervisor:
+  SIGTERM / SIGINT  stop accepting, let in-flight requests finish for up to
+                    GRACEFUL_TIMEOUT_SECONDS, run shutdown, exit
+  SIGHUP            rolling restart, one worker at a time, so the others
+                    keep serving (picks up new code and .env values)
+  SIGTTIN / SIGTTOU add or remove one worker
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+from typing import List, Optional
+
+import uvicorn
+from dotenv import load_dotenv
+from uvicorn.supervisors import Multiprocess
+from app.utils.log import setup_logging
+
+logger = logging.getLogger(__name__)
+
+def usable_cpus() -> int:
+    """CPUs this process may run on (respects affinity and container cpusets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def parse_workers(value: str) -> int:
+    """A worker count, or "auto" for one worker per usable CPU"""
+    if value.strip().lower() == "auto":
+        return usable_cpus()
+    return int(value)
+
+def default_workers() -> int:
+    return parse_workers(os.getenv("WEB_CONCURRENCY", "1"))
+
+def multi_worker_problems() -> List[str]:
+    """Settings that keep state in one process and so break with several workers"""
+    problems = []
+    if int(os.getenv("STT_WORKERS", 2)) > 0:
+        problems.append("STT_WORKERS>0: transcription jobs live in the worker that accepted them")
+    if os.getenv("RATE_LIMIT_STORE", "memory").lower() == "memory":
+        problems.append("RATE_LIMIT_STORE=memory: each worker would allow the full limit")
+    if os.getenv("OTP_STORE", "mongo").lower() == "memory":
+        problems.append("OTP_STORE=memory: codes are only known to the worker that issued them")
+    return problems
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+def server_options(workers: Optional[int] = None) -> dict:
+    """uvicorn.Config keyword arguments from the environment"""
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", 8000)),
+        "workers": max(1, workers or default_workers()),
+        # uvloop and httptools are C implementations; fall back when not installed
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "lifespan": "on",
+        "backlog": int(os.getenv("BACKLOG", 2048)),
+        # Longer than a typical load balancer idle timeout (60s) avoids 502s from reused connections
+        "timeout_keep_alive": int(os.getenv("KEEP_ALIVE_SECONDS", 75)),
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", 30)),
+        # Per worker; excess connections get 503 instead of queueing without bound
+        "limit_concurrency": _optional_int("LIMIT_CONCURRENCY"),
+        # Recycle a worker after this many requests (0 or unset: never)
+        "limit_max_requests": _optional_int("MAX_REQUESTS_PER_WORKER") or None,
+        "access_log": os.getenv("ACCESS_LOG", "false").lower() == "true",
+        # The rate limiter reads X-Forwarded-For itself (RATE_LIMIT_TRUST_PROXY)
+        "proxy_headers": False,
+        # Logging is configured by setup_logging() in every process
+        "log_config": None,
+    }
+
+def run(app: str = "app.main:app", workers: Optional[int] = None, host: Optional[str] = None,
+        port: Optional[int] = None):
+    """Start the supervisor and block until it exits"""
+    options = server_options(workers)
+    if host is not None:
+        options["host"] = host
+    if port is not None:
+        options["port"] = port
+
+    if options["workers"] > 1:
+        problems = multi_worker_problems()
+        if problems:
+            raise SystemExit(f"Refusing to start {options['workers']} workers: " + "; ".join(problems)
+                             + ". Use one worker or shared stores (RATE_LIMIT_STORE=mongo|redis, STT_WORKERS=0).")
+
+    config = uvicorn.Config(app, **options)
+    server = uvicorn.Server(config)
+    logger.info("Starting %s: %d worker(s) on %s:%d, loop=%s, http=%s",
+                app, config.workers, config.host, config.port, options["loop"], options["http"])
+    # Supervise even a single worker so SIGHUP reloads and a crashed worker is replaced
+    sock = config.bind_socket()
+    try:
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    finally:
+        sock.close()
+
+def main():
+    load_dotenv()
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Run the VoiceInvoice API with several worker processes")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app as module:attribute")
+    parser.add_argument("--workers", type=parse_workers,
+                        help="worker processes or auto for one per CPU (default: WEB_CONCURRENCY or 1)")
+    parser.add_argument("--host", help="bind address (default: HOST or 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="bind port (default: PORT or 8000)")
+    args = parser.parse_args()
+    run(args.app, args.workers, args.host, args.port)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,76 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.database.connection import db_manager
+from app.database.indexes import ensure_indexes
+from app.dependencies import Services
+from app.utils.log import RequestContextMiddleware, setup_logging
+from app.utils.metrics import Counter, Gauge, MetricsMiddleware, registry
+from app.utils.password_hasher import password_hasher
+from app.utils.responses import APIResponse
 from app.routes.otp import router as otp_router
 from app.routes.auth import router as auth_router
+from app.routes.invoices import router as invoices_router, invoice_exporter
+from app.utils.security import check_secret_key, token_cache
+from app.routes.transcription import router as transcription_router, transcription_service, transcription_pool
+from app.routes.health import router as health_router, health_monitor
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tokens signed with a known key could be forged by anyone
+    check_secret_key()
+    # Runs in each worker after any fork, so every worker owns its client.
+    # Tests and benchmarks may set app.state.database beforehand instead.
+    owns_database = not hasattr(app.state, "database")
+    if owns_database:
+        app.state.database = db_manager.connect_async()
+    services = app.state.services = Services(app.state.database)
+    # Lookups and TTL expiry depend on these; without them queries scan collections
+    await ensure_indexes(app.state.database)
+    sweep_interval = float(os.getenv("OTP_SWEEP_INTERVAL_SECONDS", 0))
+    sweeper = (asyncio.create_task(services.otp_service.run_sweeper(sweep_interval))
+               if sweep_interval > 0 else None)
+    await services.start()
+    try:
+        await transcription_service.load()
+    except Exception as e:
+        logger.warning("Speech engine not loaded, transcription unavailable: %s", e)
+    try:
+        await transcription_pool.start()
+    except Exception as e:
+        logger.warning("Transcription workers not started: %s", e)
+    await health_monitor.start()
+    yield
+    await health_monitor.stop()
+    if sweeper:
+        sweeper.cancel()
+        await asyncio.gather(sweeper, return_exceptions=True)
+    await services.close()
+    del app.state.services
+    if owns_database:
+        # Release pooled MongoDB connections on shutdown
+        del app.state.database
+        await db_manager.close_async()
+    password_hasher.shutdown()
+    transcription_service.shutdown()
+    await transcription_pool.stop()
+    invoice_exporter.shutdown()
 
 app = FastAPI(
     title="VoiceInvoice API",
     description="Backend API for VoiceInvoice OTP Authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=APIResponse
 )
 
 # CORS configuration
@@ -21,19 +81,74 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+# Added last so it wraps everything, including CORS preflights
+app.add_middleware(RequestContextMiddleware)
+
+def _from_services(read):
+    """Scrape-time reader for a counter on the worker's services (0 before startup)"""
+    return lambda: read(app.state.services) if hasattr(app.state, "services") else 0
+
+# Service counters that already exist, read when /metrics is scraped
+registry.register(Gauge("bcrypt_queue_depth", "Hash jobs waiting for a hashing thread",
+                        callback=lambda: password_hasher.queue_depth))
+registry.register(Counter("user_cache_hits_total", "User profile cache hits",
+                          callback=_from_services(lambda services: services.user_service.cache.hits)))
+registry.register(Counter("user_cache_misses_total", "User profile cache misses",
+                          callback=_from_services(lambda services: services.user_service.cache.misses)))
+registry.register(Counter("token_cache_hits_total", "Access tokens served from the decoded-token cache",
+                          callback=lambda: token_cache.hits))
+registry.register(Counter("token_cache_misses_total", "Access tokens whose signature had to be checked",
+                          callback=lambda: token_cache.misses))
+registry.register(Counter("otp_rate_limit_rejections_total", "OTP requests rejected by the rate limiter",
+                          callback=_from_services(lambda services: services.rate_limiter.rejected_count)))
 
 # Include routers
 app.include_router(otp_router)
 app.include_router(auth_router)
+app.include_router(invoices_router)
+app.include_router(transcription_router)
+app.include_router(health_router)
+
+SATURATION_RATIO = float(os.getenv("HEALTH_SATURATION_RATIO", 0.9))
+
+async def _ping_mongo():
+    await app.state.database.client.admin.command("ping")
+
+async def _probe_smtp():
+    email_service = app.state.services.email_service
+    if not email_service.username or not email_service.password:
+        return "not configured (demo mode)"
+    await email_service.pool.probe(health_monitor.timeout_seconds)
+
+def _check_pools():
+    problems = []
+    if password_hasher.queue_depth >= password_hasher.max_pending * SATURATION_RATIO:
+        problems.append(f"bcrypt queue {password_hasher.queue_depth}/{password_hasher.max_pending}")
+    stats = transcription_pool.stats()
+    if stats["workers"] > 0 and stats["queued"] >= stats["max_pending"] * SATURATION_RATIO:
+        problems.append(f"transcription queue {stats['queued']}/{stats['max_pending']}")
+    return ", ".join(problems) or None
+
+health_monitor.add_probe("mongo", _ping_mongo)
+health_monitor.add_probe("smtp", _probe_smtp)
+health_monitor.add_check("pools", _check_pools)
 
 @app.get("/")
 async def root():
     return {"message": "VoiceInvoice API is running!", "version": "1.0.0"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
+    """Kept for existing load balancer configs; see /health/live and /health/ready"""
     return {"status": "healthy", "service": "voiceinvoice-api"}
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Same as python -m app.launcher; use uvicorn app.main:app --reload for development
+    from app.launcher import main
+    main()
@@ -3,11 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 import os
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import secrets
 import string
 from dotenv import load_dotenv
+from app.services.email_templates import OTPEmailRenderer
 
 load_dotenv()
 
@@ -28,6 +27,12 @@ def generate_otp() -> str:
     """Generate 6-digit OTP"""
     return ''.join(secrets.choice(string.digits) for _ in range(6))
 
+# OTP email templates are compiled once at import
+otp_email_renderer = OTPEmailRenderer(
+    os.getenv("FROM_NAME", "VoiceInvoice Team"),
+    os.getenv("FROM_EMAIL", os.getenv("SMTP_USERNAME"))
+)
+
 def send_real_email(to_email: str, otp_code: str, purpose: str) -> bool:
     """Send real email using Gmail SMTP"""
     try:
@@ -37,76 +42,20 @@ def send_real_email(to_email: str, otp_code: str, purpose: str) -> bool:
         username = os.getenv("SMTP_USERNAME")
         password = os.getenv("SMTP_PASSWORD")
         from_email = os.getenv("FROM_EMAIL", username)
-        from_name = os.getenv("FROM_NAME", "VoiceInvoice Team")
         
         # Check if email is configured
         if not username or not password or "your-" in str(username):
             print("⚠️  Email not configured - using demo mode")
             return True  # Return True for demo mode
         
-        # Create email content
-        subject = f"Your VoiceInvoice Verification Code - {otp_code}"
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>VoiceInvoice Verification Code</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; background-color: #f8fafc; margin: 0; padding: 0;">
-            <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 8px; overflow: hidden; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
-                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 40px 20px; text-align: center;">
-                    <h1 style="color: white; margin: 0; font-size: 28px;">🎙️ VoiceInvoice</h1>
-                    <p style="color: rgba(255, 255, 255, 0.9); margin: 10px 0 0 0;">Voice to Invoice Conversion</p>
-                </div>
-                
-                <div style="padding: 40px 20px;">
-                    <h2 style="color: #1f2937; margin: 0 0 20px 0;">Verification Code</h2>
-                    <p style="color: #6b7280; margin: 0 0 30px 0;">
-                        Your verification code to {purpose} VoiceInvoice is:
-                    </p>
-                    
-                    <div style="background-color: #f3f4f6; border-radius: 8px; padding: 20px; text-align: center; margin: 30px 0;">
-                        <div style="font-size: 36px; font-weight: bold; color: #667eea; letter-spacing: 8px;">
-                            {otp_code}
-                        </div>
-                    </div>
-                    
-                    <p style="color: #ef4444; margin: 20px 0; font-size: 14px;">
-                        ⚠️ This code will expire in 5 minutes for security.
-                    </p>
-                    
-                    <p style="color: #6b7280; margin: 20px 0; font-size: 14px;">
-                        If you didn't request this code, please ignore this email.
-                    </p>
-                </div>
-                
-                <div style="background-color: #f8fafc; padding: 20px; text-align: center; border-top: 1px solid #e5e7eb;">
-                    <p style="color: #9ca3af; margin: 0; font-size: 12px;">
-                        © 2025 VoiceInvoice. All rights reserved.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = f"{from_name} <{from_email}>"
-        message["To"] = to_email
-        
-        # Add HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
+        # Render from the cached message skeleton
+        message = otp_email_renderer.render(to_email, otp_code, purpose)
         
         # Send email
         with smtplib.SMTP(smtp_server, smtp_port) as server:
             server.starttls()
             server.login(username, password)
-            server.send_message(message)
+            server.sendmail(from_email, [to_email], message)
         
         print(f"✅ Real email sent successfully to {to_email}")
         return True
@@ -0,0 +1,101 @@
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic.alias_generators import to_camel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+InvoiceStatus = Literal["draft", "sent", "paid", "overdue", "cancelled"]
+
+class CamelModel(BaseModel):
+    """Accepts and returns the camelCase field names used by the frontend"""
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+class InvoiceItem(CamelModel):
+    description: str
+    quantity: float
+    rate: float
+    amount: Optional[float] = None
+
+class InvoiceCreate(CamelModel):
+    invoice_number: str
+    date: str
+    due_date: str
+    client: str
+    items: List[InvoiceItem]
+    status: InvoiceStatus = "draft"
+    paid_date: Optional[str] = None
+    notes: Optional[str] = None
+    tax_rate: Optional[float] = None
+    discount_amount: Optional[float] = None
+    discount_percentage: Optional[float] = None
+    client_email: Optional[EmailStr] = None
+    client_address: Optional[str] = None
+    client_phone: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    company_email: Optional[EmailStr] = None
+    company_phone: Optional[str] = None
+    logo_url: Optional[str] = None
+
+class InvoiceUpdate(CamelModel):
+    invoice_number: Optional[str] = None
+    date: Optional[str] = None
+    due_date: Optional[str] = None
+    client: Optional[str] = None
+    items: Optional[List[InvoiceItem]] = None
+    status: Optional[InvoiceStatus] = None
+    paid_date: Optional[str] = None
+    notes: Optional[str] = None
+    tax_rate: Optional[float] = None
+    discount_amount: Optional[float] = None
+    discount_percentage: Optional[float] = None
+    client_email: Optional[EmailStr] = None
+    client_address: Optional[str] = None
+    client_phone: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    company_email: Optional[EmailStr] = None
+    company_phone: Optional[str] = None
+    logo_url: Optional[str] = None
+
+class Invoice(InvoiceCreate):
+    id: str
+    user_id: str
+    subtotal: float
+    tax_amount: Optional[float] = None
+    total: float
+    created_at: datetime
+    updated_at: datetime
+
+class InvoiceSummary(CamelModel):
+    """Fields returned by list queries (projection only)"""
+    id: str
+    invoice_number: str
+    date: str
+    due_date: str
+    client: str
+    client_email: Optional[str] = None
+    status: InvoiceStatus
+    total: float
+    created_at: datetime
+
+class InvoiceListResponse(CamelModel):
+    invoices: List[InvoiceSummary]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    limit: int
+    total: Optional[int] = None
+
+class TranscriptParseRequest(BaseModel):
+    transcripts: List[str] = Field(..., min_length=1, max_length=1000)
+
+class ParsedInvoice(CamelModel):
+    """Structured result of parsing one dictated invoice"""
+    invoice_number: Optional[str] = None
+    date: Optional[str] = None
+    client: Optional[str] = None
+    items: List[InvoiceItem]
+    subtotal: float
+    total: float
+    stated_total: Optional[float] = None
+    errors: List[str]
+    unparsed: List[str]
@@ -20,3 +20,6 @@ class UserResponse(BaseModel):
     email: EmailStr
     is_verified: bool
     created_at: datetime
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
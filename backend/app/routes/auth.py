@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from app.models.user import UserCreate, UserLogin, UserResponse
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from app.dependencies import get_refresh_tokens, get_user_service
+from app.models.user import TokenRefresh, UserCreate, UserLogin, UserResponse
+from app.services.refresh_tokens import RefreshTokenStore
 from app.services.user_service import UserService
-from app.services.otp_service import OTPService
+from app.utils.auth import current_user_id
+from app.utils.password_hasher import HashQueueFull
+from app.utils.responses import respond
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
-user_service = UserService()
-otp_service = OTPService()
 
 @router.post("/register")
-async def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate, user_service: UserService = Depends(get_user_service)):
     """Register a new user"""
     try:
         result = await user_service.create_user(user_data)
@@ -23,12 +28,18 @@ async def register_user(user_data: UserCreate):
         }
     except HTTPException:
         raise
+    except HashQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
     except Exception as e:
-        print(f"Error in register_user: {str(e)}")
+        logger.exception("Error in register_user")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login")
-async def login_user(user_data: UserLogin):
+async def login_user(
+    user_data: UserLogin,
+    user_service: UserService = Depends(get_user_service),
+    refresh_tokens: RefreshTokenStore = Depends(get_refresh_tokens)
+):
     """Authenticate user login"""
     try:
         result = await user_service.authenticate_user(user_data)
@@ -36,19 +47,58 @@ async def login_user(user_data: UserLogin):
         if not result["success"]:
             raise HTTPException(status_code=401, detail=result["message"])
         
-        return {
+        return respond({
             "success": True,
             "message": result["message"],
-            "user": result["user"]
+            "user": result["user"],
+            **await refresh_tokens.issue(result["user"]["email"])
+        })
+    except HTTPException:
+        raise
+    except HashQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    except Exception as e:
+        logger.exception("Error in login_user")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/refresh")
+async def refresh_tokens(
+    request: TokenRefresh,
+    user_service: UserService = Depends(get_user_service),
+    refresh_tokens: RefreshTokenStore = Depends(get_refresh_tokens)
+):
+    """Exchange a refresh token for a new token pair; the old refresh token stops working"""
+    try:
+        email = await refresh_tokens.redeem(request.refresh_token)
+        if not email:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+        # One lookup per refresh (not per request) so deleted accounts stop renewing
+        user = await user_service.get_user(email)
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+        return {
+            "success": True,
+            "message": "Tokens refreshed",
+            **await refresh_tokens.issue(email)
         }
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in login_user: {str(e)}")
+        logger.exception("Error in refresh_tokens")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/logout")
+async def logout_user(request: TokenRefresh, refresh_tokens: RefreshTokenStore = Depends(get_refresh_tokens)):
+    """Revoke a refresh token; access tokens stay valid until they expire"""
+    try:
+        await refresh_tokens.revoke(request.refresh_token)
+    except Exception as e:
+        logger.exception("Error in logout_user")
         raise HTTPException(status_code=500, detail=str(e))
+    return {"success": True, "message": "Logged out"}
 
 @router.post("/verify/{email}")
-async def verify_user_email(email: str):
+async def verify_user_email(email: str, user_service: UserService = Depends(get_user_service)):
     """Mark user email as verified"""
     try:
         result = await user_service.verify_user(email)
@@ -63,25 +113,27 @@ async def verify_user_email(email: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in verify_user_email: {str(e)}")
+        logger.exception("Error in verify_user_email")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{email}", response_model=UserResponse)
-async def get_user(email: str):
+async def get_user(
+    email: str,
+    user_id: str = Depends(current_user_id),
+    user_service: UserService = Depends(get_user_service)
+):
     """Get user information"""
+    if email.lower() != user_id.lower():
+        raise HTTPException(status_code=403, detail="Not allowed to read another user")
     try:
         user = await user_service.get_user(email)
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        return UserResponse(
-            email=user["email"],
-            is_verified=user["is_verified"],
-            created_at=user["created_at"]
-        )
+        return respond(user, UserResponse)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_user: {str(e)}")
+        logger.exception("Error in get_user")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.health import HealthMonitor
+
+router = APIRouter(prefix="/health", tags=["Health"])
+health_monitor = HealthMonitor()
+
+@router.get("/live")
+async def liveness():
+    """The process is up and its event loop is answering"""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """Cached dependency probes; 503 takes this worker out of the load balancer"""
+    report = health_monitor.readiness()
+    return JSONResponse(report, status_code=200 if report["status"] == "ready" else 503)
@@ -0,0 +1,179 @@
+import logging
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.models.invoice import (
+    Invoice, InvoiceCreate, InvoiceListResponse, InvoiceUpdate, ParsedInvoice, TranscriptParseRequest
+)
+from app.dependencies import get_invoice_service
+from app.services.invoice_parser import parse_transcripts
+from app.services.invoice_export import InvoiceExporter
+from app.services.invoice_pdf import InvoicePDFRenderer
+from app.services.invoice_service import InvalidCursor, InvoiceService
+from app.utils.auth import current_user_id
+from app.utils.responses import model_body, respond
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/invoices", tags=["Invoices"])
+pdf_renderer = InvoicePDFRenderer()
+invoice_exporter = InvoiceExporter(pdf_renderer)
+
+@router.post("", response_model_by_alias=True)
+async def create_invoice(
+    invoice_data: InvoiceCreate,
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Create a new invoice"""
+    try:
+        result = await invoice_service.create_invoice(user_id, invoice_data)
+        return respond({
+            "success": True,
+            "invoice": model_body(Invoice, result["invoice"])
+        })
+    except Exception as e:
+        logger.exception("Error in create_invoice")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/parse")
+async def parse_invoice_transcripts(request: TranscriptParseRequest, user_id: str = Depends(current_user_id)):
+    """Parse dictated invoice transcripts into line items, checking the arithmetic"""
+    parsed = parse_transcripts(request.transcripts)
+    return {
+        "success": True,
+        "invoices": [ParsedInvoice(**result).model_dump(by_alias=True) for result in parsed]
+    }
+
+@router.get("", response_model=InvoiceListResponse)
+async def list_invoices(
+    status: Optional[List[str]] = Query(None),
+    date_from: Optional[str] = Query(None, alias="dateFrom"),
+    date_to: Optional[str] = Query(None, alias="dateTo"),
+    client_name: Optional[str] = Query(None, alias="clientName"),
+    min_amount: Optional[float] = Query(None, alias="minAmount"),
+    max_amount: Optional[float] = Query(None, alias="maxAmount"),
+    sort_by: Literal["date", "amount", "client", "status"] = Query("date", alias="sortBy"),
+    sort_order: Literal["asc", "desc"] = Query("desc", alias="sortOrder"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(False, alias="includeTotal"),
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """List invoice summaries, one keyset page at a time"""
+    try:
+        query = invoice_service.build_filter(
+            user_id, status=status, date_from=date_from, date_to=date_to,
+            client_name=client_name, min_amount=min_amount, max_amount=max_amount
+        )
+        page = await invoice_service.list_invoices(
+            query, sort_by=sort_by, sort_order=sort_order,
+            limit=limit, cursor=cursor, include_total=include_total
+        )
+        return respond(page, InvoiceListResponse)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in list_invoices")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_invoices(
+    status: Optional[List[str]] = Query(None),
+    date_from: Optional[str] = Query(None, alias="dateFrom"),
+    date_to: Optional[str] = Query(None, alias="dateTo"),
+    client_name: Optional[str] = Query(None, alias="clientName"),
+    min_amount: Optional[float] = Query(None, alias="minAmount"),
+    max_amount: Optional[float] = Query(None, alias="maxAmount"),
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """ZIP of PDFs for every invoice matching the filters, streamed as they render"""
+    query = invoice_service.build_filter(
+        user_id, status=status, date_from=date_from, date_to=date_to,
+        client_name=client_name, min_amount=min_amount, max_amount=max_amount
+    )
+    return StreamingResponse(
+        invoice_exporter.stream_zip(invoice_service.iter_invoices(query)),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="invoices.zip"'}
+    )
+
+@router.get("/{invoice_id}")
+async def get_invoice(
+    invoice_id: str,
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Get invoice by ID"""
+    try:
+        invoice = await invoice_service.get_invoice(user_id, invoice_id)
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return respond({"success": True, "invoice": model_body(Invoice, invoice)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in get_invoice")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{invoice_id}/pdf")
+async def download_invoice_pdf(
+    invoice_id: str,
+    request: Request,
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Invoice as a PDF; unchanged invoices are served from cache or revalidated by ETag"""
+    invoice = await invoice_service.get_invoice(user_id, invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+
+    content_hash = pdf_renderer.content_hash(invoice)
+    etag = f'"{content_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    filename = "".join(c for c in invoice["invoice_number"] if c.isalnum() or c in "-_") or invoice_id
+    headers["Content-Disposition"] = f'attachment; filename="invoice-{filename}.pdf"'
+    return StreamingResponse(
+        pdf_renderer.stream(invoice, content_hash), media_type="application/pdf", headers=headers
+    )
+
+@router.put("/{invoice_id}")
+async def update_invoice(
+    invoice_id: str,
+    updates: InvoiceUpdate,
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Update an existing invoice"""
+    try:
+        invoice = await invoice_service.update_invoice(user_id, invoice_id, updates)
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return respond({"success": True, "invoice": model_body(Invoice, invoice)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in update_invoice")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/{invoice_id}")
+async def delete_invoice(
+    invoice_id: str,
+    user_id: str = Depends(current_user_id),
+    invoice_service: InvoiceService = Depends(get_invoice_service)
+):
+    """Delete an invoice"""
+    try:
+        if not await invoice_service.delete_invoice(user_id, invoice_id):
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return {"success": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in delete_invoice")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,40 +1,46 @@
-from fastapi import APIRouter, HTTPException
+import logging
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from app.dependencies import get_email_outbox, get_otp_service, rate_limit
 from app.models.otp import OTPRequest, OTPVerification, OTPResponse
 from app.services.otp_service import OTPService
-from app.services.email_service import EmailService
+from app.services.email_outbox import EmailOutbox
+from app.utils.auth import current_user_id
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
-otp_service = OTPService()
-email_service = EmailService()
 
-@router.post("/send-otp", response_model=OTPResponse)
-async def send_otp(request: OTPRequest):
+@router.post("/send-otp", response_model=OTPResponse, dependencies=[Depends(rate_limit("send-otp"))])
+async def send_otp(
+    request: OTPRequest,
+    otp_service: OTPService = Depends(get_otp_service),
+    email_outbox: EmailOutbox = Depends(get_email_outbox)
+):
     """Send OTP to email address"""
     try:
         # Generate OTP
         otp_code = await otp_service.create_otp(request.email, request.purpose)
         
-        # Send email
-        email_sent = email_service.send_otp_email(
+        # Queue email; outbox workers handle delivery and retries
+        await email_outbox.enqueue(
             to_email=request.email,
             otp_code=otp_code,
-            purpose=request.purpose
+            purpose=request.purpose,
+            expires_at=datetime.utcnow() + timedelta(minutes=otp_service.expiry_minutes)
         )
         
-        if not email_sent:
-            raise HTTPException(status_code=500, detail="Failed to send email")
-        
         return OTPResponse(
             success=True,
             message="OTP sent successfully",
             email=request.email
         )
     except Exception as e:
-        print(f"Error in send_otp: {str(e)}")
+        logger.exception("Error in send_otp")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/verify-otp", response_model=OTPResponse)
-async def verify_otp(request: OTPVerification):
+@router.post("/verify-otp", response_model=OTPResponse, dependencies=[Depends(rate_limit("verify-otp"))])
+async def verify_otp(request: OTPVerification, otp_service: OTPService = Depends(get_otp_service)):
     """Verify OTP code"""
     try:
         result = await otp_service.verify_otp(
@@ -54,5 +60,10 @@ async def verify_otp(request: OTPVerification):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in verify_otp: {str(e)}")
+        logger.exception("Error in verify_otp")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/outbox/stats", dependencies=[Depends(current_user_id)])
+async def outbox_stats(email_outbox: EmailOutbox = Depends(get_email_outbox)):
+    """Email outbox queue depth, send latency and retry counts"""
+    return await email_outbox.stats()
@@ -0,0 +1,148 @@
+import asyncio
+import io
+import json
+import logging
+import wave
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from app.services.speech_engine import BYTES_PER_SAMPLE, DEFAULT_SAMPLE_RATE
+from app.services.transcription_pool import TranscriptionPool, TranscriptionQueueFull
+from app.services.transcription_service import TranscriptionService
+from app.utils.auth import current_user_id, websocket_user_id
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/transcriptions", tags=["Transcription"])
+transcription_service = TranscriptionService()
+transcription_pool = TranscriptionPool()
+
+def _read_wav(body: bytes):
+    """PCM frames and sample rate from a 16-bit mono WAV file"""
+    try:
+        with wave.open(io.BytesIO(body)) as wav:
+            if wav.getsampwidth() != BYTES_PER_SAMPLE or wav.getnchannels() != 1:
+                raise HTTPException(status_code=415, detail="WAV audio must be 16-bit mono")
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+    except (wave.Error, EOFError):
+        raise HTTPException(status_code=400, detail="Invalid WAV file")
+
+def _job_response(job: dict) -> dict:
+    response = {
+        "id": job["id"],
+        "status": job["status"],
+        "text": job["text"],
+        "error": job["error"],
+        "audioSeconds": job["audio_seconds"],
+    }
+    if job["started_at"]:
+        response["queuedMs"] = round((job["started_at"] - job["created_at"]) * 1000, 1)
+    if job["completed_at"]:
+        response["processingMs"] = round((job["completed_at"] - job["started_at"]) * 1000, 1)
+    return response
+
+@router.post("", status_code=202)
+async def create_transcription(request: Request,
+                               sample_rate: int = Query(DEFAULT_SAMPLE_RATE, alias="sampleRate", ge=8000, le=48000),
+                               user_id: str = Depends(current_user_id)):
+    """Queue a recorded clip (WAV or raw 16-bit mono PCM) for transcription"""
+    max_bytes = int(transcription_service.max_seconds * 48000) * BYTES_PER_SAMPLE + 44
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail="Recording is too long")
+
+    pcm = bytes(body)
+    if pcm[:4] == b"RIFF":
+        pcm, sample_rate = _read_wav(pcm)
+    if not pcm or len(pcm) % BYTES_PER_SAMPLE:
+        raise HTTPException(status_code=400, detail="Expected 16-bit PCM audio")
+    if len(pcm) > int(transcription_service.max_seconds * sample_rate) * BYTES_PER_SAMPLE:
+        raise HTTPException(status_code=413, detail="Recording is too long")
+
+    try:
+        job = transcription_pool.submit(pcm, sample_rate, owner=user_id)
+    except TranscriptionQueueFull:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Transcription service is busy, please retry shortly"},
+            headers={"Retry-After": "2"}
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content={"success": True, **_job_response(job)},
+        headers={"Location": f"{router.prefix}/{job['id']}"}
+    )
+
+@router.get("/{job_id}")
+async def get_transcription(job_id: str, user_id: str = Depends(current_user_id)):
+    """Status of a transcription job, with the text once it has completed"""
+    job = transcription_pool.get_job(job_id, owner=user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Transcription not found")
+    return _job_response(job)
+
+def _is_stop(text: str) -> bool:
+    try:
+        return json.loads(text).get("type") == "stop"
+    except (ValueError, AttributeError):
+        return text.strip() == "stop"
+
+@router.websocket("/stream")
+async def stream_transcription(websocket: WebSocket,
+                               sample_rate: int = Query(DEFAULT_SAMPLE_RATE, alias="sampleRate", ge=8000, le=48000),
+                               user_id: str = Depends(websocket_user_id)):
+    """Transcribe audio while it is being recorded.
+
+    Send 16-bit mono PCM as binary frames, then {"type": "stop"}. The server
+    replies with {"type": "partial"} events as audio is decoded and one
+    {"type": "final"} event, then closes. Pass the access token as ?token=
+    (browsers cannot set headers on WebSockets); without a valid one the
+    connection is closed with code 1008.
+    """
+    await websocket.accept()
+    try:
+        session = transcription_service.open_session(sample_rate)
+    except Exception:
+        logger.exception("Could not start transcription")
+        await websocket.send_json({"type": "error", "message": "Transcription unavailable"})
+        await websocket.close(code=1011)
+        return
+
+    disconnected = False
+
+    async def receive_audio():
+        nonlocal disconnected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    if not await session.feed(message["bytes"]):
+                        break
+                elif message.get("text") and _is_stop(message["text"]):
+                    break
+        finally:
+            await session.end()
+
+    receiver = asyncio.create_task(receive_audio())
+    try:
+        async for event in session.results():
+            if disconnected:
+                break
+            await websocket.send_json(event)
+        if not disconnected:
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("Transcription failed")
+        if not disconnected:
+            await websocket.send_json({"type": "error", "message": "Transcription failed"})
+            await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
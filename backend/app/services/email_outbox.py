@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ASCENDING, ReturnDocument
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+class EmailOutbox:
+    """Durable queue of OTP emails stored in the email_outbox collection.
+
+    send-otp only inserts a job; worker tasks claim due jobs in batches,
+    deliver them over the pooled SMTP transport and reschedule failures
+    with exponential backoff.
+    """
+
+    def __init__(self, email_service: EmailService, outbox_collection):
+        self.outbox_collection = outbox_collection
+        self.email_service = email_service
+        self.worker_count = int(os.getenv("OUTBOX_WORKERS", 2))
+        self.batch_size = int(os.getenv("OUTBOX_BATCH_SIZE", 10))
+        self.max_attempts = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+        self.base_backoff_seconds = float(os.getenv("OUTBOX_BACKOFF_SECONDS", 2))
+        self.max_backoff_seconds = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", 300))
+        self.poll_interval_seconds = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", 1))
+        self.lease_seconds = int(os.getenv("OUTBOX_LEASE_SECONDS", 60))
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        # Counters since process start
+        self.sent_count = 0
+        self.failed_count = 0
+        self.retry_count = 0
+        self.expired_count = 0
+        self.send_seconds_total = 0.0
+        self.send_seconds_max = 0.0
+
+    async def enqueue(self, to_email: str, otp_code: str, purpose: str, expires_at: datetime) -> str:
+        """Persist an OTP email job and wake a worker"""
+        now = datetime.utcnow()
+        result = await self.outbox_collection.insert_one({
+            "to_email": to_email,
+            "otp_code": otp_code,
+            "purpose": purpose,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "expires_at": expires_at,
+            "created_at": now
+        })
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return str(result.inserted_id)
+
+    async def start(self):
+        """Start worker tasks (indexes come from app.database.indexes)"""
+        if self._running:
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"email-outbox-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        """Stop workers; claimed jobs are picked up again after their lease"""
+        self._running = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.outbox_collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    # Jobs held by a worker that died mid-send
+                    {"status": "sending", "locked_until": {"$lt": now}}
+                ]
+            },
+            {"$set": {"status": "sending", "locked_until": now + timedelta(seconds=self.lease_seconds)}},
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _claim_batch(self) -> List[dict]:
+        batch = []
+        while len(batch) < self.batch_size:
+            job = await self._claim()
+            if job is None:
+                break
+            batch.append(job)
+        return batch
+
+    async def _worker_loop(self):
+        while self._running:
+            try:
+                batch = await self._claim_batch()
+                if not batch:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                # Concurrency is bounded by the SMTP connection pool
+                await asyncio.gather(*[self._deliver(job) for job in batch])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox worker error")
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    def _backoff_seconds(self, attempts: int) -> float:
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _deliver(self, job: dict):
+        if datetime.utcnow() > job["expires_at"]:
+            self.expired_count += 1
+            await self.outbox_collection.delete_one({"_id": job["_id"]})
+            return
+
+        started = time.perf_counter()
+        sent = await self.email_service.send_otp_email(
+            to_email=job["to_email"],
+            otp_code=job["otp_code"],
+            purpose=job["purpose"]
+        )
+        elapsed = time.perf_counter() - started
+        self.send_seconds_total += elapsed
+        self.send_seconds_max = max(self.send_seconds_max, elapsed)
+
+        if sent:
+            self.sent_count += 1
+            await self.outbox_collection.delete_one({"_id": job["_id"]})
+            return
+
+        attempts = job["attempts"] + 1
+        if attempts >= self.max_attempts:
+            self.failed_count += 1
+            await self.outbox_collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": "failed", "attempts": attempts}, "$unset": {"locked_until": ""}}
+            )
+            return
+
+        self.retry_count += 1
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=self._backoff_seconds(attempts))
+        await self.outbox_collection.update_one(
+            {"_id": job["_id"]},
+            {
+                "$set": {"status": "pending", "attempts": attempts, "next_attempt_at": next_attempt_at},
+                "$unset": {"locked_until": ""}
+            }
+        )
+
+    async def stats(self) -> dict:
+        """Queue depth, delivery counters and send latency"""
+        pending = await self.outbox_collection.count_documents({"status": {"$in": ["pending", "sending"]}})
+        failed = await self.outbox_collection.count_documents({"status": "failed"})
+        send_attempts = self.sent_count + self.failed_count + self.retry_count
+        return {
+            "queue_depth": pending,
+            "failed_jobs": failed,
+            "sent": self.sent_count,
+            "retries": self.retry_count,
+            "gave_up": self.failed_count,
+            "expired": self.expired_count,
+            "send_latency_avg_ms": round(self.send_seconds_total / send_attempts * 1000, 2) if send_attempts else 0.0,
+            "send_latency_max_ms": round(self.send_seconds_max * 1000, 2),
+            "workers": len(self._workers)
+        }
@@ -0,0 +1,136 @@
+import re
+import uuid
+from email import quoprimime
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+DEFAULT_LOCALE = "en"
+OTP_PURPOSES = ("login", "signup", "reset")
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class CompiledTemplate:
+    """Template text split once around its {{placeholders}}"""
+
+    def __init__(self, text: str):
+        parts = _PLACEHOLDER.split(text)
+        self.literals: List[str] = parts[0::2]
+        self.names: List[str] = parts[1::2]
+
+    def partial(self, **values) -> "CompiledTemplate":
+        """Fill some placeholders now and keep the rest for later"""
+        text = self.literals[0]
+        for name, literal in zip(self.names, self.literals[1:]):
+            text += (values[name] if name in values else "{{" + name + "}}") + literal
+        return CompiledTemplate(text)
+
+    def render(self, **values) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(values[name])
+            out.append(literal)
+        return "".join(out)
+
+class _EncodedPart:
+    """A MIME body pre-encoded as quoted-printable around its placeholders.
+
+    Each literal segment is encoded once, so a send only joins bytes with
+    the OTP digits (plain ASCII, valid QP as-is).
+    """
+
+    def __init__(self, template: CompiledTemplate):
+        self.literals = [_qp_encode(lit) for lit in template.literals]
+        self.names = template.names
+
+    def render(self, values: Dict[str, bytes]) -> bytes:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(values[name])
+            out.append(literal)
+        return b"".join(out)
+
+class OTPEmailSkeleton:
+    """Serialized multipart/alternative OTP message for one purpose and locale"""
+
+    def __init__(self, subject: CompiledTemplate, text: CompiledTemplate,
+                 html: CompiledTemplate, from_header: str):
+        boundary = f"==voiceinvoice-{uuid.uuid4().hex}=="
+        self.subject = subject
+        self.head = (
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n'
+            f"MIME-Version: 1.0\r\n"
+            f"From: {from_header}\r\n"
+        ).encode("ascii")
+        part_header = (
+            f"\r\n--{boundary}\r\n"
+            'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+        )
+        self.text_header = part_header.format(subtype="plain").encode("ascii")
+        self.html_header = part_header.format(subtype="html").encode("ascii")
+        self.tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+        self.text = _EncodedPart(text)
+        self.html = _EncodedPart(html)
+
+    def render(self, to_email: str, otp_code: str) -> bytes:
+        otp = otp_code.encode("ascii")
+        values = {"otp_code": otp}
+        subject = self.subject.render(otp_code=otp_code)
+        headers = (
+            f"Subject: {_encode_header(subject)}\r\n"
+            f"To: {_encode_header(to_email)}\r\n"
+            f"Date: {formatdate(localtime=False, usegmt=True)}\r\n"
+            f"Message-ID: {make_msgid(domain='voiceinvoice')}\r\n"
+        ).encode("ascii")
+        return b"".join((
+            self.head, headers,
+            self.text_header, self.text.render(values),
+            self.html_header, self.html.render(values),
+            self.tail
+        ))
+
+def _qp_encode(text: str) -> bytes:
+    # quoprimime works on one character per byte, like email.charset does
+    latin = text.encode("utf-8").decode("latin-1")
+    return quoprimime.body_encode(latin, eol="\r\n").encode("ascii")
+
+def _encode_header(value: str) -> str:
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+def _load_locale(locale_dir: Path) -> Tuple[CompiledTemplate, CompiledTemplate, CompiledTemplate]:
+    def load(name: str) -> CompiledTemplate:
+        return CompiledTemplate((locale_dir / name).read_text(encoding="utf-8"))
+    subject = CompiledTemplate((locale_dir / "otp_subject.txt").read_text(encoding="utf-8").strip())
+    return subject, load("otp.txt"), load("otp.html")
+
+class OTPEmailRenderer:
+    """Loads OTP templates once and caches a message skeleton per (purpose, locale)"""
+
+    def __init__(self, from_name: str, from_email: str, template_dir: Path = TEMPLATE_DIR):
+        self.from_email = from_email
+        self.from_header = _encode_header(formataddr((from_name, from_email or "")))
+        self._skeletons: Dict[Tuple[str, str], OTPEmailSkeleton] = {}
+        for locale_dir in sorted(p for p in template_dir.iterdir() if p.is_dir()):
+            subject, text, html = _load_locale(locale_dir)
+            for purpose in OTP_PURPOSES:
+                self._skeletons[(purpose, locale_dir.name)] = OTPEmailSkeleton(
+                    subject.partial(purpose=purpose),
+                    text.partial(purpose=purpose),
+                    html.partial(purpose=purpose),
+                    self.from_header
+                )
+
+    def _skeleton(self, purpose: str, locale: str) -> OTPEmailSkeleton:
+        skeleton = self._skeletons.get((purpose, locale)) or self._skeletons.get((purpose, DEFAULT_LOCALE))
+        if skeleton is None:
+            raise ValueError(f"No OTP email template for purpose '{purpose}'")
+        return skeleton
+
+    def render(self, to_email: str, otp_code: str, purpose: str, locale: str = DEFAULT_LOCALE) -> bytes:
+        """Serialized message ready for SMTP sendmail"""
+        return self._skeleton(purpose, locale).render(to_email, otp_code)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Runs dependency probes in the background and serves cached results.
+
+    Remote probes (Mongo ping, SMTP greeting) run every interval_seconds
+    regardless of how often readiness is asked for, so health checks never
+    add database or SMTP load. Local checks such as pool saturation are
+    cheap and evaluated on every call. A probe result older than three
+    intervals counts as a failure, in case the refresh loop itself stalls.
+    """
+
+    def __init__(self, interval_seconds: Optional[float] = None, timeout_seconds: Optional[float] = None,
+                 required: Optional[List[str]] = None):
+        self.interval_seconds = interval_seconds if interval_seconds is not None else float(
+            os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", 5))
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else float(
+            os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", 2))
+        if required is None:
+            required = [name.strip() for name in os.getenv("HEALTH_REQUIRED_CHECKS", "mongo,smtp,pools").split(",")]
+        self.required = set(filter(None, required))
+        self._probes: Dict[str, Callable[[], Awaitable[Optional[str]]]] = {}
+        self._checks: Dict[str, Callable[[], Optional[str]]] = {}
+        self._results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add_probe(self, name: str, probe: Callable[[], Awaitable[Optional[str]]]):
+        """Remote check; raises on failure, may return a detail string"""
+        self._probes[name] = probe
+
+    def add_check(self, name: str, check: Callable[[], Optional[str]]):
+        """Local check evaluated per request; returns a problem description or None"""
+        self._checks[name] = check
+
+    async def _run_probe(self, name: str, probe) -> dict:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(probe(), self.timeout_seconds)
+            ok = True
+        except asyncio.TimeoutError:
+            ok, detail = False, f"timed out after {self.timeout_seconds:g}s"
+        except Exception as e:
+            ok, detail = False, str(e) or type(e).__name__
+        result = {"ok": ok, "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                  "checked_at": time.time()}
+        if detail:
+            result["detail"] = detail
+        if not ok and self._results.get(name, {}).get("ok", True):
+            logger.warning("Health probe %s failing: %s", name, detail)
+        return result
+
+    async def refresh(self):
+        """Run every probe once, concurrently"""
+        names = list(self._probes)
+        results = await asyncio.gather(*[self._run_probe(name, self._probes[name]) for name in names])
+        self._results.update(zip(names, results))
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.refresh()
+
+    async def start(self):
+        if self._task is None:
+            await self.refresh()  # so readiness is accurate from the first request
+            self._task = asyncio.create_task(self._loop(), name="health-probes")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def readiness(self) -> dict:
+        """Cached probe results plus local checks; ready only if every required check passes"""
+        now = time.time()
+        checks = {}
+        for name in self._probes:
+            result = dict(self._results.get(name) or {"ok": False, "detail": "not probed yet"})
+            if "checked_at" in result:
+                age = now - result.pop("checked_at")
+                result["age_seconds"] = round(age, 1)
+                if age > self.interval_seconds * 3:
+                    result["ok"] = False
+                    result["detail"] = "probe result is stale"
+            checks[name] = result
+        for name, check in self._checks.items():
+            problem = check()
+            checks[name] = {"ok": problem is None, **({"detail": problem} if problem else {})}
+        ready = all(result["ok"] for name, result in checks.items() if name in self.required)
+        return {"status": "ready" if ready else "unavailable", "checks": checks}
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Set
+from starlette.concurrency import run_in_threadpool
+from app.services.invoice_pdf import InvoicePDFRenderer, render_invoice_pdf
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _load_template; never used in the API process
+_worker_renderer: Optional[InvoicePDFRenderer] = None
+
+def _load_template(logo_path: str, cache_dir: str):
+    global _worker_renderer
+    _worker_renderer = InvoicePDFRenderer(cache_dir=cache_dir, logo_path=logo_path)
+    _worker_renderer.template()
+
+def _render_pdf(invoice: dict) -> bytes:
+    return b"".join(render_invoice_pdf(invoice, _worker_renderer.template()))
+
+class _ZipSink:
+    """Write-only file object that hands the zip bytes written so far to the response"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+class InvoiceExporter:
+    """Streams a ZIP of invoice PDFs rendered on a process pool.
+
+    Invoices are read from a database cursor and at most max_in_flight
+    renders are outstanding at any time; each PDF is added to the archive
+    as soon as its render finishes and the archive bytes are yielded right
+    away, so memory depends on the pool size rather than the export size.
+    PDFs already in the renderer's cache are copied without rendering.
+
+    Cache reads and archive writes (which checksum every PDF) run on the
+    threadpool. If anything fails the archive is left unfinished and the
+    error propagates, so the server drops the connection and the client
+    sees a failed download rather than a short ZIP.
+    """
+
+    def __init__(self, renderer: InvoicePDFRenderer):
+        self.renderer = renderer
+        self.worker_count = int(os.getenv("EXPORT_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_in_flight = int(os.getenv("EXPORT_MAX_IN_FLIGHT", self.worker_count * 2))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Started on the first export; most processes never export anything
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.worker_count,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_template,
+                initargs=(self.renderer.logo_path, self.renderer.cache_dir)
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _cached_pdf(self, invoice: dict) -> Optional[bytes]:
+        path = self.renderer.cached_path(self.renderer.content_hash(invoice))
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None  # evicted in the meantime
+
+    @staticmethod
+    def _entry_name(invoice: dict, used: Set[str]) -> str:
+        number = re.sub(r"[^A-Za-z0-9_-]", "_", invoice["invoice_number"]) or invoice["id"]
+        name = f"invoice-{number}.pdf"
+        if name in used:
+            name = f"invoice-{number}-{invoice['id']}.pdf"
+        used.add(name)
+        return name
+
+    async def stream_zip(self, invoices: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+        """ZIP archive bytes, one PDF entry at a time in completion order"""
+        loop = asyncio.get_running_loop()
+        sink = _ZipSink()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        used_names: Set[str] = set()
+        in_flight = {}
+        source = invoices.__aiter__()
+        exhausted = False
+
+        def add(name: str, pdf: bytes):
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED  # PDF content streams are already compressed
+            archive.writestr(info, pdf)
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_in_flight:
+                    try:
+                        invoice = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    name = self._entry_name(invoice, used_names)
+                    cached = await run_in_threadpool(self._cached_pdf, invoice)
+                    if cached is not None:
+                        await run_in_threadpool(add, name, cached)
+                        yield sink.drain()
+                        continue
+                    future = loop.run_in_executor(self._pool(), _render_pdf, invoice)
+                    in_flight[future] = name
+
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    await run_in_threadpool(add, in_flight.pop(future), future.result())
+                yield sink.drain()
+
+            await run_in_threadpool(archive.close)
+            yield sink.drain()
+        except Exception:
+            logger.exception("Invoice export failed; aborting the download")
+            raise
+        finally:
+            # Client disconnected or a render failed: drop outstanding work
+            for future in in_flight:
+                future.cancel()
@@ -0,0 +1,169 @@
+import re
+from typing import Iterable, List, Optional
+
+# Everything is compiled once at import; parsing a transcript is a single
+# pass over its lines trying a handful of anchored patterns.
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "fifteen": 15, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "hundred": 100,
+}
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_QUANTITY = _NUMBER + "|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True))
+_MONEY = r"\$?\s*(?:" + _NUMBER + ")"
+
+_SENTENCE_BREAK_RE = re.compile(
+    r"\.(?<=[A-Za-z0-9%)]\.)(?<!\bDr\.)(?<!\bMr\.)(?<!\bMs\.)(?<!\bMrs\.)(?<!\bSt\.)(?<!\bNo\.)\s+(?=[A-Z$])"
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_FIELD_RE = re.compile(
+    r"^(?P<key>invoice\s*(?:#|no\.?|number)|invoice|date|client|bill(?:ed)? to|customer"
+    r"|total(?:\s+due)?|amount\s+due|grand\s+total|items?|line\s+items)(?!\w)\s*(?P<sep>[:#])?\s*(?P<value>.*?)\.?$",
+    re.IGNORECASE,
+)
+_SPOKEN_CLIENT_RE = re.compile(r"^invoice\s+(?:for|to)\s+(?P<client>.+?)\.?$", re.IGNORECASE)
+_RATE_ITEM_RE = re.compile(
+    r"^(?P<description>.+?)\s*[(,]?\s*(?:x(?=\d))?(?:(?<![\w.,])|(?<=\bx))(?P<quantity>" + _QUANTITY + r")\b\s*(?P<unit>[a-z]+)?\s*"
+    r"(?:@|at|x|×)\s*(?P<rate>" + _MONEY + r")\s*(?:/\s*[a-z]+|per\s+[a-z]+|each)?\s*\)?"
+    r"\s*(?:=\s*(?P<amount>" + _MONEY + r"))?\.?$",
+    re.IGNORECASE,
+)
+_FLAT_ITEM_RE = re.compile(
+    r"^(?P<description>.+?)\s*:?\s*(?:=\s*\$?|\$)\s*(?P<amount>" + _NUMBER + r")\.?$"
+)
+_MONEY_VALUE_RE = re.compile(_NUMBER)
+_TRAILING_CONNECTOR_RE = re.compile(r"\s+(?:at|for|of|is|costs?|comes to)$", re.IGNORECASE)
+
+def _number(text: str) -> float:
+    word = _NUMBER_WORDS.get(text.lower())
+    if word is not None:
+        return float(word)
+    return float(text.replace(",", ""))
+
+def _money(text: Optional[str]) -> Optional[float]:
+    if not text:
+        return None
+    match = _MONEY_VALUE_RE.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+def _lines(transcript: str) -> List[str]:
+    """Split into logical lines; spoken transcripts arrive as sentences"""
+    lines = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if line:
+            lines.extend(_SENTENCE_BREAK_RE.split(line))
+    return lines
+
+def _has_rate(line: str) -> bool:
+    """Cheap test for a quantity/rate separator before trying the rate pattern"""
+    lower = line.lower()
+    return "@" in line or " at " in lower or "x " in lower or " x" in lower or "×" in line
+
+def _parse_item(line: str) -> Optional[dict]:
+    match = _RATE_ITEM_RE.match(line) if _has_rate(line) else None
+    if match:
+        quantity = _number(match["quantity"])
+        rate = _money(match["rate"])
+        return {
+            "description": _TRAILING_CONNECTOR_RE.sub("", match["description"].strip(" -:(,")),
+            "quantity": quantity,
+            "rate": rate,
+            "amount": round(quantity * rate, 2),
+            "stated_amount": _money(match["amount"]),
+        }
+    match = _FLAT_ITEM_RE.match(line)
+    if match:
+        amount = _money(match["amount"])
+        return {
+            "description": _TRAILING_CONNECTOR_RE.sub("", match["description"].strip(" -:=")),
+            "quantity": 1.0,
+            "rate": amount,
+            "amount": amount,
+            "stated_amount": None,
+        }
+    return None
+
+def parse_transcript(transcript: str) -> dict:
+    """Turn a dictated invoice into structured fields and check its arithmetic.
+
+    Amounts are recomputed from quantity x rate; a stated line amount or
+    total that disagrees is reported in "errors" rather than trusted.
+    Lines that match nothing are returned in "unparsed".
+    """
+    result = {
+        "invoice_number": None,
+        "date": None,
+        "client": None,
+        "items": [],
+        "subtotal": 0.0,
+        "total": 0.0,
+        "stated_total": None,
+        "errors": [],
+        "unparsed": [],
+    }
+    items = result["items"]
+    errors = result["errors"]
+
+    def add_item(line: str, raw_line: str):
+        item = _parse_item(line)
+        if item is None:
+            result["unparsed"].append(raw_line)
+            return
+        stated = item.pop("stated_amount")
+        if stated is not None and abs(stated - item["amount"]) >= 0.005:
+            errors.append(
+                f"{item['description']}: {item['quantity']:g} x {item['rate']:.2f} = "
+                f"{item['amount']:.2f}, not {stated:.2f}"
+            )
+        items.append(item)
+
+    for raw_line in _lines(transcript):
+        line = _BULLET_RE.sub("", raw_line)
+        field = _FIELD_RE.match(line)
+        if field:
+            key = field["key"].lower()
+            value = field["value"].strip()
+            # Without a ":" a keyword may just start a line item ("Client onboarding ... = $200")
+            if (not field["sep"] and not key.startswith(("total", "amount", "grand"))
+                    and _parse_item(line) is not None):
+                add_item(line, raw_line)
+                continue
+            if key.startswith("item") or key == "line items":
+                # "Items: - Consulting (5 hours @ $100/hour) = $500" on one line
+                if value:
+                    add_item(_BULLET_RE.sub("", value), raw_line)
+            elif key == "invoice":
+                spoken = _SPOKEN_CLIENT_RE.match(line)
+                if spoken:
+                    result["client"] = spoken["client"].strip()
+                elif value:
+                    result["invoice_number"] = value
+            elif key.startswith("invoice"):
+                result["invoice_number"] = value
+            elif key == "date":
+                result["date"] = value
+            elif key.startswith(("client", "bill", "customer")):
+                result["client"] = value
+            else:
+                result["stated_total"] = _money(value)
+                if value and result["stated_total"] is None:
+                    result["unparsed"].append(raw_line)
+                    errors.append(f"Could not read stated total: {value}")
+            continue
+
+        add_item(line, raw_line)
+
+    subtotal = round(sum(item["amount"] for item in items), 2)
+    result["subtotal"] = subtotal
+    result["total"] = subtotal
+    stated_total = result["stated_total"]
+    if stated_total is not None and abs(stated_total - subtotal) >= 0.005:
+        errors.append(f"Stated total {stated_total:.2f} does not match line items {subtotal:.2f}")
+    return result
+
+def parse_transcripts(transcripts: Iterable[str]) -> List[dict]:
+    """Batch form of parse_transcript"""
+    return [parse_transcript(transcript) for transcript in transcripts]
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.services.pdf_writer import (
+    PDFImage, PDFStreamWriter, escape_text, iter_pages_stream, text_width, wrap_text
+)
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Bump when the layout changes so cached PDFs are re-rendered
+TEMPLATE_VERSION = "1"
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4
+MARGIN = 50
+BOTTOM = 60
+REGULAR, BOLD = "Helvetica", "Helvetica-Bold"
+_FONT_KEYS = {REGULAR: "F1", BOLD: "F2"}
+LOGO_HEIGHT = 48
+
+# Table columns: description on the left, numbers right-aligned at these x positions
+DESCRIPTION_WIDTH = 270
+QUANTITY_RIGHT = 380
+RATE_RIGHT = 465
+AMOUNT_RIGHT = PAGE_WIDTH - MARGIN
+
+# Fixed object numbers for the shared prefix; page objects follow
+CATALOG_ID, PAGES_ID, REGULAR_ID, BOLD_ID, RESOURCES_ID, LOGO_ID = 1, 2, 3, 4, 5, 6
+
+def _money(value: Optional[float]) -> str:
+    return f"${value or 0:,.2f}"
+
+def _quantity(value: float) -> str:
+    return f"{value:g}"
+
+class _Page:
+    """Content stream operators for one page"""
+
+    def __init__(self):
+        self.ops: List[bytes] = []
+
+    def text(self, x: float, y: float, text: str, font: str = REGULAR, size: float = 10,
+             gray: float = 0.0, align: str = "left"):
+        if align == "right":
+            x -= text_width(text, font, size)
+        elif align == "center":
+            x -= text_width(text, font, size) / 2
+        self.ops.append(b"BT %g g /%s %g Tf %.2f %.2f Td (%s) Tj ET\n" % (
+            gray, _FONT_KEYS[font].encode(), size, x, y, escape_text(text)))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, gray: float = 0.8):
+        self.ops.append(b"%g G 0.5 w %.2f %.2f m %.2f %.2f l S\n" % (gray, x1, y1, x2, y2))
+
+    def image(self, x: float, y: float, width: float, height: float):
+        self.ops.append(b"q %.2f 0 0 %.2f %.2f %.2f cm /Logo Do Q\n" % (width, height, x, y))
+
+    def content(self) -> bytes:
+        return b"".join(self.ops)
+
+class _Template:
+    """Objects shared by every invoice: catalog, fonts, resources and logo.
+
+    Serialized once per logo file and written verbatim at the start of
+    each PDF, so fonts and images are never re-encoded per request.
+    """
+
+    def __init__(self, logo: Optional[PDFImage]):
+        self.logo = logo
+        writer = PDFStreamWriter()
+        xobjects = f" /XObject << /Logo {LOGO_ID} 0 R >>" if logo else ""
+        chunks = [
+            writer.object(CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID),
+            writer.object(REGULAR_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                      b"/Encoding /WinAnsiEncoding >>"),
+            writer.object(BOLD_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                                   b"/Encoding /WinAnsiEncoding >>"),
+            writer.object(RESOURCES_ID, (
+                f"<< /Font << /F1 {REGULAR_ID} 0 R /F2 {BOLD_ID} 0 R >>{xobjects} >>".encode()
+            )),
+        ]
+        if logo:
+            chunks.append(writer.stream(
+                LOGO_ID, f"/Type /XObject /Subtype /Image /Width {logo.width} /Height {logo.height} "
+                         f"{logo.dictionary}", logo.data))
+        self.prefix = b"".join(chunks)
+        self.offsets = dict(writer.offsets)
+
+def _pages(invoice: dict, template: _Template) -> Iterator[bytes]:
+    """Lay out the invoice, yielding each page's content stream as it fills"""
+    page_number = 1
+    page = _Page()
+    y = PAGE_HEIGHT - MARGIN
+
+    def footer(page: _Page):
+        page.text(PAGE_WIDTH / 2, 30, f"Invoice {invoice['invoice_number']}  ·  Page {page_number}",
+                  size=8, gray=0.5, align="center")
+
+    def table_header(page: _Page, y: float) -> float:
+        page.text(MARGIN, y, "DESCRIPTION", BOLD, 8, gray=0.4)
+        page.text(QUANTITY_RIGHT, y, "QTY", BOLD, 8, gray=0.4, align="right")
+        page.text(RATE_RIGHT, y, "RATE", BOLD, 8, gray=0.4, align="right")
+        page.text(AMOUNT_RIGHT, y, "AMOUNT", BOLD, 8, gray=0.4, align="right")
+        page.line(MARGIN, y - 6, AMOUNT_RIGHT, y - 6)
+        return y - 22
+
+    # Header: logo and company on the left, invoice details on the right
+    left_y = y
+    if template.logo:
+        width = template.logo.width * LOGO_HEIGHT / template.logo.height
+        page.image(MARGIN, y - LOGO_HEIGHT, width, LOGO_HEIGHT)
+        left_y -= LOGO_HEIGHT + 12
+    if invoice.get("company_name"):
+        left_y -= 16
+        page.text(MARGIN, left_y, invoice["company_name"], BOLD, 14)
+    for detail in ("company_address", "company_email", "company_phone"):
+        if invoice.get(detail):
+            left_y -= 12
+            page.text(MARGIN, left_y, invoice[detail], size=9, gray=0.35)
+
+    right_y = y - 22
+    page.text(AMOUNT_RIGHT, right_y, "INVOICE", BOLD, 22, align="right")
+    details = [f"No. {invoice['invoice_number']}", f"Date: {invoice['date']}",
+               f"Due: {invoice['due_date']}", f"Status: {invoice['status'].title()}"]
+    if invoice.get("paid_date"):
+        details.append(f"Paid: {invoice['paid_date']}")
+    for detail in details:
+        right_y -= 14
+        page.text(AMOUNT_RIGHT, right_y, detail, size=9, gray=0.25, align="right")
+
+    # Bill to
+    y = min(left_y, right_y) - 30
+    page.text(MARGIN, y, "BILL TO", BOLD, 8, gray=0.4)
+    y -= 15
+    page.text(MARGIN, y, invoice["client"], BOLD, 11)
+    for detail in ("client_email", "client_address", "client_phone"):
+        if invoice.get(detail):
+            y -= 12
+            page.text(MARGIN, y, invoice[detail], size=9, gray=0.35)
+
+    y = table_header(page, y - 30)
+    for item in invoice["items"]:
+        lines = wrap_text(item["description"], REGULAR, 10, DESCRIPTION_WIDTH)
+        height = 13 * len(lines) + 6
+        if y - height < BOTTOM:
+            footer(page)
+            yield page.content()
+            page_number += 1
+            page = _Page()
+            y = table_header(page, PAGE_HEIGHT - MARGIN)
+        page.text(QUANTITY_RIGHT, y, _quantity(item["quantity"]), align="right")
+        page.text(RATE_RIGHT, y, _money(item["rate"]), align="right")
+        page.text(AMOUNT_RIGHT, y, _money(item.get("amount")), align="right")
+        for line in lines:
+            page.text(MARGIN, y, line)
+            y -= 13
+        y -= 6
+        page.line(MARGIN, y + 9, AMOUNT_RIGHT, y + 9, gray=0.92)
+
+    # Totals, kept together with the notes on one page
+    subtotal = invoice.get("subtotal") or 0.0
+    totals: List[Tuple[str, str]] = [("Subtotal", _money(subtotal))]
+    discount = invoice.get("discount_amount") or 0.0
+    if invoice.get("discount_percentage"):
+        discount = round(subtotal * invoice["discount_percentage"] / 100, 2)
+        totals.append((f"Discount ({invoice['discount_percentage']:g}%)", f"-{_money(discount)}"))
+    elif discount:
+        totals.append(("Discount", f"-{_money(discount)}"))
+    if invoice.get("tax_amount"):
+        totals.append((f"Tax ({invoice.get('tax_rate') or 0:g}%)", _money(invoice["tax_amount"])))
+    notes = wrap_text(invoice["notes"], REGULAR, 9, AMOUNT_RIGHT - MARGIN) if invoice.get("notes") else []
+    needed = 16 * len(totals) + 30 + (14 * len(notes) + 30 if notes else 0)
+    if y - needed < BOTTOM:
+        footer(page)
+        yield page.content()
+        page_number += 1
+        page = _Page()
+        y = PAGE_HEIGHT - MARGIN
+
+    y -= 8
+    for label, value in totals:
+        page.text(RATE_RIGHT, y, label, size=9, gray=0.35, align="right")
+        page.text(AMOUNT_RIGHT, y, value, size=10, align="right")
+        y -= 16
+    page.line(QUANTITY_RIGHT, y + 10, AMOUNT_RIGHT, y + 10, gray=0.5)
+    y -= 6
+    page.text(RATE_RIGHT, y, "Total", BOLD, 11, align="right")
+    page.text(AMOUNT_RIGHT, y, _money(invoice.get("total")), BOLD, 11, align="right")
+
+    if notes:
+        y -= 36
+        page.text(MARGIN, y, "NOTES", BOLD, 8, gray=0.4)
+        for line in notes:
+            y -= 14
+            page.text(MARGIN, y, line, size=9, gray=0.25)
+
+    footer(page)
+    yield page.content()
+
+def render_invoice_pdf(invoice: dict, template: _Template) -> Iterator[bytes]:
+    """Stream a complete PDF: shared prefix, then pages as they are laid out"""
+    writer = PDFStreamWriter(first_free=LOGO_ID + 1)
+    yield writer.header()
+    yield writer.raw(template.prefix, template.offsets)
+    yield from iter_pages_stream(_pages(invoice, template), writer, PAGES_ID, RESOURCES_ID,
+                                 (PAGE_WIDTH, PAGE_HEIGHT))
+    info_id = writer.reserve()
+    title = escape_text(f"Invoice {invoice['invoice_number']}")
+    yield writer.object(info_id, b"<< /Title (%s) /Producer (VoiceInvoice) >>" % title)
+    yield writer.trailer(CATALOG_ID, info_id)
+
+class InvoicePDFRenderer:
+    """Renders invoices to PDF with a content-addressed disk cache.
+
+    The cache key hashes every field that appears on the page plus the
+    template version and logo, so an unchanged invoice is served from disk
+    and doubles as a strong ETag. New renders stream to the client and to
+    a temp file at the same time; the file is only published once complete.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, cache_dir: str = None, max_files: int = None, logo_path: str = None):
+        self.cache_dir = cache_dir or os.getenv(
+            "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "voiceinvoice-pdf"))
+        self.max_files = max_files if max_files is not None else int(os.getenv("PDF_CACHE_MAX_FILES", 500))
+        self.logo_path = logo_path if logo_path is not None else os.getenv("INVOICE_LOGO_PATH", "")
+        self._templates: Dict[tuple, _Template] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Counters since process start
+        self.hits = 0
+        self.renders = 0
+
+    def _logo_fingerprint(self) -> tuple:
+        if not self.logo_path:
+            return ()
+        try:
+            stat = os.stat(self.logo_path)
+        except OSError:
+            return ()
+        return (self.logo_path, stat.st_mtime_ns, stat.st_size)
+
+    def template(self) -> _Template:
+        """Shared objects for the current logo, parsed once per logo file"""
+        fingerprint = self._logo_fingerprint()
+        template = self._templates.get(fingerprint)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(fingerprint)
+                if template is None:
+                    logo = PDFImage.from_file(self.logo_path) if fingerprint else None
+                    if fingerprint and logo is None:
+                        logger.warning("Logo %s is not a JPEG or opaque 8-bit PNG; skipping it", self.logo_path)
+                    template = _Template(logo)
+                    self._templates = {fingerprint: template}
+        return template
+
+    def content_hash(self, invoice: dict) -> str:
+        rendered = {k: v for k, v in invoice.items() if k not in ("created_at", "updated_at")}
+        payload = json.dumps([TEMPLATE_VERSION, self._logo_fingerprint(), rendered],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}.pdf")
+
+    def cached_path(self, content_hash: str) -> Optional[str]:
+        path = self._path(content_hash)
+        return path if os.path.exists(path) else None
+
+    def stream(self, invoice: dict, content_hash: str) -> Iterator[bytes]:
+        """PDF bytes for the invoice, from the cache when it has been rendered before"""
+        path = self._path(content_hash)
+        try:
+            cached = open(path, "rb")
+        except FileNotFoundError:
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            with cached:
+                while chunk := cached.read(self.CHUNK_SIZE):
+                    yield chunk
+            return
+
+        self.renders += 1
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        published = False
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in render_invoice_pdf(invoice, self.template()):
+                    out.write(chunk)
+                    yield chunk
+            os.replace(temp_path, path)
+            published = True
+            self._evict()
+        finally:
+            # Client went away or rendering failed: never publish a partial file
+            if not published:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        """Drop the least recently written PDFs beyond max_files"""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".pdf")]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,220 @@
+import base64
+import json
+import re
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from app.models.invoice import InvoiceCreate, InvoiceUpdate
+
+# Keyset order for each sortBy value; _id breaks ties so the order is total.
+# Each has a matching (user_id, ...) compound index in app.database.indexes.
+SORT_KEYS = {
+    "date": ["date", "_id"],
+    "amount": ["total", "_id"],
+    "client": ["client_lower", "_id"],
+    "status": ["status", "date", "_id"],
+}
+
+# List responses only carry these fields
+SUMMARY_PROJECTION = {
+    "invoice_number": 1, "date": 1, "due_date": 1, "client": 1,
+    "client_email": 1, "status": 1, "total": 1, "created_at": 1,
+    # Needed to build the next cursor
+    "client_lower": 1,
+}
+
+MAX_PAGE_SIZE = 100
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+def _encode_cursor(sort: str, values: list) -> str:
+    payload = {"s": sort, "v": [str(v) if isinstance(v, ObjectId) else v for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, sort: str, fields: List[str]) -> list:
+    """Keyset values from a cursor, which must come from the same sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = payload["v"]
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError
+        sort_matches = payload["s"] == sort
+        values = [ObjectId(v) if f == "_id" else v for f, v in zip(fields, values)]
+    except (ValueError, TypeError, KeyError, InvalidId) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not sort_matches:
+        # Keyset values from another order would skip or repeat invoices
+        raise InvalidCursor("Cursor was issued for a different sortBy or sortOrder")
+    return values
+
+def _after_cursor(fields: List[str], values: list, direction: int) -> dict:
+    """Filter for documents strictly after the cursor in keyset order"""
+    op = "$gt" if direction == ASCENDING else "$lt"
+    clauses = []
+    for i, field in enumerate(fields):
+        clause = {fields[j]: values[j] for j in range(i)}
+        clause[field] = {op: values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def _compute_totals(doc: dict):
+    """Recalculate line amounts, subtotal, tax and total from the items"""
+    subtotal = 0.0
+    for item in doc["items"]:
+        item["amount"] = round(item["quantity"] * item["rate"], 2)
+        subtotal += item["amount"]
+    subtotal = round(subtotal, 2)
+
+    discount = doc.get("discount_amount") or 0.0
+    if doc.get("discount_percentage"):
+        discount = round(subtotal * doc["discount_percentage"] / 100, 2)
+    taxable = subtotal - discount
+    tax_amount = round(taxable * doc["tax_rate"] / 100, 2) if doc.get("tax_rate") else None
+
+    doc["subtotal"] = subtotal
+    doc["tax_amount"] = tax_amount
+    doc["total"] = round(taxable + (tax_amount or 0.0), 2)
+
+def _to_api(doc: dict) -> dict:
+    doc["id"] = str(doc.pop("_id"))
+    doc.pop("client_lower", None)
+    return doc
+
+class InvoiceService:
+    def __init__(self, database):
+        self.invoices_collection = database.invoices
+
+    @staticmethod
+    def _object_id(invoice_id: str) -> Optional[ObjectId]:
+        try:
+            return ObjectId(invoice_id)
+        except (InvalidId, TypeError):
+            return None
+
+    async def create_invoice(self, user_id: str, invoice_data: InvoiceCreate) -> dict:
+        """Create new invoice owned by user_id"""
+        now = datetime.utcnow()
+        doc = invoice_data.model_dump()
+        doc.update({
+            "user_id": user_id,
+            "client_lower": doc["client"].lower(),
+            "created_at": now,
+            "updated_at": now
+        })
+        _compute_totals(doc)
+
+        result = await self.invoices_collection.insert_one(doc)
+        doc["_id"] = result.inserted_id
+        return {"success": True, "invoice": _to_api(doc)}
+
+    async def get_invoice(self, user_id: str, invoice_id: str) -> Optional[dict]:
+        """Get one invoice by id, scoped to its owner"""
+        object_id = self._object_id(invoice_id)
+        if object_id is None:
+            return None
+        doc = await self.invoices_collection.find_one({"_id": object_id, "user_id": user_id})
+        return _to_api(doc) if doc else None
+
+    async def update_invoice(self, user_id: str, invoice_id: str, updates: InvoiceUpdate) -> Optional[dict]:
+        """Apply a partial update and return the updated invoice"""
+        object_id = self._object_id(invoice_id)
+        if object_id is None:
+            return None
+        changes = updates.model_dump(exclude_unset=True)
+
+        if {"items", "tax_rate", "discount_amount", "discount_percentage"} & changes.keys():
+            # Totals depend on fields that may not be in this update
+            current = await self.invoices_collection.find_one({"_id": object_id, "user_id": user_id})
+            if not current:
+                return None
+            merged = {**current, **changes}
+            _compute_totals(merged)
+            changes.update({k: merged[k] for k in ("items", "subtotal", "tax_amount", "total")})
+        if "client" in changes:
+            changes["client_lower"] = changes["client"].lower()
+        changes["updated_at"] = datetime.utcnow()
+
+        doc = await self.invoices_collection.find_one_and_update(
+            {"_id": object_id, "user_id": user_id},
+            {"$set": changes},
+            return_document=ReturnDocument.AFTER
+        )
+        return _to_api(doc) if doc else None
+
+    async def delete_invoice(self, user_id: str, invoice_id: str) -> bool:
+        """Delete an invoice; False if it doesn't exist for this user"""
+        object_id = self._object_id(invoice_id)
+        if object_id is None:
+            return False
+        result = await self.invoices_collection.delete_one({"_id": object_id, "user_id": user_id})
+        return result.deleted_count > 0
+
+    def build_filter(self, user_id: str, status: Optional[List[str]] = None,
+                     date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     client_name: Optional[str] = None, min_amount: Optional[float] = None,
+                     max_amount: Optional[float] = None) -> dict:
+        """Mongo filter for the InvoiceFilters contract"""
+        query = {"user_id": user_id}
+        if status:
+            query["status"] = {"$in": status}
+        if date_from or date_to:
+            query["date"] = {}
+            if date_from:
+                query["date"]["$gte"] = date_from
+            if date_to:
+                query["date"]["$lte"] = date_to
+        if client_name:
+            # Anchored prefix on a lowercased copy, so it can use the index bounds
+            query["client_lower"] = {"$regex": "^" + re.escape(client_name.lower())}
+        if min_amount is not None or max_amount is not None:
+            query["total"] = {}
+            if min_amount is not None:
+                query["total"]["$gte"] = min_amount
+            if max_amount is not None:
+                query["total"]["$lte"] = max_amount
+        return query
+
+    async def list_invoices(self, query: dict, sort_by: str = "date", sort_order: str = "desc",
+                            limit: int = 20, cursor: Optional[str] = None,
+                            include_total: bool = False) -> dict:
+        """One keyset page of invoice summaries"""
+        fields = SORT_KEYS[sort_by]
+        direction = ASCENDING if sort_order == "asc" else DESCENDING
+        sort = f"{sort_by}:{'asc' if direction == ASCENDING else 'desc'}"
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        page_query = query
+        if cursor:
+            page_query = {"$and": [query, _after_cursor(fields, _decode_cursor(cursor, sort, fields), direction)]}
+
+        # Fetch one extra document to learn whether another page exists
+        docs = await self.invoices_collection.find(
+            page_query, SUMMARY_PROJECTION
+        ).sort([(f, direction) for f in fields]).limit(limit + 1).to_list(limit + 1)
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = _encode_cursor(sort, [docs[-1][f] for f in fields]) if has_more else None
+
+        response = {
+            "invoices": [_to_api(doc) for doc in docs],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "limit": limit
+        }
+        if include_total:
+            response["total"] = await self.invoices_collection.count_documents(query)
+        return response
+
+    async def iter_invoices(self, query: dict, batch_size: int = 100) -> AsyncIterator[dict]:
+        """Every matching invoice in date order, fetched batch_size at a time"""
+        cursor = self.invoices_collection.find(query).sort(
+            [("date", ASCENDING), ("_id", ASCENDING)]
+        ).batch_size(batch_size)
+        async for doc in cursor:
+            yield _to_api(doc)
@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from pymongo import ReturnDocument
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis backend is optional
+    aioredis = None
+
+# Outcomes of OTPStore.verify
+VERIFIED = "verified"
+INVALID_CODE = "invalid_code"
+EXPIRED = "expired"
+TOO_MANY_ATTEMPTS = "too_many_attempts"
+NOT_FOUND = "not_found"
+
+class OTPStore(ABC):
+    """Storage for short-lived OTP codes, one per (email, purpose)"""
+
+    @abstractmethod
+    async def save(self, email: str, purpose: str, otp_code: str, ttl_seconds: int, max_attempts: int):
+        """Store a code, replacing any previous one for the same email and purpose"""
+
+    @abstractmethod
+    async def verify(self, email: str, purpose: str, otp_code: str) -> str:
+        """Count one attempt and return one of the verification outcomes"""
+
+    async def delete_expired(self) -> int:
+        """Remove expired codes now; backends that expire on their own return 0"""
+        return 0
+
+    async def close(self):
+        pass
+
+class MongoOTPStore(OTPStore):
+    """otp_codes collection; expiry is handled by the TTL index"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def save(self, email: str, purpose: str, otp_code: str, ttl_seconds: int, max_attempts: int):
+        now = datetime.utcnow()
+        # Single indexed upsert on the unique (email, purpose) index
+        await self.collection.update_one(
+            {"email": email, "purpose": purpose},
+            {"$set": {
+                "otp_code": otp_code,
+                "expires_at": now + timedelta(seconds=ttl_seconds),
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "is_used": False,
+                "created_at": now
+            }},
+            upsert=True
+        )
+
+    async def verify(self, email: str, purpose: str, otp_code: str) -> str:
+        # The filter only matches a live record (unused, unexpired, attempts
+        # left); the pipeline update counts the attempt and marks the record
+        # used only when the code matches. Concurrent attempts serialize on
+        # the document, so at most one of them can ever succeed.
+        otp_record = await self.collection.find_one_and_update(
+            {
+                "email": email,
+                "purpose": purpose,
+                "is_used": False,
+                "expires_at": {"$gt": datetime.utcnow()},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            },
+            [{"$set": {
+                "attempts": {"$add": ["$attempts", 1]},
+                # $literal stops a code like "$otp_code" being read as a field path
+                "is_used": {"$eq": ["$otp_code", {"$literal": otp_code}]}
+            }}],
+            return_document=ReturnDocument.AFTER
+        )
+        if not otp_record:
+            return NOT_FOUND
+        return VERIFIED if otp_record["is_used"] else INVALID_CODE
+
+    async def delete_expired(self) -> int:
+        result = await self.collection.delete_many({"expires_at": {"$lt": datetime.utcnow()}})
+        return result.deleted_count
+
+class MemoryOTPStore(OTPStore):
+    """In-process store for single-node deployments.
+
+    Expiry is tracked in a min-heap, so each call only pops the entries
+    that are actually due instead of scanning every stored code.
+    """
+
+    def __init__(self):
+        self._records: Dict[Tuple[str, str], dict] = {}
+        self._expiry_heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._sequence = itertools.count()
+
+    def _purge_expired(self, now: float):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            record = self._records.get(key)
+            # Skip heap entries for codes that were replaced or already used
+            if record is not None and record["sequence"] == sequence:
+                del self._records[key]
+
+    async def save(self, email: str, purpose: str, otp_code: str, ttl_seconds: int, max_attempts: int):
+        now = time.monotonic()
+        self._purge_expired(now)
+        sequence = next(self._sequence)
+        expires_at = now + ttl_seconds
+        self._records[(email, purpose)] = {
+            "otp_code": otp_code,
+            "expires_at": expires_at,
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "sequence": sequence
+        }
+        heapq.heappush(self._expiry_heap, (expires_at, sequence, (email, purpose)))
+
+    async def verify(self, email: str, purpose: str, otp_code: str) -> str:
+        now = time.monotonic()
+        self._purge_expired(now)
+        key = (email, purpose)
+        record = self._records.get(key)
+        if record is None:
+            return NOT_FOUND
+        if now >= record["expires_at"]:
+            del self._records[key]
+            return EXPIRED
+        if record["attempts"] >= record["max_attempts"]:
+            del self._records[key]
+            return TOO_MANY_ATTEMPTS
+
+        record["attempts"] += 1
+        if record["otp_code"] == otp_code:
+            del self._records[key]
+            return VERIFIED
+        if record["attempts"] >= record["max_attempts"]:
+            del self._records[key]
+        return INVALID_CODE
+
+    async def delete_expired(self) -> int:
+        before = len(self._records)
+        self._purge_expired(time.monotonic())
+        return before - len(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Copy of the live records keyed by email (debugging only)"""
+        return {
+            email: {"purpose": purpose, "otp_code": r["otp_code"], "attempts": r["attempts"],
+                    "max_attempts": r["max_attempts"]}
+            for (email, purpose), r in self._records.items()
+        }
+
+# KEYS[1] = otp key, ARGV[1] = submitted code
+_REDIS_VERIFY_SCRIPT = """
+local record = redis.call('HMGET', KEYS[1], 'otp_code', 'attempts', 'max_attempts')
+if not record[1] then
+    return 0
+end
+if tonumber(record[2]) >= tonumber(record[3]) then
+    return 3
+end
+if record[1] == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+return 2
+"""
+
+class RedisOTPStore(OTPStore):
+    """Redis (or any Redis-compatible server); keys expire via EXPIRE"""
+
+    _OUTCOMES = {0: NOT_FOUND, 1: VERIFIED, 2: INVALID_CODE, 3: TOO_MANY_ATTEMPTS}
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("OTP_STORE=redis requires the 'redis' package")
+        self.client = aioredis.from_url(url, decode_responses=True)
+        self._verify_script = self.client.register_script(_REDIS_VERIFY_SCRIPT)
+
+    @staticmethod
+    def _key(email: str, purpose: str) -> str:
+        return f"otp:{purpose}:{email}"
+
+    async def save(self, email: str, purpose: str, otp_code: str, ttl_seconds: int, max_attempts: int):
+        key = self._key(email, purpose)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"otp_code": otp_code, "attempts": 0, "max_attempts": max_attempts})
+            pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+
+    async def verify(self, email: str, purpose: str, otp_code: str) -> str:
+        # Check and update run as one Lua script, so attempts are atomic
+        outcome = await self._verify_script(keys=[self._key(email, purpose)], args=[otp_code])
+        return self._OUTCOMES[int(outcome)]
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_otp_store(backend: str = None, database=None) -> OTPStore:
+    """Build the store named by OTP_STORE: mongo (default, needs database), memory or redis"""
+    backend = (backend or os.getenv("OTP_STORE", "mongo")).lower()
+    if backend == "memory":
+        return MemoryOTPStore()
+    if backend == "redis":
+        return RedisOTPStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "mongo":
+        return MongoOTPStore(database.otp_codes)
+    raise ValueError(f"Unknown OTP_STORE backend: {backend}")
@@ -0,0 +1,186 @@
+import struct
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Widths (1/1000 em) of WinAnsi codes 32-126 from the Adobe AFM files for the
+# standard-14 fonts, which every PDF viewer has built in, so nothing is embedded.
+_AFM_WIDTHS = {
+    "Helvetica": (
+        "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 "
+        "556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 "
+        "1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 "
+        "333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 "
+        "556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+    ),
+    "Helvetica-Bold": (
+        "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 "
+        "556 556 556 556 556 556 556 556 556 556 333 333 584 584 584 611 "
+        "975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 333 278 333 584 556 "
+        "333 556 611 556 611 556 333 611 611 278 278 556 278 889 611 611 "
+        "611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+    ),
+}
+_DEFAULT_WIDTH = 556
+
+@lru_cache(maxsize=None)
+def font_widths(font_name: str) -> Tuple[int, ...]:
+    """Width table indexed by byte value, parsed on first use"""
+    widths = [_DEFAULT_WIDTH] * 256
+    for code, width in enumerate(_AFM_WIDTHS[font_name].split(), start=32):
+        widths[code] = int(width)
+    return tuple(widths)
+
+def encode_text(text: str) -> bytes:
+    return text.encode("cp1252", errors="replace")
+
+def text_width(text: str, font_name: str, size: float) -> float:
+    widths = font_widths(font_name)
+    return sum(widths[b] for b in encode_text(text)) * size / 1000
+
+def escape_text(text: str) -> bytes:
+    return encode_text(text).replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def wrap_text(text: str, font_name: str, size: float, max_width: float) -> List[str]:
+    """Greedy word wrap to max_width points"""
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, font_name, size) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+class PDFImage:
+    """An image XObject ready to be written into a PDF"""
+
+    def __init__(self, width: int, height: int, dictionary: str, data: bytes):
+        self.width = width
+        self.height = height
+        self.dictionary = dictionary
+        self.data = data
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional["PDFImage"]:
+        """Load a JPEG or an opaque 8-bit PNG without decoding its pixels"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:2] == b"\xff\xd8":
+            return cls._from_jpeg(data)
+        if data[:8] == b"\x89PNG\r\n\x1a\n":
+            return cls._from_png(data)
+        return None
+
+    @classmethod
+    def _from_jpeg(cls, data: bytes) -> Optional["PDFImage"]:
+        # Walk the markers to the frame header for size and component count
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            if marker in (0xC0, 0xC1, 0xC2):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                colorspace = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}.get(data[i + 9])
+                if colorspace is None:
+                    return None
+                return cls(width, height,
+                           f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode", data)
+            i += 2 + length
+        return None
+
+    @classmethod
+    def _from_png(cls, data: bytes) -> Optional["PDFImage"]:
+        # PDF's Flate predictor 15 is PNG filtering, so IDAT data is copied as is
+        width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", data[16:29])
+        colors = {0: 1, 2: 3}.get(color_type)
+        if colors is None or depth != 8 or interlace:
+            return None  # palette, alpha or interlaced PNGs would need decoding
+        idat = bytearray()
+        i = 8
+        while i < len(data):
+            length, kind = struct.unpack(">I4s", data[i:i + 8])
+            if kind == b"IDAT":
+                idat += data[i + 8:i + 8 + length]
+            i += 12 + length
+        colorspace = "/DeviceRGB" if colors == 3 else "/DeviceGray"
+        return cls(width, height,
+                   f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode "
+                   f"/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>",
+                   bytes(idat))
+
+class PDFStreamWriter:
+    """Serializes PDF objects in order, tracking byte offsets for the xref table.
+
+    Every method returns the bytes to emit, so a document can be yielded
+    chunk by chunk; only the offsets are kept until the end.
+    """
+
+    def __init__(self, first_free: int = 1):
+        self.position = 0
+        self.offsets: Dict[int, int] = {}
+        self._next_id = first_free
+
+    def reserve(self) -> int:
+        number = self._next_id
+        self._next_id += 1
+        return number
+
+    def _emit(self, chunk: bytes) -> bytes:
+        self.position += len(chunk)
+        return chunk
+
+    def header(self) -> bytes:
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def raw(self, chunk: bytes, offsets: Dict[int, int]) -> bytes:
+        """Emit pre-serialized objects, with offsets relative to the chunk"""
+        for number, offset in offsets.items():
+            self.offsets[number] = self.position + offset
+        return self._emit(chunk)
+
+    def object(self, number: int, body: bytes) -> bytes:
+        self.offsets[number] = self.position
+        return self._emit(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def stream(self, number: int, dictionary: str, data: bytes, compress: bool = False) -> bytes:
+        if compress:
+            data = zlib.compress(data, 6)
+            dictionary += " /Filter /FlateDecode"
+        body = b"<< %s /Length %d >>\nstream\n%s\nendstream" % (dictionary.encode(), len(data), data)
+        return self.object(number, body)
+
+    def trailer(self, root: int, info: Optional[int] = None) -> bytes:
+        size = max(self.offsets) + 1
+        xref_position = self.position
+        entries = [b"0000000000 65535 f \n"]
+        for number in range(1, size):
+            offset = self.offsets.get(number)
+            entries.append(b"%010d 00000 n \n" % offset if offset is not None else b"0000000000 65535 f \n")
+        info_ref = b" /Info %d 0 R" % info if info else b""
+        return self._emit(
+            b"xref\n0 %d\n%s" % (size, b"".join(entries))
+            + b"trailer\n<< /Size %d /Root %d 0 R%s >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, root, info_ref, xref_position)
+        )
+
+def iter_pages_stream(pages: Iterator[bytes], writer: PDFStreamWriter, pages_id: int,
+                      resources_id: int, media_box: Tuple[float, float]) -> Iterator[bytes]:
+    """Write each page's content as it is produced, then the page tree"""
+    kids = []
+    for content in pages:
+        content_id, page_id = writer.reserve(), writer.reserve()
+        yield writer.stream(content_id, "", content, compress=True)
+        yield writer.object(page_id, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] /Resources %d 0 R /Contents %d 0 R >>"
+            % (pages_id, media_box[0], media_box[1], resources_id, content_id)
+        ))
+        kids.append(b"%d 0 R" % page_id)
+    yield writer.object(pages_id, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids)))
@@ -0,0 +1,194 @@
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Tuple
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis backend is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+class RateLimitBackend(ABC):
+    """Token buckets keyed by string; each take() costs one token"""
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Spend a token; 0 when allowed, otherwise seconds until one is available"""
+
+    async def close(self):
+        pass
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets for single-worker deployments.
+
+    Bounded to max_keys buckets; the least recently used one is dropped
+    first, which at worst hands an idle client a full bucket again.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / refill_per_second
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """rate_limits collection; one atomic update per check, idle buckets expire via TTL index"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = datetime.utcnow()
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [capacity, {"$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {"$multiply": [elapsed_seconds, refill_per_second]}
+                    ]}]},
+                    "updated_at": now,
+                    # A bucket left alone this long is full again, so it can go
+                    "expires_at": now + timedelta(seconds=capacity / refill_per_second)
+                }},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]}
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / refill_per_second
+
+# KEYS[1] = bucket key, ARGV = capacity, refill per second
+_REDIS_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, tostring(tokens)}
+"""
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Redis (or any Redis-compatible server); the refill and spend run as one Lua script"""
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires the 'redis' package")
+        self.client = aioredis.from_url(url, decode_responses=True)
+        self._take_script = self.client.register_script(_REDIS_TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        allowed, tokens = await self._take_script(
+            keys=[f"ratelimit:{key}"], args=[capacity, repr(refill_per_second)]
+        )
+        return 0.0 if int(allowed) else (1 - float(tokens)) / refill_per_second
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_rate_limit_backend(backend: str = None, database=None) -> RateLimitBackend:
+    """Build the backend named by RATE_LIMIT_STORE: memory (default), mongo (needs database) or redis"""
+    backend = (backend or os.getenv("RATE_LIMIT_STORE", "memory")).lower()
+    if backend == "memory":
+        return MemoryRateLimitBackend()
+    if backend == "redis":
+        return RedisRateLimitBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "mongo":
+        return MongoRateLimitBackend(database.rate_limits)
+    raise ValueError(f"Unknown RATE_LIMIT_STORE backend: {backend}")
+
+def parse_rate(spec: str) -> Tuple[int, float]:
+    """'5/900' (5 requests per 900 seconds) -> (capacity, tokens per second)"""
+    count, seconds = spec.split("/")
+    return int(count), int(count) / float(seconds)
+
+class RateLimiter:
+    """Token-bucket limits for the OTP endpoints, used as route dependencies.
+
+    Every request spends a token from its client IP's bucket and, when the
+    body carries an email, from that email's bucket. Rejections happen
+    before the endpoint runs, so no OTP, database or SMTP work is done.
+    """
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.trust_proxy = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+        self.rejected_count = 0
+        self.rules = {
+            "send-otp": {
+                "ip": parse_rate(os.getenv("RATE_LIMIT_SEND_OTP_IP", "20/900")),
+                "email": parse_rate(os.getenv("RATE_LIMIT_SEND_OTP_EMAIL", "5/900")),
+            },
+            "verify-otp": {
+                "ip": parse_rate(os.getenv("RATE_LIMIT_VERIFY_OTP_IP", "60/900")),
+                "email": parse_rate(os.getenv("RATE_LIMIT_VERIFY_OTP_EMAIL", "15/900")),
+            },
+        }
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_proxy:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def _check(self, key: str, capacity: int, refill_per_second: float):
+        try:
+            retry_after = await self.backend.take(key, capacity, refill_per_second)
+        except Exception as e:
+            # A shared store outage should not take logins down with it
+            logger.error("Rate limiter backend error, allowing request: %s", e)
+            return
+        if retry_after > 0:
+            self.rejected_count += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    async def check(self, endpoint: str, request: Request):
+        """Spend the request's tokens for one endpoint, raising 429 when out"""
+        rules = self.rules[endpoint]
+        await self._check(f"{endpoint}:ip:{self.client_ip(request)}", *rules["ip"])
+        # FastAPI has already read the body, so this reuses the cached bytes
+        try:
+            body = await request.json()
+        except ValueError:
+            return  # malformed bodies are rejected by validation, after the IP bucket
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str) and email:
+            await self._check(f"{endpoint}:email:{email.strip().lower()}", *rules["email"])
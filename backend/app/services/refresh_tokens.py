@@ -0,0 +1,53 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from app.utils.security import REFRESH_TOKEN_EXPIRE_DAYS, create_token_pair, refresh_token_claims
+
+logger = logging.getLogger(__name__)
+
+class RefreshTokenStore:
+    """Outstanding refresh tokens, one document per token id (jti).
+
+    A refresh deletes the presented token's document and issues a new pair,
+    so every refresh token works once. A correctly signed token without a
+    document was already used or revoked; since that means a copy is in
+    circulation, all of the user's refresh tokens are revoked.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def issue(self, email: str) -> dict:
+        """New token pair whose refresh token is recorded as outstanding"""
+        jti = uuid.uuid4().hex
+        await self.collection.insert_one({
+            "_id": jti,
+            "email": email,
+            # TTL index removes records once the token could no longer verify anyway
+            "expires_at": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        })
+        return create_token_pair(email, jti)
+
+    async def redeem(self, refresh_token: str) -> Optional[str]:
+        """Consume a refresh token and return its email; None if invalid, used or revoked"""
+        claims = refresh_token_claims(refresh_token)
+        if claims is None:
+            return None
+        result = await self.collection.delete_one({"_id": claims["jti"], "email": claims["sub"]})
+        if result.deleted_count == 0:
+            logger.warning("Refresh token reused; revoking all sessions", extra={"email": claims["sub"]})
+            await self.revoke_all(claims["sub"])
+            return None
+        return claims["sub"]
+
+    async def revoke(self, refresh_token: str) -> bool:
+        """Invalidate one refresh token (logout)"""
+        claims = refresh_token_claims(refresh_token)
+        if claims is None:
+            return False
+        result = await self.collection.delete_one({"_id": claims["jti"], "email": claims["sub"]})
+        return result.deleted_count > 0
+
+    async def revoke_all(self, email: str):
+        await self.collection.delete_many({"email": email})
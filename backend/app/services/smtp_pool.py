@@ -0,0 +1,153 @@
+import asyncio
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from email.utils import getaddresses, parseaddr
+from typing import List, Optional
+from app.utils.metrics import smtp_send_seconds
+
+class SMTPConnectionPool:
+    """Keeps a few authenticated SMTP connections alive and reuses them.
+
+    smtplib is blocking, so every network call runs on a small dedicated
+    thread pool (one thread per connection) and callers simply await.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True,
+                 size: int = 3, timeout: float = 10.0, max_idle_seconds: float = 60.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.LifoQueue] = None
+        self._closed = False
+        self.connections_opened = 0
+
+    def _connect_sync(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.use_tls:
+            server.starttls()
+            server.ehlo()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+    @staticmethod
+    def _is_alive_sync(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit_sync(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _open(self) -> smtplib.SMTP:
+        server = await self._call(self._connect_sync)
+        self.connections_opened += 1
+        return server
+
+    async def _acquire(self) -> smtplib.SMTP:
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+            self._idle = asyncio.LifoQueue()
+
+        await self._slots.acquire()
+        try:
+            if self._idle.empty():
+                return await self._open()
+
+            server, last_used = self._idle.get_nowait()
+            if time.monotonic() - last_used > self.max_idle_seconds:
+                # The relay may have dropped an idle session; check before reuse
+                if not await self._call(self._is_alive_sync, server):
+                    await self._call(self._quit_sync, server)
+                    return await self._open()
+            return server
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, server: Optional[smtplib.SMTP]):
+        if server is not None:
+            if self._closed:
+                server.close()
+            else:
+                self._idle.put_nowait((server, time.monotonic()))
+        self._slots.release()
+
+    async def send_raw(self, from_addr: str, to_addrs: List[str], message: bytes):
+        """Send an already serialized message, reconnecting once on failure"""
+        started = time.perf_counter()
+        server = await self._acquire()
+        try:
+            try:
+                await self._call(server.sendmail, from_addr, to_addrs, message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                # Stale connection - drop it and retry on a fresh one. SMTPException
+                # subclasses OSError, so a rejection must not be caught here.
+                await self._call(self._quit_sync, server)
+                server = None
+                server = await self._open()
+                await self._call(server.sendmail, from_addr, to_addrs, message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The relay answered, so the session is still usable; the caller decides on retries
+            self._release(server)
+            smtp_send_seconds.observe(time.perf_counter() - started, "error")
+            raise
+        except BaseException:
+            if server is not None:
+                await self._call(self._quit_sync, server)
+                server = None
+            self._release(None)
+            smtp_send_seconds.observe(time.perf_counter() - started, "error")
+            raise
+        self._release(server)
+        smtp_send_seconds.observe(time.perf_counter() - started, "ok")
+
+    async def probe(self, timeout: float):
+        """Raise unless the relay answers with a 220 greeting (no login, no pooled connection used)"""
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        try:
+            greeting = await asyncio.wait_for(reader.readline(), timeout)
+            if not greeting.startswith(b"220"):
+                raise ConnectionError(f"Unexpected SMTP greeting: {greeting[:80]!r}")
+            writer.write(b"QUIT\r\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def send_message(self, message: Message):
+        """Send an email.message object using its From/To headers"""
+        from_addr = parseaddr(message["From"])[1]
+        to_addrs = [addr for _, addr in getaddresses([message["To"]])]
+        await self.send_raw(from_addr, to_addrs, message.as_bytes())
+
+    async def close(self):
+        """Quit all idle connections"""
+        self._closed = True
+        if self._idle is not None:
+            while not self._idle.empty():
+                server, _ = self._idle.get_nowait()
+                await self._call(self._quit_sync, server)
+        self._executor.shutdown(wait=False)
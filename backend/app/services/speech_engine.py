@@ -0,0 +1,205 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+try:
+    import vosk
+except ImportError:  # optional: only needed for STT_ENGINE=vosk
+    vosk = None
+
+try:
+    from pywhispercpp.model import Model as WhisperModel
+except ImportError:  # optional: only needed for STT_ENGINE=whisper
+    WhisperModel = None
+
+# Audio is 16-bit little-endian mono PCM
+BYTES_PER_SAMPLE = 2
+DEFAULT_SAMPLE_RATE = 16000
+
+class RecognizerStream(ABC):
+    """Incremental recognizer for one recording.
+
+    Calls are synchronous and CPU-bound; the transcription service runs them
+    on worker threads, one call at a time per stream.
+    """
+
+    @abstractmethod
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Feed more audio; returns the transcript so far if it changed"""
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Flush buffered audio and return the final transcript"""
+
+class SpeechEngine(ABC):
+    """A loaded speech-to-text model that can open recognizer streams"""
+
+    name = "base"
+
+    @abstractmethod
+    def open_stream(self, sample_rate: int = DEFAULT_SAMPLE_RATE) -> RecognizerStream:
+        """Start recognizing a new recording"""
+
+class _FakeStream(RecognizerStream):
+    def __init__(self, words: list, words_per_second: float, realtime_factor: float, sample_rate: int):
+        self.words = words
+        self.words_per_second = words_per_second
+        self.realtime_factor = realtime_factor
+        self.sample_rate = sample_rate
+        self.audio_bytes = 0
+        self.emitted = 0
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self.audio_bytes += len(pcm)
+        if self.realtime_factor:
+            time.sleep(len(pcm) / (BYTES_PER_SAMPLE * self.sample_rate) * self.realtime_factor)
+        seconds = self.audio_bytes / (BYTES_PER_SAMPLE * self.sample_rate)
+        heard = min(len(self.words), int(seconds * self.words_per_second))
+        if heard == self.emitted:
+            return None
+        self.emitted = heard
+        return " ".join(self.words[:heard])
+
+    def finish(self) -> str:
+        return " ".join(self.words)
+
+class FakeSpeechEngine(SpeechEngine):
+    """Reveals a fixed transcript in step with the audio received (tests and demos)"""
+
+    name = "fake"
+    DEFAULT_TRANSCRIPT = (
+        "Invoice for John Doe Inc. Consulting services 5 hours at $100 per hour. "
+        "Software license fee $200. Project setup fee $150. Due in 30 days."
+    )
+
+    def __init__(self, transcript: str = DEFAULT_TRANSCRIPT, words_per_second: float = 2.5,
+                 realtime_factor: float = 0.0):
+        self.words = transcript.split()
+        self.words_per_second = words_per_second
+        # Seconds of CPU time spent per second of audio, to model a real engine
+        self.realtime_factor = realtime_factor
+
+    def open_stream(self, sample_rate: int = DEFAULT_SAMPLE_RATE) -> RecognizerStream:
+        return _FakeStream(self.words, self.words_per_second, self.realtime_factor, sample_rate)
+
+class _VoskStream(RecognizerStream):
+    def __init__(self, model, sample_rate: int):
+        self.recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        self.committed = []
+        self.last = ""
+
+    def _text(self, partial: str = "") -> str:
+        return " ".join(self.committed + ([partial] if partial else []))
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            # End of an utterance: its text is final
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.committed.append(text)
+            current = self._text()
+        else:
+            current = self._text(json.loads(self.recognizer.PartialResult()).get("partial", ""))
+        if current == self.last:
+            return None
+        self.last = current
+        return current
+
+    def finish(self) -> str:
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self.committed.append(text)
+        return self._text()
+
+class VoskSpeechEngine(SpeechEngine):
+    """Kaldi models via the vosk bindings; natively streaming"""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        if vosk is None:
+            raise RuntimeError("STT_ENGINE=vosk requires the 'vosk' package")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+
+    def open_stream(self, sample_rate: int = DEFAULT_SAMPLE_RATE) -> RecognizerStream:
+        return _VoskStream(self.model, sample_rate)
+
+class _WhisperStream(RecognizerStream):
+    def __init__(self, engine: "WhisperSpeechEngine", sample_rate: int):
+        if sample_rate != DEFAULT_SAMPLE_RATE:
+            raise ValueError("whisper.cpp expects 16 kHz audio")
+        self.engine = engine
+        self.committed = []
+        self.window = bytearray()
+        self.decoded_bytes = 0
+        self.step_bytes = int(engine.step_seconds * sample_rate) * BYTES_PER_SAMPLE
+        self.window_bytes = int(engine.window_seconds * sample_rate) * BYTES_PER_SAMPLE
+
+    def _decode(self) -> str:
+        self.decoded_bytes = len(self.window)
+        return self.engine.transcribe(bytes(self.window))
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        self.window.extend(pcm)
+        # Whisper isn't incremental: re-decode the open window every step,
+        # and commit it once it is full so decode cost stays bounded
+        if len(self.window) >= self.window_bytes:
+            self.committed.append(self._decode())
+            self.window.clear()
+            self.decoded_bytes = 0
+            return " ".join(self.committed)
+        if len(self.window) - self.decoded_bytes < self.step_bytes:
+            return None
+        return " ".join(self.committed + [self._decode()])
+
+    def finish(self) -> str:
+        if self.window:
+            self.committed.append(self._decode())
+        return " ".join(t for t in self.committed if t)
+
+class WhisperSpeechEngine(SpeechEngine):
+    """whisper.cpp via pywhispercpp, decoded over a sliding window"""
+
+    name = "whisper"
+
+    def __init__(self, model: str, threads: int = 1, step_seconds: float = 2.0,
+                 window_seconds: float = 20.0):
+        if WhisperModel is None:
+            raise RuntimeError("STT_ENGINE=whisper requires the 'pywhispercpp' package")
+        self.model = WhisperModel(model, n_threads=threads, print_progress=False,
+                                  print_realtime=False)
+        self.step_seconds = step_seconds
+        self.window_seconds = window_seconds
+
+    def transcribe(self, pcm: bytes) -> str:
+        import numpy as np
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        return " ".join(segment.text.strip() for segment in self.model.transcribe(audio)).strip()
+
+    def open_stream(self, sample_rate: int = DEFAULT_SAMPLE_RATE) -> RecognizerStream:
+        return _WhisperStream(self, sample_rate)
+
+def check_engine_allowed(name: str):
+    """The fake engine returns canned text for any audio; only development may use it"""
+    if name.lower() == "fake" and os.getenv("ENVIRONMENT", "production").lower() != "development":
+        raise RuntimeError("STT_ENGINE=fake only runs with ENVIRONMENT=development; use vosk or whisper")
+
+def create_speech_engine(name: str = None) -> SpeechEngine:
+    """Build the engine named by STT_ENGINE: fake (default, development only), vosk or whisper"""
+    name = (name or os.getenv("STT_ENGINE", "fake")).lower()
+    check_engine_allowed(name)
+    if name == "fake":
+        return FakeSpeechEngine(realtime_factor=float(os.getenv("STT_FAKE_REALTIME_FACTOR", 0)))
+    if name == "vosk":
+        return VoskSpeechEngine(os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15"))
+    if name == "whisper":
+        return WhisperSpeechEngine(
+            os.getenv("WHISPER_MODEL", "base.en"),
+            threads=int(os.getenv("WHISPER_THREADS", 1)),
+            step_seconds=float(os.getenv("WHISPER_STEP_SECONDS", 2.0)),
+            window_seconds=float(os.getenv("WHISPER_WINDOW_SECONDS", 20.0))
+        )
+    raise ValueError(f"Unknown STT_ENGINE: {name}")
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from app.services.speech_engine import BYTES_PER_SAMPLE, check_engine_allowed, create_speech_engine
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionQueueFull(Exception):
+    """Raised when too many transcription jobs are already waiting"""
+
+# Set in each worker process by _load_engine; never used in the API process
+_worker_engine = None
+_ready_barrier = None
+
+# How long a loaded worker waits for the others during start()
+READY_TIMEOUT_SECONDS = 300
+
+def _load_engine(engine_name: str, ready_barrier=None):
+    global _worker_engine, _ready_barrier
+    _worker_engine = create_speech_engine(engine_name)
+    _ready_barrier = ready_barrier
+
+def _worker_ready() -> int:
+    """Returns once every worker has its model loaded.
+
+    Each warm-up call blocks on the barrier, so the executor has to start a
+    new process for every call instead of handing several to one worker.
+    """
+    _ready_barrier.wait(READY_TIMEOUT_SECONDS)
+    return os.getpid()
+
+def _transcribe_batch(clips: List[Tuple[str, bytes, int]]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Transcribe several clips in one round trip: (job_id, text, error) each"""
+    results = []
+    for job_id, pcm, sample_rate in clips:
+        try:
+            stream = _worker_engine.open_stream(sample_rate)
+            stream.accept(pcm)
+            results.append((job_id, stream.finish(), None))
+        except Exception as e:
+            results.append((job_id, None, str(e)))
+    return results
+
+class TranscriptionPool:
+    """Process workers that keep a speech model loaded and take whole-clip jobs.
+
+    Jobs wait in a bounded in-process queue; a dispatcher hands them to
+    workers only when one is free, grouping short clips into one batch to
+    save round trips. submit() raises TranscriptionQueueFull once the queue
+    is full so callers can shed load instead of piling up work. Job status
+    lives in this process, and finished jobs are kept for job_ttl_seconds;
+    only the user who submitted a job can look it up.
+    """
+
+    def __init__(self, engine_name: str = None):
+        self.engine_name = engine_name or os.getenv("STT_ENGINE", "fake")
+        self.worker_count = int(os.getenv("STT_WORKERS", 2))
+        self.max_pending = int(os.getenv("STT_MAX_PENDING", 64))
+        self.batch_size = int(os.getenv("STT_BATCH_SIZE", 8))
+        self.batch_max_seconds = float(os.getenv("STT_BATCH_MAX_SECONDS", 15))
+        self.batch_window_seconds = float(os.getenv("STT_BATCH_WINDOW_MS", 50)) / 1000
+        self.job_ttl_seconds = float(os.getenv("STT_JOB_TTL_SECONDS", 3600))
+        self.jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._free_workers: Optional[asyncio.Semaphore] = None
+        self._held: Optional[Tuple[str, bytes, int]] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self._busy = 0
+        # Counters since process start
+        self.completed_count = 0
+        self.failed_count = 0
+        self.rejected_count = 0
+        self.batch_count = 0
+
+    def _new_executor(self, ready_barrier=None) -> ProcessPoolExecutor:
+        # spawn: workers must not inherit the event loop or open database sockets
+        return ProcessPoolExecutor(
+            max_workers=self.worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_engine,
+            initargs=(self.engine_name, ready_barrier)
+        )
+
+    async def start(self):
+        """Start the workers and wait until each has its model loaded"""
+        if self._dispatcher is not None or self.worker_count <= 0:
+            return
+        # Fail here rather than in every spawned worker
+        check_engine_allowed(self.engine_name)
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._free_workers = asyncio.Semaphore(self.worker_count)
+        # Barriers can only reach spawned workers as initializer arguments
+        ready_barrier = multiprocessing.get_context("spawn").Barrier(self.worker_count)
+        self._executor = self._new_executor(ready_barrier)
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _worker_ready) for _ in range(self.worker_count)
+        ])
+        logger.info("Transcription workers ready: %d x %s", len(set(pids)), self.engine_name)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="transcription-dispatcher")
+
+    async def stop(self):
+        """Stop dispatching and shut the workers down; queued jobs are dropped"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for batch in list(self._batches):
+            batch.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _evict_finished(self):
+        cutoff = time.time() - self.job_ttl_seconds
+        while self.jobs:
+            job = next(iter(self.jobs.values()))
+            if job["status"] not in ("completed", "failed") or job["completed_at"] > cutoff:
+                break
+            self.jobs.popitem(last=False)
+
+    def submit(self, pcm: bytes, sample_rate: int, owner: str) -> dict:
+        """Queue a clip for transcription and return its job record"""
+        if self._queue is None:
+            raise RuntimeError("Transcription pool is not running")
+        if self._queue.full():
+            self.rejected_count += 1
+            raise TranscriptionQueueFull("Transcription queue is full")
+
+        self._evict_finished()
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "owner": owner,
+            "status": "queued",
+            "text": None,
+            "error": None,
+            "audio_seconds": round(len(pcm) / (BYTES_PER_SAMPLE * sample_rate), 2),
+            "created_at": time.time(),
+            "started_at": None,
+            "completed_at": None,
+        }
+        self.jobs[job_id] = job
+        self._queue.put_nowait((job_id, pcm, sample_rate))
+        return job
+
+    def get_job(self, job_id: str, owner: str) -> Optional[dict]:
+        """The job if it exists and belongs to owner; other users' jobs look missing"""
+        job = self.jobs.get(job_id)
+        if job is None or job["owner"] != owner:
+            return None
+        return job
+
+    def _is_short(self, clip: Tuple[str, bytes, int]) -> bool:
+        return self.jobs[clip[0]]["audio_seconds"] <= self.batch_max_seconds
+
+    async def _next_batch(self) -> List[Tuple[str, bytes, int]]:
+        if self._held is not None:
+            first, self._held = self._held, None
+        else:
+            first = await self._queue.get()
+        batch = [first]
+        if not self._is_short(first):
+            return batch
+
+        # Give other short clips a brief chance to share this round trip
+        deadline = time.monotonic() + self.batch_window_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                clip = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not self._is_short(clip):
+                self._held = clip
+                break
+            batch.append(clip)
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            # Backpressure: only take jobs off the queue when a worker is free
+            await self._free_workers.acquire()
+            try:
+                batch = await self._next_batch()
+            except BaseException:
+                self._free_workers.release()
+                raise
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, bytes, int]]):
+        started = time.time()
+        for job_id, _, _ in batch:
+            self.jobs[job_id].update({"status": "processing", "started_at": started})
+        self.batch_count += 1
+        self._busy += 1
+
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(executor, _transcribe_batch, batch)
+        except BrokenProcessPool as e:
+            # A worker died (often out of memory); replace the pool once and fail this batch
+            logger.error("Transcription worker crashed: %s", e)
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            results = [(job_id, None, "Transcription worker crashed") for job_id, _, _ in batch]
+        except Exception as e:
+            logger.exception("Transcription batch failed")
+            results = [(job_id, None, str(e)) for job_id, _, _ in batch]
+        finally:
+            self._busy -= 1
+            self._free_workers.release()
+
+        completed = time.time()
+        for job_id, text, error in results:
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            job.update({
+                "status": "failed" if error else "completed",
+                "text": text,
+                "error": error,
+                "completed_at": completed,
+            })
+            if error:
+                self.failed_count += 1
+            else:
+                self.completed_count += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.worker_count,
+            "busy_workers": self._busy,
+            "queued": self._queue.qsize() + (self._held is not None) if self._queue else 0,
+            "max_pending": self.max_pending,
+            "completed": self.completed_count,
+            "failed": self.failed_count,
+            "rejected": self.rejected_count,
+            "batches": self.batch_count,
+        }
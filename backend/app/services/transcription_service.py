@@ -0,0 +1,135 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+from app.services.speech_engine import (
+    BYTES_PER_SAMPLE, DEFAULT_SAMPLE_RATE, RecognizerStream, SpeechEngine, create_speech_engine
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STT_THREADS = int(os.getenv("STT_THREADS", min(4, os.cpu_count() or 1)))
+STT_MAX_SECONDS = float(os.getenv("STT_MAX_SECONDS", 300))
+STT_QUEUE_FRAMES = int(os.getenv("STT_QUEUE_FRAMES", 64))
+
+class TranscriptionSession:
+    """One recording being decoded while it is still being received.
+
+    feed() queues frames and blocks once the queue is full, which stops the
+    receive loop and pushes back on the client; results() decodes on a
+    worker thread and coalesces queued frames so a slow engine catches up
+    in one call instead of falling further behind.
+    """
+
+    def __init__(self, stream: RecognizerStream, executor: ThreadPoolExecutor,
+                 sample_rate: int, max_seconds: float, queue_frames: int):
+        self.stream = stream
+        self.executor = executor
+        self.sample_rate = sample_rate
+        self.max_bytes = int(max_seconds * sample_rate) * BYTES_PER_SAMPLE
+        self.bytes_received = 0
+        self.truncated = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_frames)
+        self._ended = False
+        self._ended_at: Optional[float] = None
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.bytes_received / (BYTES_PER_SAMPLE * self.sample_rate)
+
+    async def feed(self, pcm: bytes) -> bool:
+        """Queue a frame of audio; False once the session takes no more"""
+        if self._ended:
+            return False
+        remaining = self.max_bytes - self.bytes_received
+        if len(pcm) >= remaining:
+            pcm = pcm[:remaining - remaining % BYTES_PER_SAMPLE]
+            self.truncated = True
+        if pcm:
+            self.bytes_received += len(pcm)
+            await self._queue.put(pcm)
+        if self.truncated:
+            await self.end()
+            return False
+        return True
+
+    async def end(self):
+        """No more audio is coming; results() will emit the final transcript"""
+        if not self._ended:
+            self._ended = True
+            self._ended_at = time.perf_counter()
+            await self._queue.put(None)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def results(self) -> AsyncIterator[dict]:
+        """Partial transcripts as audio is decoded, then one final event"""
+        done = False
+        while not done:
+            chunks = [await self._queue.get()]
+            while not self._queue.empty():
+                chunks.append(self._queue.get_nowait())
+            if chunks[-1] is None:
+                done = True
+                chunks.pop()
+            if not chunks:
+                continue
+
+            partial = await self._run(self.stream.accept, b"".join(chunks))
+            if partial is not None:
+                yield {"type": "partial", "text": partial}
+
+        text = await self._run(self.stream.finish)
+        yield {
+            "type": "final",
+            "text": text,
+            "audioSeconds": round(self.audio_seconds, 2),
+            "truncated": self.truncated,
+            # Time from the end of the recording to the final transcript
+            "finalizeMs": round((time.perf_counter() - self._ended_at) * 1000, 1)
+        }
+
+class TranscriptionService:
+    """Hands out streaming sessions backed by one shared speech engine"""
+
+    def __init__(self, engine: SpeechEngine = None, threads: int = STT_THREADS,
+                 max_seconds: float = STT_MAX_SECONDS, queue_frames: int = STT_QUEUE_FRAMES):
+        self._engine = engine
+        self.max_seconds = max_seconds
+        self.queue_frames = queue_frames
+        self.threads = threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created on first use so the service works again after shutdown() (app restart)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="stt")
+        return self._executor
+
+    @property
+    def engine(self) -> SpeechEngine:
+        # Models are large; load on first use rather than at import
+        if self._engine is None:
+            self._engine = create_speech_engine()
+        return self._engine
+
+    async def load(self):
+        """Load the model off the event loop so the first session doesn't pay for it"""
+        if self._engine is None:
+            loop = asyncio.get_running_loop()
+            self._engine = await loop.run_in_executor(self._pool(), create_speech_engine)
+
+    def open_session(self, sample_rate: int = DEFAULT_SAMPLE_RATE) -> TranscriptionSession:
+        return TranscriptionSession(
+            self.engine.open_stream(sample_rate), self._pool(),
+            sample_rate, self.max_seconds, self.queue_frames
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
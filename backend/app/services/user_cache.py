@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+CACHE_MISS = object()
+
+class UserCache:
+    """Bounded TTL + LRU cache of user profiles keyed by email.
+
+    Unknown emails are cached as None too, so create_user must invalidate.
+    A read that races with an invalidation is not stored: fill() only
+    accepts a value read at the current version.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("USER_CACHE_SIZE", 10000))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+        self._entries: "OrderedDict[str, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, email: str):
+        """Cached profile, None for a known-missing user, or CACHE_MISS"""
+        entry = self._entries.get(email)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[email]
+            self.misses += 1
+            return CACHE_MISS
+        self._entries.move_to_end(email)
+        self.hits += 1
+        return entry[1]
+
+    def fill(self, email: str, user: Optional[dict], version: int):
+        if not self.enabled or version != self.version:
+            return
+        self._entries[email] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        self.version += 1
+        self.invalidations += 1
+        self._entries.pop(email, None)
+
+    def clear(self):
+        self.version += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+class UserCacheInvalidator:
+    """Drops cache entries for users changed by any API worker.
+
+    Watches the users collection with a change stream; on deployments
+    without change streams (standalone servers) it polls for documents
+    whose updated_at moved since the last poll instead.
+    """
+
+    def __init__(self, users_collection, cache: UserCache):
+        self.users_collection = users_collection
+        self.cache = cache
+        self.poll_interval_seconds = float(os.getenv("USER_CACHE_POLL_SECONDS", 5))
+        self.mode: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None and self.cache.enabled:
+            self._task = asyncio.create_task(self._run(), name="user-cache-invalidator")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        try:
+            await self._watch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("User change stream unavailable, polling every %gs: %s", self.poll_interval_seconds, e)
+        await self._poll()
+
+    async def _watch(self):
+        """Invalidate from the change stream; raises if it cannot be opened at all"""
+        pipeline = [{"$project": {"operationType": 1, "fullDocument.email": 1}}]
+        resume_token = None
+        while True:
+            try:
+                async with await self.users_collection.watch(
+                    pipeline, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    self.mode = "change_stream"
+                    # Entries cached before the stream opened may already be stale
+                    self.cache.clear()
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        email = (change.get("fullDocument") or {}).get("email")
+                        if email:
+                            self.cache.invalidate(email)
+                        else:
+                            self.cache.clear()  # deletes only carry the _id
+            except OperationFailure:
+                if resume_token is None:
+                    raise
+                resume_token = None  # token fell off the oplog; start fresh
+            except PyMongoError as e:
+                logger.error("User change stream error: %s", e)
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _poll(self):
+        self.mode = "polling"
+        last_seen, seen = datetime.utcnow(), {}
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                last_seen, seen = await self._poll_once(last_seen, seen)
+            except Exception as e:
+                logger.error("User cache poll error: %s", e)
+
+    async def _poll_once(self, last_seen: datetime, seen: Dict[str, datetime]) -> Tuple[datetime, Dict[str, datetime]]:
+        """Invalidate users changed since the last poll.
+
+        The query overlaps the previous one by an interval to tolerate clock
+        skew between workers; seen holds the (email, updated_at) pairs the
+        last poll already invalidated so the overlap does not repeat them.
+        """
+        cursor = self.users_collection.find(
+            {"updated_at": {"$gt": last_seen - timedelta(seconds=self.poll_interval_seconds)}},
+            {"_id": 0, "email": 1, "updated_at": 1}
+        ).sort("updated_at", ASCENDING)
+        window = {}
+        async for user in cursor:
+            window[user["email"]] = user["updated_at"]
+            if seen.get(user["email"]) != user["updated_at"]:
+                self.cache.invalidate(user["email"])
+            last_seen = max(last_seen, user["updated_at"])
+        return last_seen, window
@@ -1,30 +1,40 @@
-import bcrypt
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
-from app.database.connection import database
 from app.models.user import UserCreate, UserLogin, User
+from app.services.user_cache import CACHE_MISS, UserCache, UserCacheInvalidator
+from app.utils.password_hasher import password_hasher
+
+logger = logging.getLogger(__name__)
+
+# Only these fields travel over the wire for each lookup
+PROFILE_PROJECTION = {"email": 1, "is_verified": 1, "created_at": 1, "updated_at": 1}
+LOGIN_PROJECTION = {"email": 1, "password_hash": 1, "is_verified": 1, "created_at": 1}
 
 class UserService:
-    def __init__(self):
+    def __init__(self, database):
         self.users_collection = database.users
+        self.hasher = password_hasher
+        self.cache = UserCache()
+        self.cache_invalidator = UserCacheInvalidator(self.users_collection, self.cache)
     
-    def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    async def hash_password(self, password: str) -> str:
+        """Hash password using bcrypt on the hashing pool"""
+        return await self.hasher.hash(password)
     
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify password against hash on the hashing pool"""
+        return await self.hasher.verify(password, hashed_password)
     
     async def create_user(self, user_data: UserCreate) -> dict:
         """Create new user"""
         # Check if user already exists
-        existing_user = self.users_collection.find_one({"email": user_data.email})
+        existing_user = await self.users_collection.find_one({"email": user_data.email}, {"_id": 1})
         if existing_user:
             return {"success": False, "message": "User already exists"}
         
         # Hash password
-        hashed_password = self.hash_password(user_data.password)
+        hashed_password = await self.hash_password(user_data.password)
         
         # Create user document
         user_doc = {
@@ -36,10 +46,11 @@ class UserService:
         }
         
         # Insert user
-        result = self.users_collection.insert_one(user_doc)
+        result = await self.users_collection.insert_one(user_doc)
+        self.cache.invalidate(user_data.email)
         
         if result.inserted_id:
-            print(f"User created: {user_data.email}")
+            logger.info("User created", extra={"email": user_data.email})
             return {"success": True, "message": "User created successfully", "user_id": str(result.inserted_id)}
         else:
             return {"success": False, "message": "Failed to create user"}
@@ -47,15 +58,24 @@ class UserService:
     async def authenticate_user(self, user_data: UserLogin) -> dict:
         """Authenticate user credentials"""
         # Find user
-        user = self.users_collection.find_one({"email": user_data.email})
+        user = await self.users_collection.find_one({"email": user_data.email}, LOGIN_PROJECTION)
         if not user:
             return {"success": False, "message": "User not found"}
         
         # Verify password
-        if not self.verify_password(user_data.password, user["password_hash"]):
+        if not await self.verify_password(user_data.password, user["password_hash"]):
             return {"success": False, "message": "Invalid password"}
         
-        print(f"User authenticated: {user_data.email}")
+        # Upgrade hashes made with an old cost factor while we have the plaintext
+        if self.hasher.needs_rehash(user["password_hash"]):
+            new_hash = await self.hash_password(user_data.password)
+            await self.users_collection.update_one(
+                {"_id": user["_id"], "password_hash": user["password_hash"]},
+                {"$set": {"password_hash": new_hash, "updated_at": datetime.utcnow()}}
+            )
+            self.cache.invalidate(user["email"])
+        
+        logger.info("User authenticated", extra={"email": user_data.email})
         return {
             "success": True, 
             "message": "Authentication successful",
@@ -68,22 +88,27 @@ class UserService:
     
     async def verify_user(self, email: str) -> dict:
         """Mark user as verified"""
-        result = self.users_collection.update_one(
+        result = await self.users_collection.update_one(
             {"email": email},
             {"$set": {"is_verified": True, "updated_at": datetime.utcnow()}}
         )
+        self.cache.invalidate(email)
         
         if result.modified_count > 0:
-            print(f"User verified: {email}")
+            logger.info("User verified", extra={"email": email})
             return {"success": True, "message": "User verified successfully"}
         else:
             return {"success": False, "message": "User not found"}
     
     async def get_user(self, email: str) -> Optional[dict]:
-        """Get user by email"""
-        user = self.users_collection.find_one({"email": email})
+        """Get user by email, served from the profile cache when possible"""
+        cached = self.cache.get(email)
+        if cached is not CACHE_MISS:
+            return dict(cached) if cached else None
+        version = self.cache.version
+        # The projection leaves out password_hash
+        user = await self.users_collection.find_one({"email": email}, PROFILE_PROJECTION)
         if user:
-            # Remove sensitive data
-            user.pop("password_hash", None)
             user["_id"] = str(user["_id"])
-        return user
+        self.cache.fill(email, user, version)
+        return dict(user) if user else None
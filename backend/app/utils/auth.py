@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, WebSocket, WebSocketException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.utils.security import decode_access_token
+
+bearer_scheme = HTTPBearer()
+
+async def current_user_id(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> str:
+    """Owner of the request, taken from the bearer token without a database lookup"""
+    payload = decode_access_token(credentials.credentials)
+    if payload is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return payload["sub"]
+
+async def websocket_user_id(websocket: WebSocket, token: Optional[str] = Query(None)) -> str:
+    """current_user_id for WebSockets: browsers cannot set headers there, so ?token= is accepted too"""
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        credentials = token
+    payload = decode_access_token(credentials) if credentials else None
+    if payload is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
+    return payload["sub"]
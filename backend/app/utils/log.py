@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Set per request by RequestContextMiddleware; "-" outside requests
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+log_sampled_var: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request ID and drops sub-WARNING records of unsampled requests.
+
+    Attached to the queue handler, so it runs in the thread that logs,
+    where the request's context variables are still visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not log_sampled_var.get():
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with extra={...} fields at the top level"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _EnqueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve arguments and tracebacks now, while they are still valid;
+        # formatting and I/O are left to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging():
+    """Route all logging through a queue drained by a background thread.
+
+    LOG_LEVEL sets the root level, LOG_FORMAT is json (default) or text,
+    and LOG_SAMPLE_RATE is the share of requests whose INFO/DEBUG records
+    are kept; warnings and errors are always logged. Safe to call twice.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+    else:
+        stream_handler.setFormatter(JSONFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _EnqueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class RequestContextMiddleware:
+    """ASGI middleware giving each request a correlation ID and a sampling decision.
+
+    An incoming X-Request-ID is reused when it looks sane, so IDs can be
+    followed across services; it is echoed back on the response.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        id_token = request_id_var.set(request_id)
+        sampled_token = log_sampled_var.set(self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(id_token)
+            log_sampled_var.reset(sampled_token)
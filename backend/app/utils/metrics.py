@@ -0,0 +1,229 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import monitoring
+
+# Prometheus defaults; Mongo and bcrypt get their own ranges below
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+class _Value(_Metric):
+    """Single-value series, kept here or read from a callback at scrape time"""
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            values = [((), self._callback())]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}" for labels, value in values
+        ]
+
+class Counter(_Value):
+    kind = "counter"
+
+class Gauge(_Value):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str):
+        with self._lock:
+            self._values[label_values] = value
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; observe() is a bisect and two additions"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, seconds: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def time(self, *label_values: str) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = self.header()
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+class MetricsRegistry:
+    """Metrics of this process in the Prometheus text exposition format.
+
+    Each worker process keeps its own registry, so with several workers
+    every scrape sees one of them; scrape each worker or run one per pod.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served")
+http_requests_in_flight.set(0)
+mongo_command_seconds = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trip by collection",
+    ("command", "collection", "outcome"), buckets=MONGO_BUCKETS)
+smtp_send_seconds = registry.histogram(
+    "smtp_send_duration_seconds", "SMTP message delivery including connection checkout", ("outcome",))
+bcrypt_seconds = registry.histogram(
+    "bcrypt_duration_seconds", "bcrypt CPU time per operation on the hashing pool",
+    ("operation",), buckets=BCRYPT_BUCKETS)
+bcrypt_wait_seconds = registry.histogram(
+    "bcrypt_queue_wait_seconds", "Time a hash job waited for a free hashing thread", ("operation",))
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Feeds mongodb_command_duration_seconds from pymongo command events"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        command = event.command
+        name = event.command_name
+        # find/insert/update/... name the collection; getMore carries it separately
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else ""
+        )
+
+    def _finish(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongo_command_seconds.observe(event.duration_micros / 1e6, event.command_name, collection, outcome)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, "error")
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and in-flight requests.
+
+    Routes are labelled by their path template (/api/invoices/{invoice_id}),
+    and requests that match no route share one label, so the number of
+    series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"], getattr(route, "path", "unmatched"), status
+            )
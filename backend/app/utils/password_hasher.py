@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import bcrypt
+from dotenv import load_dotenv
+from app.utils.metrics import bcrypt_seconds, bcrypt_wait_seconds
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", min(4, os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", 256))
+
+class HashQueueFull(Exception):
+    """Raised when too many hash jobs are already waiting"""
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the pickling overhead of a process pool.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, pool_size: int = HASH_POOL_SIZE,
+                 max_pending: int = HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._running = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created on first use, so the global hasher survives a lifespan's shutdown()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free hashing slot"""
+        return self._pending - self._running
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "running": self._running,
+            "queued": self.queue_depth,
+            "max_pending": self.max_pending,
+            "rounds": self.rounds,
+        }
+
+    async def _run(self, operation: str, func, *args):
+        if self._pending >= self.max_pending:
+            raise HashQueueFull("Password hashing queue is full")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+
+        self._pending += 1
+        queued = time.perf_counter()
+        try:
+            async with self._semaphore:
+                self._running += 1
+                started = time.perf_counter()
+                bcrypt_wait_seconds.observe(started - queued, operation)
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._pool(), func, *args)
+                finally:
+                    self._running -= 1
+                    bcrypt_seconds.observe(time.perf_counter() - started, operation)
+        finally:
+            self._pending -= 1
+
+    def _hash_sync(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    @staticmethod
+    def _verify_sync(password: str, hashed_password: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def hash(self, password: str) -> str:
+        """Hash password with the configured cost factor"""
+        return await self._run("hash", self._hash_sync, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify password against hash"""
+        return await self._run("verify", self._verify_sync, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True when the hash was made with a different cost factor"""
+        # bcrypt hashes look like $2b$12$<salt+hash>
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        """Stop the hashing threads; the next hash or verify starts new ones"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        # The semaphore belongs to the event loop that is going away
+        self._semaphore = None
+
+# Global hasher instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,94 @@
+import os
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, Union, get_args, get_origin
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: only needed for FAST_JSON=true
+    orjson = None
+
+# Opt-in: orjson rendering and no re-validation of service output
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+if FAST_JSON and orjson is None:
+    raise RuntimeError("FAST_JSON=true requires the 'orjson' package")
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode itself (datetimes and UUIDs it does)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response that also encodes ObjectIds, models and Decimals"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+# Default response class for the app
+APIResponse = FastJSONResponse if FAST_JSON else JSONResponse
+
+def _nested_model(annotation) -> Optional[Tuple[Type[BaseModel], bool]]:
+    """(model, is_list) for fields holding a model or a list of models"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    origin = get_origin(annotation)
+    if origin is list and len(args) == 1:
+        inner = _nested_model(args[0])
+        return (inner[0], True) if inner and not inner[1] else None
+    if origin is Union and len(args) == 1:
+        return _nested_model(args[0])
+    return None
+
+@lru_cache(maxsize=None)
+def _dump_plan(model: Type[BaseModel]) -> List[tuple]:
+    plan = []
+    for name, field in model.model_fields.items():
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((name, field.serialization_alias or field.alias or name, default,
+                     _nested_model(field.annotation)))
+    return plan
+
+def dump_trusted(model: Type[BaseModel], data: dict) -> dict:
+    """Shape a service dict like model(**data).model_dump(by_alias=True), without validating.
+
+    Only for output our own services built from validated input: values are
+    passed through as stored, missing fields get their defaults and extra
+    keys are dropped.
+    """
+    body = {}
+    for name, alias, default, nested in _dump_plan(model):
+        value = data.get(name, default)
+        if nested is not None and value is not None:
+            nested_model, many = nested
+            value = ([dump_trusted(nested_model, item) for item in value] if many
+                     else dump_trusted(nested_model, value))
+        body[alias] = value
+    return body
+
+def model_body(model: Type[BaseModel], data: dict) -> dict:
+    """A service dict as the model's camelCase output"""
+    if FAST_JSON:
+        return dump_trusted(model, data)
+    return model(**data).model_dump(by_alias=True)
+
+def respond(content: dict, model: Optional[Type[BaseModel]] = None):
+    """Return value for a route.
+
+    By default the content goes back to FastAPI, which validates it against
+    the route's response_model and runs jsonable_encoder. With FAST_JSON it
+    is rendered directly by orjson, shaped by model when given.
+    """
+    if not FAST_JSON:
+        return content
+    return FastJSONResponse(dump_trusted(model, content) if model else content)
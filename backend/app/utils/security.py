@@ -1,4 +1,6 @@
 import jwt
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 import os
@@ -6,13 +8,20 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
+# Signs tokens when SECRET_KEY is unset; only accepted with ENVIRONMENT=development
+DEV_SECRET_KEY = "voiceinvoice-development-only-secret"
+# Placeholders from old defaults and .env.example count as unset
+_PLACEHOLDER_KEYS = {"", "your-secret-key", "your-super-secret-jwt-key-replace-this-in-production"}
+SECRET_KEY = os.getenv("SECRET_KEY") or DEV_SECRET_KEY
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
+    to_encode.setdefault("type", "access")
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -41,3 +50,88 @@ def verify_reset_token(token: str) -> Optional[str]:
     if payload and payload.get("type") == "reset":
         return payload.get("email")
     return None
+
+def check_secret_key():
+    """Refuse to start with a missing or placeholder SECRET_KEY outside development"""
+    if os.getenv("ENVIRONMENT", "production").lower() == "development":
+        return
+    if os.getenv("SECRET_KEY", "") in _PLACEHOLDER_KEYS:
+        raise RuntimeError("SECRET_KEY is not set (generate one with: openssl rand -hex 32); "
+                           "only ENVIRONMENT=development may run without it")
+
+def create_refresh_token(subject: str, jti: str) -> str:
+    """Create long-lived refresh token; jti identifies it for rotation and revocation"""
+    data = {"sub": subject, "type": "refresh", "jti": jti}
+    return create_access_token(data, expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+
+def refresh_token_claims(token: str) -> Optional[dict]:
+    """Payload of a validly signed, unexpired refresh token"""
+    payload = verify_token(token)
+    if payload and payload.get("type") == "refresh" and payload.get("sub") and payload.get("jti"):
+        return payload
+    return None
+
+def verify_refresh_token(token: str) -> Optional[str]:
+    """Verify refresh token and return its subject"""
+    payload = refresh_token_claims(token)
+    return payload["sub"] if payload else None
+
+def create_token_pair(subject: str, refresh_jti: str) -> dict:
+    """Access and refresh tokens for a login or refresh response"""
+    return {
+        "access_token": create_access_token({"sub": subject}),
+        "refresh_token": create_refresh_token(subject, refresh_jti),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+class TokenCache:
+    """LRU of verified access token payloads.
+
+    Tokens are immutable, so once a signature has been checked the payload
+    can be reused until the token's own exp; entries are dropped at that
+    point or when the cache is full, whichever comes first.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        payload = self._entries.get(token)
+        if payload is None or payload["exp"] <= time.time():
+            if payload is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict):
+        if self.max_size <= 0:
+            return
+        self._entries[token] = payload
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses}
+
+token_cache = TokenCache()
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Payload of a valid access token, checking the signature only on a cache miss"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = verify_token(token)
+    # Only verified tokens are cached, so garbage tokens cannot flush it
+    if not payload or payload.get("type") != "access" or not payload.get("sub") or "exp" not in payload:
+        return None
+    token_cache.put(token, payload)
+    return payload
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Auth API Load Benchmark for VoiceInvoice
+Drives concurrent send-otp, verify-otp, register and login workloads and
+reports throughput with p50/p95/p99 latency, compared to a stored baseline.
+
+In-process (default): runs app.main:app through an ASGI client against a
+local MongoDB stand-in (see mongo_standin.py) and an aiosmtpd sink.
+Remote: --url http://localhost:8000 targets a running uvicorn instead; start
+it with raised RATE_LIMIT_*_IP limits, since all requests come from one IP.
+
+Usage: python -m benchmarks.auth_load [--requests 500] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import sys
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+WORKLOADS = ("send_otp", "verify_otp", "register", "login")
+BENCH_PASSWORD = "benchmark-password"
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+async def run_workload(count: int, concurrency: int,
+                       request: Callable[[int], Awaitable[bool]]) -> dict:
+    """Issue count requests with at most concurrency in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            ok = await request(i)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(count)])
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@asynccontextmanager
+async def smtp_sink():
+    """Local SMTP server that accepts any login and discards mail"""
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import AuthResult
+    except ImportError:
+        print("⚠️  aiosmtpd not installed - email runs in demo mode")
+        yield
+        return
+
+    class DiscardHandler:
+        async def handle_DATA(self, server, session, envelope):
+            return "250 OK"
+
+    controller = Controller(
+        DiscardHandler(), hostname="127.0.0.1", port=_free_port(),
+        auth_require_tls=False, authenticator=lambda *args: AuthResult(success=True)
+    )
+    controller.start()
+    os.environ.update({
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(controller.port),
+        "SMTP_USE_TLS": "false",
+        "SMTP_USERNAME": "bench@voiceinvoice.test",
+        "SMTP_PASSWORD": "bench",
+        "FROM_EMAIL": "bench@voiceinvoice.test",
+    })
+    try:
+        yield
+    finally:
+        controller.stop()
+
+@asynccontextmanager
+async def in_process_client():
+    """ASGI client for app.main:app wired to the local stand-ins"""
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(smtp_sink())
+        # Every in-process request shares one client IP; keep the limiter in the
+        # path but lift the per-IP ceilings so it never rejects benchmark traffic
+        for name in ("RATE_LIMIT_SEND_OTP_IP", "RATE_LIMIT_VERIFY_OTP_IP"):
+            os.environ.setdefault(name, "1000000/1")
+        # Local run: the development signing key is fine
+        os.environ.setdefault("ENVIRONMENT", "development")
+        # Services read configuration when they are imported
+        from mongo_standin import open_test_database
+        db = await stack.enter_async_context(open_test_database())
+        import app.main as main
+
+        # The lifespan builds every service on this database instead of connecting
+        main.app.state.database = db
+        await stack.enter_async_context(main.app.router.lifespan_context(main.app))
+        transport = httpx.ASGITransport(app=main.app)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+        )
+        yield client, db
+
+@asynccontextmanager
+async def remote_client(url: str):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        yield client, None
+
+async def lookup_code(db, email: str, purpose: str) -> str:
+    """Read the issued code straight from the stand-in database"""
+    if db is None:
+        return "000000"  # remote mode: exercises the rejection path
+    record = await db.otp_codes.find_one({"email": email, "purpose": purpose})
+    return record["otp_code"] if record else "000000"
+
+async def run_benchmark(client: httpx.AsyncClient, db, count: int,
+                        concurrency: int, workloads: List[str]) -> Dict[str, dict]:
+    run_id = uuid.uuid4().hex[:8]
+    results = {}
+
+    def email(kind: str, i: int) -> str:
+        return f"{kind}-{run_id}-{i}@bench.example.com"
+
+    async def post(path: str, payload: dict, expected: int = 200) -> bool:
+        response = await client.post(path, json=payload)
+        return response.status_code == expected
+
+    if "send_otp" in workloads:
+        results["send_otp"] = await run_workload(count, concurrency, lambda i: post(
+            "/api/auth/send-otp", {"email": email("send", i), "purpose": "login"}))
+
+    if "verify_otp" in workloads:
+        # Issue codes first so only verification is timed
+        codes = []
+        for i in range(count):
+            await post("/api/auth/send-otp", {"email": email("verify", i), "purpose": "login"})
+            codes.append(await lookup_code(db, email("verify", i), "login"))
+        expected = 200 if db is not None else 400
+        results["verify_otp"] = await run_workload(count, concurrency, lambda i: post(
+            "/api/auth/verify-otp",
+            {"email": email("verify", i), "otp_code": codes[i], "purpose": "login"},
+            expected))
+
+    if "register" in workloads:
+        results["register"] = await run_workload(count, concurrency, lambda i: post(
+            "/api/users/register", {"email": email("register", i), "password": BENCH_PASSWORD}))
+
+    if "login" in workloads:
+        for i in range(count):
+            await post("/api/users/register", {"email": email("login", i), "password": BENCH_PASSWORD})
+        results["login"] = await run_workload(count, concurrency, lambda i: post(
+            "/api/users/login", {"email": email("login", i), "password": BENCH_PASSWORD}))
+
+    return results
+
+def compare_to_baseline(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Describe every workload that got slower than baseline allows"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+    return regressions
+
+def print_results(results: Dict[str, dict], baseline: Optional[dict]):
+    print(f"\n{'workload':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        line = (f"{name:<12}{r['throughput_rps']:>10}{r['p50_ms']:>10}"
+                f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            line += f"   (baseline p99 {previous['p99_ms']} ms, {previous['throughput_rps']} req/s)"
+        print(line)
+
+async def main_async(args) -> int:
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    workloads = args.workloads or list(WORKLOADS)
+    client_context = remote_client(args.url) if args.url else in_process_client()
+    async with client_context as (client, db):
+        results = await run_benchmark(client, db, args.requests, args.concurrency, workloads)
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else None
+    print_results(results, baseline)
+
+    settings = {
+        "mode": "remote" if args.url else "in-process",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "bcrypt_rounds": int(os.getenv("BCRYPT_ROUNDS", 12)),
+    }
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            **settings,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results
+        }, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if baseline:
+        mismatched = [k for k, v in settings.items() if baseline.get(k) != v]
+        if mismatched:
+            print(f"\n⚠️  Baseline was recorded with different {', '.join(mismatched)}; "
+                  "comparison is approximate")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1 if args.fail_on_regression else 0
+        print("\n✅ No regressions against baseline")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceInvoice auth API load benchmark")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=500, help="requests per workload")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, help="subset of workloads to run")
+    parser.add_argument("--bcrypt-rounds", type=int, help="override BCRYPT_ROUNDS for the in-process app")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before flagging a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 on regression")
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Microbenchmark for VoiceInvoice
+Renders invoice list pages and full invoice lists through FastAPI's default
+path (response_model validation, jsonable_encoder, stdlib json) and through
+the FAST_JSON path (dump_trusted plus orjson), checks both give the same
+JSON and fails when the fast path is not --min-speedup times faster.
+
+Usage: python -m benchmarks.bench_json [--invoices 1000] [--items 10]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.invoice import Invoice, InvoiceListResponse
+from app.utils.responses import FastJSONResponse, dump_trusted
+
+STATUSES = ["draft", "sent", "paid", "overdue"]
+
+def make_invoices(count: int, items: int, seed: int = 7) -> List[dict]:
+    """Invoices shaped like InvoiceService output (ids as strings, datetimes as stored)"""
+    rng = random.Random(seed)
+    created = datetime(2025, 1, 1, 9, 30, 0, 125000)
+    invoices = []
+    for i in range(count):
+        lines = [{"description": f"Consulting block {n}", "quantity": float(rng.randint(1, 40)),
+                  "rate": rng.choice([45.0, 80.0, 125.5]), "amount": None} for n in range(items)]
+        for line in lines:
+            line["amount"] = round(line["quantity"] * line["rate"], 2)
+        subtotal = round(sum(line["amount"] for line in lines), 2)
+        invoices.append({
+            "id": str(ObjectId()), "user_id": "owner@example.com", "invoice_number": f"INV-{i:05d}",
+            "date": "2025-01-15", "due_date": "2025-02-14", "client": f"Client {i % 50}",
+            "client_email": f"billing{i % 50}@example.com", "status": rng.choice(STATUSES),
+            "items": lines, "notes": "Thank you for your business", "tax_rate": 8.5,
+            "subtotal": subtotal, "tax_amount": round(subtotal * 0.085, 2),
+            "total": round(subtotal * 1.085, 2), "company_name": "VoiceInvoice Ltd",
+            "created_at": created + timedelta(minutes=i), "updated_at": created + timedelta(minutes=i, seconds=5),
+        })
+    return invoices
+
+def summary_page(invoices: List[dict]) -> dict:
+    """list_invoices output: summaries only, plus paging fields"""
+    fields = ("id", "invoice_number", "date", "due_date", "client", "client_email", "status",
+              "total", "created_at")
+    return {"invoices": [{f: doc[f] for f in fields} for doc in invoices],
+            "next_cursor": "eyJ2IjpbXX0", "has_more": True, "limit": len(invoices)}
+
+async def default_list(page: dict) -> bytes:
+    """GET /api/invoices without FAST_JSON: validate against response_model, then json.dumps"""
+    field = create_model_field("Response_list_invoices", InvoiceListResponse, mode="serialization")
+    return JSONResponse(await serialize_response(field=field, response_content=page)).body
+
+async def fast_list(page: dict) -> bytes:
+    return FastJSONResponse(dump_trusted(InvoiceListResponse, page)).body
+
+async def default_full(invoices: List[dict]) -> bytes:
+    """Full invoices as the get/update routes build them, then jsonable_encoder and json.dumps"""
+    content = {"success": True, "invoices": [Invoice(**doc).model_dump(by_alias=True) for doc in invoices]}
+    return JSONResponse(await serialize_response(response_content=content)).body
+
+async def fast_full(invoices: List[dict]) -> bytes:
+    content = {"success": True, "invoices": [dump_trusted(Invoice, doc) for doc in invoices]}
+    return FastJSONResponse(content).body
+
+def measure(render: Callable, content, rounds: int) -> float:
+    """Best seconds per response over several rounds"""
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(render(content))  # warm up
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            loop.run_until_complete(render(content))
+            best = min(best, time.perf_counter() - started)
+        return best
+    finally:
+        loop.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceInvoice response serialization microbenchmark")
+    parser.add_argument("--invoices", type=int, default=1000, help="invoices per full list")
+    parser.add_argument("--items", type=int, default=10, help="line items per invoice")
+    parser.add_argument("--page", type=int, default=100, help="summaries per list page (the API maximum)")
+    parser.add_argument("--rounds", type=int, default=10, help="timed renders per path")
+    parser.add_argument("--min-speedup", type=float, default=2.0,
+                        help="fail when the fast path is not this many times faster")
+    args = parser.parse_args()
+
+    invoices = make_invoices(args.invoices, args.items)
+    cases = [
+        (f"list page ({args.page} summaries)", summary_page(invoices[:args.page]), default_list, fast_list),
+        (f"full list ({args.invoices} x {args.items} items)", invoices, default_full, fast_full),
+    ]
+
+    failed = False
+    print(f"{'response':<34}{'default ms':>12}{'fast ms':>10}{'speedup':>10}{'KiB':>8}")
+    for name, content, default, fast in cases:
+        default_body = asyncio.run(default(content))
+        fast_body = asyncio.run(fast(content))
+        if json.loads(default_body) != json.loads(fast_body):
+            print(f"❌ {name}: fast path JSON differs from the default path")
+            sys.exit(1)
+        default_seconds = measure(default, content, args.rounds)
+        fast_seconds = measure(fast, content, args.rounds)
+        speedup = default_seconds / fast_seconds
+        failed |= speedup < args.min_speedup
+        print(f"{name:<34}{default_seconds * 1000:>12.2f}{fast_seconds * 1000:>10.2f}"
+              f"{speedup:>9.1f}x{len(fast_body) / 1024:>8.0f}")
+
+    if failed:
+        print(f"\n❌ Fast path below the {args.min_speedup:g}x floor")
+        sys.exit(1)
+    print(f"\n✅ Fast path at least {args.min_speedup:g}x faster, identical JSON")
+
+if __name__ == "__main__":
+    main()
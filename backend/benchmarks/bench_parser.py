@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Transcript Parser Microbenchmark for VoiceInvoice
+Times parse_transcripts over a generated corpus of written and spoken
+invoices and fails when throughput drops below --min-rate.
+
+Usage: python -m benchmarks.bench_parser [--transcripts 5000] [--min-rate 5000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List
+
+from app.services.invoice_parser import parse_transcripts
+
+CLIENTS = ["John Doe Inc.", "Acme Corp", "Globex", "Initech LLC", "Umbrella Ltd"]
+SERVICES = ["Consulting services", "Design work", "Code review", "Site visit", "Training"]
+FEES = ["Software license fee", "Project setup fee", "Hosting", "Travel expenses"]
+UNITS = ["hours", "days", "sessions"]
+
+def make_corpus(count: int, seed: int = 7) -> List[str]:
+    """Mix of the frontend's written format and engine-style spoken sentences"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        client = rng.choice(CLIENTS)
+        quantity = rng.randint(1, 40)
+        rate = rng.choice([45, 80, 100, 125.5, 1200])
+        unit = rng.choice(UNITS)
+        fee = rng.randint(50, 2500)
+        total = round(quantity * rate + fee, 2)
+        if i % 2:
+            corpus.append(
+                f"Invoice #2025-{i:04d}\nDate: 1/{i % 28 + 1}/2025\nClient: {client}\nItems:\n"
+                f"- {rng.choice(SERVICES)} ({quantity} {unit} @ ${rate}/{unit[:-1]}) = ${quantity * rate:,}\n"
+                f"- {rng.choice(FEES)} = ${fee:,}\n"
+                f"Total Due: ${total:,}"
+            )
+        else:
+            corpus.append(
+                f"Invoice for {client.rstrip('.')}. {rng.choice(SERVICES)} {quantity} {unit} at ${rate} per {unit[:-1]}. "
+                f"{rng.choice(FEES)} ${fee}. Total ${total}. Due in 30 days."
+            )
+    return corpus
+
+def measure(corpus: List[str], rounds: int) -> float:
+    """Best transcripts/second over several rounds"""
+    parse_transcripts(corpus[:100])  # warm up
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        parse_transcripts(corpus)
+        best = max(best, len(corpus) / (time.perf_counter() - started))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceInvoice transcript parser microbenchmark")
+    parser.add_argument("--transcripts", type=int, default=5000, help="corpus size")
+    parser.add_argument("--rounds", type=int, default=5, help="timed passes over the corpus")
+    parser.add_argument("--min-rate", type=float, default=5000,
+                        help="fail below this many transcripts per second")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.transcripts)
+    errors = sum(bool(result["errors"]) for result in parse_transcripts(corpus))
+    if errors:
+        print(f"❌ {errors} generated transcripts failed arithmetic checks")
+        sys.exit(1)
+
+    rate = measure(corpus, args.rounds)
+    print(f"parse_transcripts: {rate:,.0f} transcripts/s "
+          f"({1e6 / rate:.1f} µs each, {args.transcripts} transcripts, best of {args.rounds})")
+    if rate < args.min_rate:
+        print(f"❌ Below the {args.min_rate:,.0f} transcripts/s floor")
+        sys.exit(1)
+    print(f"✅ Above the {args.min_rate:,.0f} transcripts/s floor")
+
+if __name__ == "__main__":
+    main()
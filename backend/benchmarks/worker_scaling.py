@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Worker Scaling Benchmark for VoiceInvoice
+Starts app.launcher with 1, 2, 4... worker processes and drives the same
+HTTP load at each size from separate client processes, reporting throughput,
+p50/p99 latency and speedup over the first (smallest) size.
+
+Each launch runs the real lifespan, so MONGODB_URL must point at a reachable
+MongoDB; transcription workers are off and the rate limiter uses MongoDB
+unless set otherwise, as several workers require. The default path (/health/live) measures server and framework
+overhead; pass --path for a route that does real work. Client processes share
+the machine with the workers, so use --clients and a separate load host when
+measuring more workers than half the cores.
+
+Usage: python -m benchmarks.worker_scaling [--workers 1 2 4] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import httpx
+
+from benchmarks.auth_load import _free_port, summarize
+from app.launcher import usable_cpus
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+def _default_worker_counts() -> List[int]:
+    counts, n = [], 1
+    while n <= max(1, usable_cpus()):
+        counts.append(n)
+        n *= 2
+    return counts
+
+async def _drive(url: str, concurrency: int, warmup: float, seconds: float) -> Tuple[List[float], int]:
+    """Keep concurrency requests in flight; record latencies after the warmup"""
+    latencies: List[float] = []
+    errors = 0
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        async def user():
+            nonlocal errors
+            while loop.time() < stop_at:
+                started = time.perf_counter()
+                try:
+                    ok = (await client.get(url)).status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if loop.time() >= measure_from:
+                    latencies.append(time.perf_counter() - started)
+                    errors += not ok
+
+        await asyncio.gather(*[user() for _ in range(concurrency)])
+    return latencies, errors
+
+def _client_process(args) -> Tuple[List[float], int]:
+    return asyncio.run(_drive(*args))
+
+def _wait_until_up(process: subprocess.Popen, url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"launcher exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server not up after {timeout:g}s")
+
+def measure(app: str, workers: int, path: str, clients: int, concurrency: int,
+            warmup: float, seconds: float) -> dict:
+    """Launch one server size, load it, then shut it down gracefully"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    # Several workers need shared stores (see app.launcher); keep every size comparable
+    env = {"STT_WORKERS": "0", "RATE_LIMIT_STORE": "mongo", "ENVIRONMENT": "development", **os.environ,
+           "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.launcher", "--app", app, "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        _wait_until_up(process, url)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(clients) as pool:
+            runs = pool.map(_client_process, [(url, concurrency, warmup, seconds)] * clients)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+    latencies = [latency for run_latencies, _ in runs for latency in run_latencies]
+    return summarize(latencies, sum(errors for _, errors in runs), seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceInvoice worker scaling benchmark")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app as module:attribute")
+    parser.add_argument("--workers", type=int, nargs="+", default=_default_worker_counts(),
+                        help="worker counts to measure (default: powers of two up to the CPU count)")
+    parser.add_argument("--path", default="/health/live", help="GET path to request")
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight per client process")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring")
+    parser.add_argument("--seconds", type=float, default=10.0, help="measured seconds per worker count")
+    args = parser.parse_args()
+
+    print(f"🔧 {usable_cpus()} usable CPU(s), {args.clients} client process(es) x {args.concurrency} in flight, "
+          f"GET {args.path}")
+    print(f"\n{'workers':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'speedup':>10}")
+    first = None
+    for workers in args.workers:
+        r = measure(args.app, workers, args.path, args.clients, args.concurrency, args.warmup, args.seconds)
+        first = first or r["throughput_rps"]
+        speedup = r["throughput_rps"] / first if first else 0.0
+        print(f"{workers:<10}{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}"
+              f"{r['errors']:>8}{speedup:>9.2f}x", flush=True)
+
+if __name__ == "__main__":
+    main()
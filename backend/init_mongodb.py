@@ -65,7 +65,7 @@ def create_collections(db):
         {
             'name': 'otp_codes',
             'indexes': [
-                {'fields': [('email', ASCENDING), ('purpose', ASCENDING)], 'unique': False},
+                {'fields': [('email', ASCENDING), ('purpose', ASCENDING)], 'unique': True},
                 {'fields': [('expires_at', ASCENDING)], 'unique': False, 'expireAfterSeconds': 0}
             ]
         }
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Local MongoDB stand-in for tests and benchmarks
+Uses a throwaway database on MONGODB_TEST_URL when set, otherwise an
+in-process mongomock database behind the async collection interface
+"""
+
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+class _AsyncCursor:
+    """Async iteration over a mongomock cursor"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+
+        def chain(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _AsyncCursor(result) if result is self._cursor else result
+        return chain
+
+    def __aiter__(self):
+        self._iter = iter(self._cursor)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        items = list(self._cursor)
+        return items if length is None else items[:length]
+
+class _AsyncCollection:
+    """Awaitable wrapper around a mongomock collection"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    async def list_indexes(self):
+        return _AsyncCursor(iter(self._collection.list_indexes()))
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return attr(*args, **kwargs)
+        return call
+
+class _AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+        self.name = database.name
+
+    def __getattr__(self, name):
+        return _AsyncCollection(self._database[name])
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._database[name])
+
+    async def command(self, *args, **kwargs):
+        return {"ok": 1.0}
+
+@asynccontextmanager
+async def open_test_database():
+    """Yield an async database that is discarded afterwards"""
+    mongodb_url = os.getenv("MONGODB_TEST_URL")
+    if mongodb_url:
+        from pymongo import AsyncMongoClient
+        client = AsyncMongoClient(mongodb_url)
+        name = f"voiceinvoice_test_{uuid.uuid4().hex[:8]}"
+        try:
+            yield client[name]
+        finally:
+            await client.drop_database(name)
+            await client.close()
+        return
+
+    import mongomock
+    yield _AsyncDatabase(mongomock.MongoClient()["voiceinvoice_test"])
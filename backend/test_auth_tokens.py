@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+JWT Authentication Tests
+Checks the bearer-token dependency, the decoded-token cache and refresh tokens
+"""
+
+import asyncio
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import otp
+from app.services.refresh_tokens import RefreshTokenStore
+from app.utils import security
+from app.utils.auth import current_user_id
+from app.utils.security import (
+    TokenCache, check_secret_key, create_access_token, create_reset_token, create_token_pair,
+    decode_access_token, verify_refresh_token
+)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TokenCache(max_size=2))
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user_id: str = Depends(current_user_id)):
+        return {"user": user_id}
+
+    return TestClient(app)
+
+def test_access_token_is_verified_once(client):
+    token = create_token_pair("user@example.com", "jti-1")["access_token"]
+    for _ in range(3):
+        response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.json() == {"user": "user@example.com"}
+    assert security.token_cache.hits == 2
+    assert security.token_cache.misses == 1
+
+def test_rejects_other_token_types(client):
+    pair = create_token_pair("user@example.com", "jti-1")
+    for token in (pair["refresh_token"], create_reset_token("user@example.com"), "not-a-jwt"):
+        response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+    assert client.get("/me").status_code in (401, 403)
+    assert security.token_cache.stats()["size"] == 0
+
+def test_cached_entry_expires_with_token(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TokenCache(max_size=2))
+    token = create_access_token({"sub": "user@example.com"}, expires_delta=timedelta(seconds=60))
+    assert decode_access_token(token)["sub"] == "user@example.com"
+    monkeypatch.setattr(security.time, "time", lambda: security.token_cache._entries[token]["exp"] + 1)
+    assert security.token_cache.get(token) is None
+    assert security.token_cache.stats()["size"] == 0
+
+def test_cache_is_bounded():
+    cache = TokenCache(max_size=2)
+    far = {"exp": 2 ** 40}
+    for token in ("a", "b", "c"):
+        cache.put(token, far)
+    assert cache.get("a") is None
+    assert cache.get("c") is far
+
+def test_refresh_token_round_trip():
+    pair = create_token_pair("user@example.com", "jti-1")
+    assert verify_refresh_token(pair["refresh_token"]) == "user@example.com"
+    assert verify_refresh_token(pair["access_token"]) is None
+
+def test_refresh_tokens_are_single_use():
+    if not os.getenv("MONGODB_TEST_URL"):
+        pytest.importorskip("mongomock")
+    from mongo_standin import open_test_database
+
+    async def run():
+        async with open_test_database() as db:
+            store = RefreshTokenStore(db.refresh_tokens)
+            first = await store.issue("user@example.com")
+            other_session = await store.issue("user@example.com")
+            assert await store.redeem(first["refresh_token"]) == "user@example.com"
+            rotated = await store.issue("user@example.com")
+            # Replaying the used token fails and revokes every session of the user
+            assert await store.redeem(first["refresh_token"]) is None
+            assert await store.redeem(rotated["refresh_token"]) is None
+            assert await store.redeem(other_session["refresh_token"]) is None
+            # Logout revokes just the presented token
+            kept, dropped = await store.issue("user@example.com"), await store.issue("user@example.com")
+            assert await store.revoke(dropped["refresh_token"]) is True
+            assert await store.redeem(kept["refresh_token"]) == "user@example.com"
+            assert await store.redeem(dropped["refresh_token"]) is None
+            assert await store.redeem(first["access_token"]) is None
+
+    asyncio.run(run())
+
+def test_secret_key_required_outside_development(monkeypatch):
+    monkeypatch.delenv("ENVIRONMENT", raising=False)
+    for placeholder in ("", "your-secret-key", "your-super-secret-jwt-key-replace-this-in-production"):
+        monkeypatch.setenv("SECRET_KEY", placeholder)
+        with pytest.raises(RuntimeError, match="SECRET_KEY"):
+            check_secret_key()
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    check_secret_key()
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("SECRET_KEY", "0f" * 32)
+    check_secret_key()
+
+def test_outbox_stats_need_a_token():
+    class Outbox:
+        async def stats(self):
+            return {"queue_depth": 0}
+
+    app = FastAPI()
+    app.include_router(otp.router)
+    app.state.services = SimpleNamespace(email_outbox=Outbox())
+    client = TestClient(app)
+    assert client.get("/api/auth/outbox/stats").status_code in (401, 403)
+    token = create_token_pair("user@example.com", "jti-1")["access_token"]
+    response = client.get("/api/auth/outbox/stats", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"queue_depth": 0}
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Database Lifecycle Tests
+Checks that importing the app opens no MongoDB client, that a client
+inherited across fork is replaced, and that services use the injected database
+"""
+
+import asyncio
+import os
+
+import app.main  # noqa: F401
+from app.database.connection import DatabaseManager, db_manager
+from app.dependencies import Services
+from mongo_standin import open_test_database
+
+def test_import_does_not_connect():
+    assert db_manager._async_client is None
+    assert db_manager._client is None
+
+def test_client_inherited_across_fork_is_replaced():
+    async def scenario():
+        manager = DatabaseManager()
+        inherited = object()
+        manager._async_client, manager._async_pid = inherited, os.getpid() + 1
+        try:
+            manager.connect_async()
+            return manager._async_client is not inherited, manager._async_pid
+        finally:
+            await manager.close_async()
+
+    replaced, pid = asyncio.run(scenario())
+    assert replaced
+    assert pid == os.getpid()
+
+def test_services_use_injected_database():
+    async def scenario():
+        async with open_test_database() as db:
+            await db.users.insert_one({"email": "lifecycle@example.com", "is_verified": True})
+            services = Services(db)
+            user = await services.user_service.get_user("lifecycle@example.com")
+            await services.close()
+            return user
+
+    user = asyncio.run(scenario())
+    assert user is not None
+    assert user["email"] == "lifecycle@example.com"
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Email Outbox Tests
+Checks enqueueing, leases, retries with backoff, giving up after
+max_attempts and removal of sent or expired jobs. Set MONGODB_TEST_URL to
+run against a real server; otherwise mongomock is used.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+if not os.getenv("MONGODB_TEST_URL"):
+    pytest.importorskip("mongomock")
+
+from app.services.email_outbox import EmailOutbox
+from mongo_standin import open_test_database
+
+class FakeEmailService:
+    """Records sends; each call returns the next result (True once they run out)"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sent = []
+
+    async def send_otp_email(self, to_email: str, otp_code: str, purpose: str) -> bool:
+        self.sent.append((to_email, otp_code, purpose))
+        return self.results.pop(0) if self.results else True
+
+def run_with_outbox(scenario, *results):
+    async def run():
+        async with open_test_database() as db:
+            outbox = EmailOutbox(FakeEmailService(*results), db.email_outbox)
+            return await scenario(outbox, db.email_outbox)
+    return asyncio.run(run())
+
+def in_minutes(minutes: float) -> datetime:
+    return datetime.utcnow() + timedelta(minutes=minutes)
+
+def test_enqueue_stores_a_due_pending_job():
+    async def scenario(outbox, collection):
+        job_id = await outbox.enqueue("a@example.com", "123456", "login", in_minutes(10))
+        return job_id, await collection.find_one({})
+
+    job_id, job = run_with_outbox(scenario)
+    assert job_id == str(job["_id"])
+    assert (job["to_email"], job["otp_code"], job["purpose"]) == ("a@example.com", "123456", "login")
+    assert job["status"] == "pending" and job["attempts"] == 0
+    assert job["next_attempt_at"] <= datetime.utcnow()
+
+def test_claimed_job_is_leased_once():
+    async def scenario(outbox, collection):
+        await outbox.enqueue("a@example.com", "123456", "login", in_minutes(10))
+        return await outbox._claim(), await outbox._claim()
+
+    claimed, again = run_with_outbox(scenario)
+    assert claimed["status"] == "sending"
+    assert claimed["locked_until"] > in_minutes(0.9)
+    assert again is None
+
+def test_expired_lease_is_reclaimed():
+    async def scenario(outbox, collection):
+        await outbox.enqueue("a@example.com", "123456", "login", in_minutes(10))
+        first = await outbox._claim()
+        # The worker holding the job died and its lease ran out
+        await collection.update_one({"_id": first["_id"]}, {"$set": {"locked_until": in_minutes(-1)}})
+        return first, await outbox._claim()
+
+    first, reclaimed = run_with_outbox(scenario)
+    assert reclaimed["_id"] == first["_id"]
+    assert reclaimed["status"] == "sending"
+    assert reclaimed["locked_until"] > datetime.utcnow()
+
+def test_failed_send_is_retried_with_backoff():
+    async def scenario(outbox, collection):
+        outbox.base_backoff_seconds = 60
+        await outbox.enqueue("a@example.com", "123456", "login", in_minutes(10))
+        before = datetime.utcnow()
+        await outbox._deliver(await outbox._claim())
+        job = await collection.find_one({})
+        # Not due again until the backoff has passed
+        return before, job, await outbox._claim(), await outbox.stats()
+
+    before, job, claimed, stats = run_with_outbox(scenario, False)
+    assert job["status"] == "pending" and job["attempts"] == 1
+    assert "locked_until" not in job
+    # First retry waits base * 2**0 with jitter in [0.5, 1.0]
+    assert before + timedelta(seconds=29) <= job["next_attempt_at"] <= before + timedelta(seconds=61)
+    assert claimed is None
+    assert (stats["retries"], stats["queue_depth"]) == (1, 1)
+
+def test_backoff_doubles_up_to_the_maximum():
+    async def scenario(outbox, collection):
+        outbox.base_backoff_seconds, outbox.max_backoff_seconds = 2, 10
+        return [outbox._backoff_seconds(attempts) for attempts in (1, 2, 3, 4, 5)]
+
+    delays = run_with_outbox(scenario)
+    for delay, ceiling in zip(delays, (2, 4, 8, 10, 10)):
+        assert ceiling * 0.5 <= delay <= ceiling
+
+def test_gives_up_after_max_attempts():
+    async def scenario(outbox, collection):
+        outbox.max_attempts = 2
+        await outbox.enqueue("a@example.com", "123456", "login", in_minutes(10))
+        await outbox._deliver(await outbox._claim())
+        # Make the retry due now instead of after the backoff
+        await collection.update_one({}, {"$set": {"next_attempt_at": in_minutes(-1)}})
+        await outbox._deliver(await outbox._claim())
+        return await collection.find_one({}), await outbox._claim(), await outbox.stats()
+
+    job, claimed, stats = run_with_outbox(scenario, False, False)
+    assert job["status"] == "failed" and job["attempts"] == 2
+    assert "locked_until" not in job
+    assert claimed is None
+    assert (stats["retries"], stats["gave_up"], stats["failed_jobs"], stats["queue_depth"]) == (1, 1, 1, 0)
+
+def test_sent_and_expired_jobs_are_deleted():
+    async def scenario(outbox, collection):
+        await outbox.enqueue("sent@example.com", "111111", "login", in_minutes(10))
+        await outbox._deliver(await outbox._claim())
+        await outbox.enqueue("late@example.com", "222222", "signup", in_minutes(-1))
+        await outbox._deliver(await outbox._claim())
+        return await collection.count_documents({}), outbox.email_service.sent, await outbox.stats()
+
+    remaining, sent, stats = run_with_outbox(scenario)
+    assert remaining == 0
+    # The expired code is dropped without being mailed
+    assert sent == [("sent@example.com", "111111", "login")]
+    assert (stats["sent"], stats["expired"]) == (1, 1)
+
+def test_workers_deliver_enqueued_jobs():
+    service = FakeEmailService()
+
+    async def run():
+        async with open_test_database() as db:
+            outbox = EmailOutbox(service, db.email_outbox)
+            outbox.poll_interval_seconds = 0.05
+            await outbox.start()
+            try:
+                for n in range(3):
+                    await outbox.enqueue(f"user{n}@example.com", f"00000{n}", "login", in_minutes(10))
+                for _ in range(100):
+                    if outbox.sent_count == 3:
+                        break
+                    await asyncio.sleep(0.02)
+            finally:
+                await outbox.stop()
+            return await db.email_outbox.count_documents({}), outbox.sent_count, len(outbox._workers)
+
+    remaining, sent, workers = asyncio.run(run())
+    assert (remaining, sent, workers) == (0, 3, 0)
+    assert sorted(to for to, _, _ in service.sent) == [f"user{n}@example.com" for n in range(3)]
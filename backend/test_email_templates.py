@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+OTP Email Template Tests
+Checks the cached multipart skeletons: MIME structure, decoded text and
+HTML parts, quoted-printable encoding and purpose validation
+"""
+
+import email
+import email.policy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.email_templates import OTP_PURPOSES, OTPEmailRenderer
+
+@pytest.fixture(scope="module")
+def renderer():
+    return OTPEmailRenderer("VoiceInvoice Team", "noreply@voiceinvoice.test")
+
+def parse(raw: bytes):
+    return email.message_from_bytes(raw, policy=email.policy.default)
+
+def test_message_is_multipart_alternative(renderer):
+    message = parse(renderer.render("user@example.com", "123456", "login"))
+
+    assert message.get_content_type() == "multipart/alternative"
+    assert message["To"] == "user@example.com"
+    assert message["From"] == "VoiceInvoice Team <noreply@voiceinvoice.test>"
+    assert message["Subject"] == "Your VoiceInvoice Verification Code - 123456"
+    assert message["Message-ID"] and message["Date"]
+    parts = list(message.iter_parts())
+    assert [part.get_content_type() for part in parts] == ["text/plain", "text/html"]
+    assert all(part["Content-Transfer-Encoding"] == "quoted-printable" for part in parts)
+
+def test_plain_text_part_has_code_and_purpose(renderer):
+    for purpose in OTP_PURPOSES:
+        message = parse(renderer.render("user@example.com", "654321", purpose))
+        text = message.get_body(("plain",)).get_content()
+        assert f"Your verification code to {purpose} VoiceInvoice is:" in text
+        assert "    654321" in text
+        assert "{{" not in text
+        assert "654321" in message.get_body(("html",)).get_content()
+
+def test_body_is_valid_quoted_printable(renderer):
+    raw = renderer.render("user@example.com", "000111", "signup")
+
+    # 7-bit on the wire, body lines within the QP limit, non-ASCII escaped
+    assert raw.isascii()
+    body = raw.split(b"\r\n\r\n", 1)[1]
+    assert max(len(line) for line in body.split(b"\r\n")) <= 76
+    assert b"=C2=A9 2025 VoiceInvoice" in raw
+    assert "© 2025 VoiceInvoice" in parse(raw).get_body(("plain",)).get_content()
+
+def test_unknown_purpose(renderer):
+    with pytest.raises(ValueError, match="purpose 'delete'"):
+        renderer.render("user@example.com", "123456", "delete")
+
+    # The standalone server rejects it before generating a code
+    from app import main_enhanced
+    response = TestClient(main_enhanced.app).post(
+        "/api/auth/send-otp", json={"email": "user@example.com", "purpose": "delete"})
+    assert response.status_code == 422
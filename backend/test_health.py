@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Health Check Tests
+Checks that readiness is served from cached background probes and turns
+unavailable on failing, slow, stale or saturated dependencies
+"""
+
+import asyncio
+
+from app.services.health import HealthMonitor
+
+def test_readiness_uses_cached_probe_results():
+    calls = []
+
+    async def ping():
+        calls.append(1)
+
+    async def scenario():
+        monitor = HealthMonitor(interval_seconds=60, timeout_seconds=1, required=["mongo"])
+        monitor.add_probe("mongo", ping)
+        await monitor.start()
+        reports = [monitor.readiness() for _ in range(100)]
+        await monitor.stop()
+        return reports
+
+    reports = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(report["status"] == "ready" for report in reports)
+    assert reports[0]["checks"]["mongo"]["ok"] is True
+
+def test_failing_and_slow_probes():
+    async def down():
+        raise ConnectionError("connection refused")
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def scenario():
+        monitor = HealthMonitor(interval_seconds=60, timeout_seconds=0.05, required=["mongo", "smtp"])
+        monitor.add_probe("mongo", down)
+        monitor.add_probe("smtp", slow)
+        await monitor.refresh()
+        return monitor.readiness()
+
+    report = asyncio.run(scenario())
+    assert report["status"] == "unavailable"
+    assert report["checks"]["mongo"]["detail"] == "connection refused"
+    assert "timed out" in report["checks"]["smtp"]["detail"]
+
+def test_optional_checks_do_not_block_readiness():
+    async def down():
+        raise ConnectionError("relay down")
+
+    async def scenario():
+        monitor = HealthMonitor(interval_seconds=60, timeout_seconds=1, required=["pools"])
+        monitor.add_probe("smtp", down)
+        saturated = []
+        monitor.add_check("pools", lambda: "bcrypt queue 256/256" if saturated else None)
+        await monitor.refresh()
+        before = monitor.readiness()
+        saturated.append(True)
+        return before, monitor.readiness()
+
+    before, after = asyncio.run(scenario())
+    assert before["status"] == "ready" and before["checks"]["smtp"]["ok"] is False
+    assert after["status"] == "unavailable"
+    assert after["checks"]["pools"]["detail"] == "bcrypt queue 256/256"
+
+def test_stale_results_count_as_failures():
+    async def ping():
+        pass
+
+    async def scenario():
+        monitor = HealthMonitor(interval_seconds=1, timeout_seconds=1, required=["mongo"])
+        monitor.add_probe("mongo", ping)
+        await monitor.refresh()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+    monitor._results["mongo"]["checked_at"] -= 10
+    assert monitor.readiness()["status"] == "unavailable"
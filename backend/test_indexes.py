@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Index Tests
+Checks that ensure_indexes creates every service index, replaces or converts
+older conflicting ones, and that the plan check flags collection scans
+"""
+
+import asyncio
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from app.database import diagnostics
+from app.database.indexes import INDEX_SPECS, ensure_indexes
+from mongo_standin import _AsyncDatabase
+
+class RecordingDatabase(_AsyncDatabase):
+    """mongomock database that records commands (mongomock has no collMod)"""
+
+    def __init__(self):
+        super().__init__(mongomock.MongoClient()["voiceinvoice_test"])
+        self.commands = []
+
+    async def command(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+        return {"ok": 1.0}
+
+def index_options(db, collection: str) -> dict:
+    return {tuple(info["key"]): info for info in db._database[collection].index_information().values()}
+
+def test_creates_every_index_and_is_idempotent():
+    db = RecordingDatabase()
+    asyncio.run(ensure_indexes(db))
+    asyncio.run(ensure_indexes(db))
+
+    for collection, specs in INDEX_SPECS.items():
+        existing = index_options(db, collection)
+        for spec in specs:
+            info = existing[tuple(spec["keys"])]
+            assert info.get("unique", False) == spec.get("unique", False)
+            assert info.get("expireAfterSeconds") == spec.get("expireAfterSeconds")
+    assert db.commands == []
+
+def test_replaces_the_old_non_unique_otp_index():
+    db = RecordingDatabase()
+    db._database.otp_codes.create_index([("email", 1), ("purpose", 1)])
+    asyncio.run(ensure_indexes(db))
+
+    assert index_options(db, "otp_codes")[(("email", 1), ("purpose", 1))]["unique"] is True
+
+def test_startup_fails_when_the_unique_index_cannot_be_built():
+    db = RecordingDatabase()
+    db._database.otp_codes.create_index([("email", 1), ("purpose", 1)])
+    db._database.otp_codes.insert_many([{"email": "dup@example.com", "purpose": "login"} for _ in range(2)])
+
+    with pytest.raises(RuntimeError, match="otp_codes"):
+        asyncio.run(ensure_indexes(db))
+
+def test_plain_expiry_index_is_converted_to_ttl():
+    db = RecordingDatabase()
+    db._database.rate_limits.create_index([("expires_at", 1)])
+    asyncio.run(ensure_indexes(db))
+
+    assert db.commands == [(("collMod", "rate_limits"),
+                            {"index": {"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0}})]
+
+class PlanDatabase:
+    """Sync database stand-in whose explain() returns a fixed plan per collection"""
+
+    def __init__(self, plans: dict):
+        self.plans = plans
+
+    def __getitem__(self, collection):
+        plan = self.plans.get(collection, {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}})
+
+        class Cursor:
+            def sort(self, _):
+                return self
+
+            def explain(self):
+                return {"queryPlanner": {"winningPlan": {"queryPlan": plan}}}
+
+        class Collection:
+            def find(self, _):
+                return Cursor()
+
+        return Collection()
+
+def test_plan_check_flags_collection_scans(capsys):
+    assert diagnostics.check_query_plans(PlanDatabase({})) is True
+    scan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+    assert diagnostics.check_query_plans(PlanDatabase({"invoices": scan})) is False
+    output = capsys.readouterr().out
+    assert "❌ InvoiceService.get_invoice (invoices): COLLSCAN [SORT -> COLLSCAN]" in output
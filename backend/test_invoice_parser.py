@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Invoice Transcript Parser Tests
+Covers the frontend's written format, engine-style spoken sentences and
+the arithmetic checks, plus a loose throughput floor
+"""
+
+import time
+
+from app.services.invoice_parser import parse_transcript, parse_transcripts
+from benchmarks.bench_parser import make_corpus
+
+MOCK_TRANSCRIPT = """Invoice #2025-001
+Date: 1/2/2025
+Client: John Doe Inc.
+Items:
+- Consulting Services (5 hours @ $100/hour) = $500
+- Software License Fee = $200
+- Project Setup Fee = $150
+Total Due: $850"""
+
+def test_parses_written_invoice():
+    result = parse_transcript(MOCK_TRANSCRIPT)
+
+    assert result["invoice_number"] == "2025-001"
+    assert result["date"] == "1/2/2025"
+    assert result["client"] == "John Doe Inc"
+    assert result["items"] == [
+        {"description": "Consulting Services", "quantity": 5.0, "rate": 100.0, "amount": 500.0},
+        {"description": "Software License Fee", "quantity": 1.0, "rate": 200.0, "amount": 200.0},
+        {"description": "Project Setup Fee", "quantity": 1.0, "rate": 150.0, "amount": 150.0},
+    ]
+    assert result["total"] == 850.0
+    assert result["errors"] == []
+    assert result["unparsed"] == []
+
+def test_parses_spoken_sentences():
+    result = parse_transcript(
+        "Invoice for Dr. Smith. Design work two days at $1,200.50 per day. "
+        "Hosting for 12 months at $9.99 per month. Due in 30 days."
+    )
+
+    assert result["client"] == "Dr. Smith"
+    assert [(i["description"], i["quantity"], i["amount"]) for i in result["items"]] == [
+        ("Design work", 2.0, 2401.0),
+        ("Hosting", 12.0, 119.88),
+    ]
+    assert result["unparsed"] == ["Due in 30 days."]
+
+def test_reports_arithmetic_mistakes():
+    result = parse_transcript("Widgets 3 x $10 = $35\nTotal: $40")
+
+    assert result["items"][0]["amount"] == 30.0
+    assert result["total"] == 30.0
+    assert result["errors"] == [
+        "Widgets: 3 x 10.00 = 30.00, not 35.00",
+        "Stated total 40.00 does not match line items 30.00",
+    ]
+
+def test_item_on_the_header_line():
+    result = parse_transcript("Items: - Consulting Services (5 hours @ $100/hour) = $500\nTotal Due: $500")
+
+    assert result["items"] == [
+        {"description": "Consulting Services", "quantity": 5.0, "rate": 100.0, "amount": 500.0}
+    ]
+    assert result["errors"] == []
+    assert result["unparsed"] == []
+
+def test_unreadable_total_is_reported():
+    result = parse_transcript("Items:\n- Project Setup Fee = $150\nTotal Due: N/A")
+
+    assert result["stated_total"] is None
+    assert result["unparsed"] == ["Total Due: N/A"]
+    assert result["errors"] == ["Could not read stated total: N/A"]
+
+def test_items_starting_with_field_keywords():
+    result = parse_transcript(
+        "Invoice #2025-002\nClient: Acme\nItems:\n"
+        "- Client onboarding (2 hours @ $100/hour) = $200\n"
+        "- Totally new logo = $300\n"
+        "- Date night catering = $120\n"
+        "- Invoice template design = $80\n"
+        "Total: $700"
+    )
+
+    assert result["invoice_number"] == "2025-002"
+    assert result["client"] == "Acme"
+    assert [(i["description"], i["amount"]) for i in result["items"]] == [
+        ("Client onboarding", 200.0),
+        ("Totally new logo", 300.0),
+        ("Date night catering", 120.0),
+        ("Invoice template design", 80.0),
+    ]
+    assert result["stated_total"] == 700.0
+    assert result["errors"] == []
+    assert result["unparsed"] == []
+
+def test_batch_throughput_floor():
+    # Generous floor for slow CI machines; benchmarks.bench_parser guards the real target
+    corpus = make_corpus(2000)
+    started = time.perf_counter()
+    results = parse_transcripts(corpus)
+    rate = len(corpus) / (time.perf_counter() - started)
+
+    assert not any(result["errors"] for result in results)
+    assert rate > 1000
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Invoice PDF Rendering Tests
+Checks the streamed PDF structure, the content-hash cache and the ZIP export
+"""
+
+import asyncio
+import io
+import re
+import zipfile
+
+import pytest
+
+from app.services.invoice_export import InvoiceExporter
+from app.services.invoice_pdf import InvoicePDFRenderer
+
+INVOICE = {
+    "id": "65a000000000000000000001",
+    "invoice_number": "2025-001",
+    "date": "2025-01-02",
+    "due_date": "2025-02-01",
+    "status": "sent",
+    "client": "John Doe Inc.",
+    "items": [
+        {"description": f"Consulting services, phase {i}", "quantity": 5, "rate": 100.0, "amount": 500.0}
+        for i in range(60)
+    ],
+    "subtotal": 30000.0,
+    "tax_rate": 10,
+    "tax_amount": 3000.0,
+    "total": 33000.0,
+}
+
+@pytest.fixture
+def renderer(tmp_path):
+    return InvoicePDFRenderer(cache_dir=str(tmp_path), max_files=10, logo_path="")
+
+def render(renderer, invoice) -> bytes:
+    return b"".join(renderer.stream(invoice, renderer.content_hash(invoice)))
+
+def test_xref_points_at_every_object(renderer):
+    pdf = render(renderer, INVOICE)
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    xref_at = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[xref_at:].startswith(b"xref")
+    entries = re.findall(rb"(\d{10}) \d{5} ([nf])", pdf[xref_at:])
+    for number, (offset, kind) in enumerate(entries):
+        if kind == b"n":
+            assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+    # 60 wrapped rows don't fit on one page
+    assert b"/Count 2" in pdf or b"/Count 3" in pdf
+
+def test_unchanged_invoice_is_served_from_cache(renderer):
+    first = render(renderer, INVOICE)
+    second = render(renderer, INVOICE)
+
+    assert first == second
+    assert (renderer.renders, renderer.hits) == (1, 1)
+
+def test_edit_changes_the_content_hash(renderer):
+    edited = {**INVOICE, "status": "paid", "updated_at": "later"}
+
+    assert renderer.content_hash({**INVOICE, "updated_at": "now"}) == renderer.content_hash(INVOICE)
+    assert renderer.content_hash(edited) != renderer.content_hash(INVOICE)
+
+def test_abandoned_render_is_not_cached(renderer, tmp_path):
+    stream = renderer.stream(INVOICE, renderer.content_hash(INVOICE))
+    next(stream)
+    stream.close()  # client disconnected mid-download
+
+    assert list(tmp_path.iterdir()) == []
+    render(renderer, INVOICE)
+    assert renderer.renders == 2
+
+def test_export_streams_a_zip_of_pdfs(renderer, monkeypatch):
+    monkeypatch.setenv("EXPORT_WORKERS", "2")
+    exporter = InvoiceExporter(renderer)
+    invoices = [{**INVOICE, "id": f"{i:024x}", "invoice_number": f"INV-{i % 5}", "items": INVOICE["items"][:3]}
+                for i in range(12)]
+    # One of them is already cached and is copied rather than rendered
+    render(renderer, invoices[0])
+
+    async def source():
+        for invoice in invoices:
+            yield invoice
+
+    async def collect():
+        return [chunk async for chunk in exporter.stream_zip(source())]
+
+    try:
+        chunks = asyncio.run(collect())
+    finally:
+        exporter.shutdown()
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    names = archive.namelist()
+    assert len(names) == 12 == len(set(names))
+    assert "invoice-INV-0.pdf" in names
+    assert all(archive.read(name).startswith(b"%PDF-1.4") for name in names)
+    # Entries are emitted as renders finish, not after the whole archive is built
+    assert len([chunk for chunk in chunks if chunk]) > 2
+
+def test_failed_render_aborts_the_export(renderer, monkeypatch):
+    monkeypatch.setenv("EXPORT_WORKERS", "1")
+    exporter = InvoiceExporter(renderer)
+    good = {**INVOICE, "items": INVOICE["items"][:3]}
+    # Already cached, so its entry is written before the broken one fails
+    render(renderer, good)
+    broken = {**good, "id": f"{2:024x}", "invoice_number": "BROKEN", "items": None}
+
+    async def source():
+        yield good
+        yield broken
+
+    chunks = []
+
+    async def collect():
+        async for chunk in exporter.stream_zip(source()):
+            chunks.append(chunk)
+
+    try:
+        with pytest.raises(TypeError):
+            asyncio.run(collect())
+    finally:
+        exporter.shutdown()
+
+    # The first entry went out, but no central directory: the ZIP is never completed
+    assert b"".join(chunks).startswith(b"PK\x03\x04")
+    assert b"PK\x05\x06" not in b"".join(chunks)
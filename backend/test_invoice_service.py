@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Invoice Service Tests
+Checks keyset pagination for every sort, the list filters, recomputed totals
+and owner scoping. Set MONGODB_TEST_URL to run against a real server; otherwise mongomock is used.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+if not os.getenv("MONGODB_TEST_URL"):
+    pytest.importorskip("mongomock")
+
+from app.models.invoice import InvoiceCreate, InvoiceUpdate
+from app.services.invoice_service import SORT_KEYS, InvalidCursor, InvoiceService
+from mongo_standin import open_test_database
+
+OWNER = "owner@example.com"
+
+# Repeated dates, clients, statuses and totals so every sort has ties for _id to break
+ROWS = [
+    ("2025-01-10", "Acme", "paid", 100.0),
+    ("2025-01-10", "acme", "sent", 100.0),
+    ("2025-01-12", "Beta", "draft", 50.0),
+    ("2025-01-12", "Beta", "paid", 250.0),
+    ("2025-01-15", "Gamma", "sent", 50.0),
+    ("2025-01-15", "acme", "paid", 100.0),
+    ("2025-02-01", "Delta", "overdue", 75.0),
+]
+
+def invoice(number: int, date: str, client: str, status: str, rate: float) -> InvoiceCreate:
+    return InvoiceCreate(invoice_number=f"INV-{number:03d}", date=date, due_date="2025-03-01", client=client,
+                         status=status, items=[{"description": "Work", "quantity": 1, "rate": rate}])
+
+def run_with_service(scenario):
+    async def run():
+        async with open_test_database() as db:
+            service = InvoiceService(db)
+            for number, (date, client, status, rate) in enumerate(ROWS):
+                await service.create_invoice(OWNER, invoice(number, date, client, status, rate))
+            return await scenario(service, db)
+    return asyncio.run(run())
+
+async def walk(service, query, **options):
+    """Ids of every page in order, following next_cursor"""
+    ids, cursor = [], None
+    while True:
+        page = await service.list_invoices(query, cursor=cursor, **options)
+        ids += [doc["id"] for doc in page["invoices"]]
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            return ids
+        cursor = page["next_cursor"]
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", list(SORT_KEYS))
+def test_pages_follow_the_full_sort(sort_by, sort_order):
+    async def scenario(service, db):
+        stored = await db.invoices.find({}).to_list(None)
+        stored.sort(key=lambda doc: [doc[f] for f in SORT_KEYS[sort_by]], reverse=sort_order == "desc")
+        expected = [str(doc["_id"]) for doc in stored]
+        query = service.build_filter(OWNER)
+        pages = {limit: await walk(service, query, sort_by=sort_by, sort_order=sort_order, limit=limit)
+                 for limit in (1, 2, 3)}
+        return expected, pages
+
+    expected, pages = run_with_service(scenario)
+    for limit, ids in pages.items():
+        assert ids == expected, f"limit={limit}"
+
+def test_cursor_from_another_sort_is_rejected():
+    async def scenario(service, db):
+        query = service.build_filter(OWNER)
+        page = await service.list_invoices(query, sort_by="date", sort_order="desc", limit=2)
+        for sort_by, sort_order in [("amount", "desc"), ("status", "desc"), ("date", "asc")]:
+            with pytest.raises(InvalidCursor):
+                await service.list_invoices(query, sort_by=sort_by, sort_order=sort_order,
+                                            cursor=page["next_cursor"])
+        with pytest.raises(InvalidCursor):
+            await service.list_invoices(query, cursor="not-a-cursor")
+
+    run_with_service(scenario)
+
+def test_filters():
+    async def scenario(service, db):
+        async def numbers(**filters):
+            page = await service.list_invoices(service.build_filter(OWNER, **filters), sort_by="date",
+                                               sort_order="asc", limit=100, include_total=True)
+            assert page["total"] == len(page["invoices"])
+            return sorted(doc["invoice_number"] for doc in page["invoices"])
+
+        return {
+            "status": await numbers(status=["paid", "overdue"]),
+            "dates": await numbers(date_from="2025-01-12", date_to="2025-01-15"),
+            "client": await numbers(client_name="ACM"),
+            "amount": await numbers(min_amount=75.0, max_amount=100.0),
+            "combined": await numbers(client_name="acme", status=["paid"], date_from="2025-01-11"),
+        }
+
+    results = run_with_service(scenario)
+    assert results["status"] == ["INV-000", "INV-003", "INV-005", "INV-006"]
+    assert results["dates"] == ["INV-002", "INV-003", "INV-004", "INV-005"]
+    assert results["client"] == ["INV-000", "INV-001", "INV-005"]
+    assert results["amount"] == ["INV-000", "INV-001", "INV-005", "INV-006"]
+    assert results["combined"] == ["INV-005"]
+
+def test_totals_are_recomputed():
+    async def scenario(service, db):
+        created = await service.create_invoice(OWNER, InvoiceCreate(
+            invoice_number="INV-100", date="2025-03-01", due_date="2025-04-01", client="Omega",
+            items=[{"description": "Design", "quantity": 3, "rate": 40.0, "amount": 1.0},
+                   {"description": "Hosting", "quantity": 1, "rate": 30.0}],
+            tax_rate=10.0, discount_percentage=50.0))
+        invoice_id = created["invoice"]["id"]
+        # Changing items keeps the stored tax rate and discount
+        updated = await service.update_invoice(OWNER, invoice_id, InvoiceUpdate(
+            items=[{"description": "Design", "quantity": 5, "rate": 40.0}]))
+        return created["invoice"], updated
+
+    created, updated = run_with_service(scenario)
+    assert [item["amount"] for item in created["items"]] == [120.0, 30.0]
+    assert (created["subtotal"], created["tax_amount"], created["total"]) == (150.0, 7.5, 82.5)
+    assert (updated["subtotal"], updated["tax_amount"], updated["total"]) == (200.0, 10.0, 110.0)
+
+def test_other_users_see_nothing():
+    async def scenario(service, db):
+        invoice_id = str((await db.invoices.find_one({}))["_id"])
+        other = "intruder@example.com"
+        page = await service.list_invoices(service.build_filter(other), include_total=True)
+        return (
+            page["invoices"], page["total"],
+            await service.get_invoice(other, invoice_id),
+            await service.update_invoice(other, invoice_id, InvoiceUpdate(status="cancelled")),
+            await service.update_invoice(other, invoice_id, InvoiceUpdate(tax_rate=5.0)),
+            await service.delete_invoice(other, invoice_id),
+            await service.get_invoice(OWNER, invoice_id),
+        )
+
+    invoices, total, got, updated, retaxed, deleted, owners_copy = run_with_service(scenario)
+    assert (invoices, total) == ([], 0)
+    assert got is None and updated is None and retaxed is None
+    assert deleted is False
+    assert owners_copy["status"] == ROWS[0][2]
+    assert owners_copy["tax_amount"] is None
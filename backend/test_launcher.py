@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Launcher Tests
+Checks worker sizing and the uvicorn settings read from the environment
+"""
+
+import importlib.util
+
+import pytest
+import uvicorn
+
+from app import launcher
+
+def test_workers_default_to_one(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert launcher.server_options()["workers"] == 1
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert launcher.server_options()["workers"] == 3
+    assert launcher.server_options(workers=2)["workers"] == 2
+
+def test_auto_workers_follow_usable_cpus(monkeypatch):
+    monkeypatch.setattr(launcher, "usable_cpus", lambda: 6)
+    for value in ("auto", "AUTO", " auto "):
+        monkeypatch.setenv("WEB_CONCURRENCY", value)
+        assert launcher.default_workers() == 6
+        assert launcher.server_options()["workers"] == 6
+    assert launcher.parse_workers("auto") == 6
+    assert launcher.parse_workers("2") == 2
+    with pytest.raises(ValueError):
+        launcher.parse_workers("many")
+
+def test_usable_cpus_respects_affinity(monkeypatch):
+    monkeypatch.setattr(launcher.os, "sched_getaffinity", lambda pid: {0, 2}, raising=False)
+    assert launcher.usable_cpus() == 2
+
+def test_tuning_from_environment(monkeypatch):
+    monkeypatch.setenv("KEEP_ALIVE_SECONDS", "90")
+    monkeypatch.setenv("BACKLOG", "4096")
+    monkeypatch.setenv("GRACEFUL_TIMEOUT_SECONDS", "15")
+    monkeypatch.setenv("LIMIT_CONCURRENCY", "500")
+    monkeypatch.delenv("MAX_REQUESTS_PER_WORKER", raising=False)
+    options = launcher.server_options(workers=1)
+    assert options["timeout_keep_alive"] == 90
+    assert options["backlog"] == 4096
+    assert options["timeout_graceful_shutdown"] == 15
+    assert options["limit_concurrency"] == 500
+    assert options["limit_max_requests"] is None
+    assert options["access_log"] is False
+
+def test_fast_loop_and_parser_only_when_installed(monkeypatch):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+    options = launcher.server_options(workers=1)
+    assert (options["loop"], options["http"]) == ("asyncio", "h11")
+    # Every option is accepted by uvicorn
+    config = uvicorn.Config("app.main:app", **options)
+    assert config.workers == 1
+
+def test_refuses_several_workers_with_per_process_state(monkeypatch):
+    monkeypatch.setattr(launcher, "Multiprocess", lambda *args, **kwargs: pytest.fail("should not start"))
+    monkeypatch.delenv("STT_WORKERS", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_STORE", raising=False)
+    with pytest.raises(SystemExit, match="STT_WORKERS>0.*RATE_LIMIT_STORE=memory"):
+        launcher.run(workers=2, port=0)
+
+    monkeypatch.setenv("STT_WORKERS", "0")
+    monkeypatch.setenv("RATE_LIMIT_STORE", "mongo")
+    monkeypatch.setenv("OTP_STORE", "mongo")
+    assert launcher.multi_worker_problems() == []
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Logging Tests
+Checks JSON output, request correlation IDs, per-request sampling and
+that OTP codes stay out of the logs
+"""
+
+import asyncio
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.otp_service import OTPService
+from app.services.otp_store import MemoryOTPStore
+from app.utils.log import JSONFormatter, RequestContextFilter, RequestContextMiddleware
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(RequestContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+def capture(logger_name: str) -> ListHandler:
+    handler = ListHandler()
+    logger = logging.getLogger(logger_name)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+def make_client(sample_rate: float):
+    logger = logging.getLogger("test.requests")
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        logger.info("working", extra={"step": 1})
+        logger.warning("slow")
+        return {}
+
+    app.add_middleware(RequestContextMiddleware, sample_rate=sample_rate)
+    return TestClient(app)
+
+def test_request_id_is_logged_and_echoed():
+    handler = capture("test.requests")
+    client = make_client(sample_rate=1.0)
+    response = client.get("/work", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123"
+    generated = client.get("/work", headers={"X-Request-ID": "bad id\n"}).headers["x-request-id"]
+    assert generated != "bad id\n" and len(generated) == 32
+
+    entry = json.loads(JSONFormatter().format(handler.records[0]))
+    assert entry["message"] == "working"
+    assert entry["request_id"] == "abc-123"
+    assert entry["step"] == 1
+    assert handler.records[2].request_id == generated
+
+def test_unsampled_requests_keep_only_warnings():
+    handler = capture("test.requests")
+    handler.records.clear()
+    make_client(sample_rate=0.0).get("/work")
+    assert [record.levelname for record in handler.records] == ["WARNING"]
+
+def test_otp_code_is_not_logged():
+    handler = capture("app.services.otp_service")
+    service = OTPService(MemoryOTPStore())
+    code = asyncio.run(service.create_otp("user@example.com", "login"))
+    formatted = [JSONFormatter().format(record) for record in handler.records]
+    assert formatted and not any(code in line for line in formatted)
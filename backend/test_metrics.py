@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Metrics Tests
+Checks the Prometheus exposition, per-route latency labels and the
+Mongo, SMTP and bcrypt timings
+"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.metrics import Histogram, MongoCommandTimer, mongo_command_seconds, registry
+from app.utils.password_hasher import PasswordHasher
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of one series in the exposition text"""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    raise AssertionError(f"{name} {labels} not found")
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("demo_seconds", "Demo", ("kind",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(seconds, "a")
+    text = "\n".join(histogram.render())
+    assert sample(text, "demo_seconds_bucket", kind="a", le="0.1") == 2
+    assert sample(text, "demo_seconds_bucket", kind="a", le="1") == 3
+    assert sample(text, "demo_seconds_bucket", kind="a", le="+Inf") == 4
+    assert sample(text, "demo_seconds_count", kind="a") == 4
+    assert sample(text, "demo_seconds_sum", kind="a") == 3.65
+
+def test_routes_are_labelled_by_template():
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/api/invoices/abc", headers={"Authorization": "Bearer nope"})
+    client.get("/no/such/page")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "http_request_duration_seconds_count", route="/health", status="200") >= 1
+    assert sample(text, "http_request_duration_seconds_count",
+                  route="/api/invoices/{invoice_id}", status="401") >= 1
+    assert sample(text, "http_request_duration_seconds_count", route="unmatched", status="404") >= 1
+    # Only the /metrics request itself is in flight while rendering
+    assert sample(text, "http_requests_in_flight") == 1
+
+def test_mongo_commands_are_timed_per_collection():
+    timer = MongoCommandTimer()
+    before = sum(1 for _ in registry.render().splitlines())
+    for request_id, (command, outcome) in enumerate([({"find": "users"}, "ok"), ({"insert": "otp_codes"}, "error")]):
+        name = next(iter(command))
+        timer.started(SimpleNamespace(command=command, command_name=name, connection_id=("db", 1),
+                                      request_id=request_id))
+        finish = timer.succeeded if outcome == "ok" else timer.failed
+        finish(SimpleNamespace(command_name=name, connection_id=("db", 1), request_id=request_id,
+                               duration_micros=1500))
+    text = "\n".join(mongo_command_seconds.render())
+    assert sample(text, "mongodb_command_duration_seconds_bucket",
+                  command="find", collection="users", outcome="ok", le="0.0025") >= 1
+    assert sample(text, "mongodb_command_duration_seconds_count",
+                  command="insert", collection="otp_codes", outcome="error") >= 1
+    assert len(registry.render().splitlines()) > before
+
+def test_bcrypt_time_is_recorded():
+    hasher = PasswordHasher(rounds=4, pool_size=1)
+    asyncio.run(hasher.hash("secret"))
+    hasher.shutdown()
+    text = registry.render()
+    assert sample(text, "bcrypt_duration_seconds_count", operation="hash") >= 1
+    assert sample(text, "bcrypt_queue_wait_seconds_count", operation="hash") >= 1
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Password Hasher Tests
+Checks hashing on the thread pool, cost-factor upgrades on login, the
+pending-job bound and that the global hasher survives an app restart
+"""
+
+import asyncio
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.user import UserLogin
+from app.services.user_service import UserService
+from app.utils.password_hasher import HashQueueFull, PasswordHasher
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(rounds=4, pool_size=2)
+
+    async def run():
+        hashed = await hasher.hash("correct horse")
+        return hashed, await hasher.verify("correct horse", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        hashed, good, bad = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert hashed.startswith("$2b$04$")
+    assert good is True and bad is False
+
+def test_hasher_works_again_after_shutdown():
+    hasher = PasswordHasher(rounds=4, pool_size=1)
+    for _ in range(2):
+        # A new event loop each time, as with consecutive app lifespans
+        assert asyncio.run(hasher.hash("secret")).startswith("$2b$04$")
+        hasher.shutdown()
+
+def test_needs_rehash():
+    hasher = PasswordHasher(rounds=5)
+    assert hasher.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode())
+    assert not hasher.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=5)).decode())
+    assert hasher.needs_rehash("not-a-bcrypt-hash")
+
+def test_full_queue_is_rejected():
+    hasher = PasswordHasher(rounds=4, pool_size=1, max_pending=1)
+
+    async def run():
+        return await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert first.startswith("$2b$04$")
+    assert isinstance(second, HashQueueFull)
+    assert hasher.queue_depth == 0
+
+def test_login_upgrades_old_cost_factor():
+    pytest.importorskip("mongomock")
+    from mongo_standin import open_test_database
+
+    async def run():
+        async with open_test_database() as db:
+            old_hash = bcrypt.hashpw(b"secret-pw", bcrypt.gensalt(rounds=4)).decode()
+            await db.users.insert_one({"email": "old@example.com", "password_hash": old_hash,
+                                       "is_verified": True, "created_at": None})
+            service = UserService(db)
+            service.hasher = PasswordHasher(rounds=5, pool_size=1)
+            try:
+                result = await service.authenticate_user(UserLogin(email="old@example.com", password="secret-pw"))
+                stored = (await db.users.find_one({"email": "old@example.com"}))["password_hash"]
+                # The upgraded hash still verifies
+                again = await service.authenticate_user(UserLogin(email="old@example.com", password="secret-pw"))
+            finally:
+                service.hasher.shutdown()
+            return result, stored, again
+
+    result, stored, again = asyncio.run(run())
+    assert result["success"] and again["success"]
+    assert stored.startswith("$2b$05$")
+
+def test_register_works_after_an_app_restart(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    from mongo_standin import _AsyncDatabase
+    from app import main
+    from app.routes import transcription
+
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    monkeypatch.setattr(transcription.transcription_pool, "worker_count", 0)
+    monkeypatch.setattr(main.password_hasher, "rounds", 4)
+    statuses = []
+    for attempt in range(2):
+        main.app.state.database = _AsyncDatabase(mongomock.MongoClient()["voiceinvoice_test"])
+        try:
+            with TestClient(main.app) as client:
+                response = client.post("/api/users/register",
+                                       json={"email": f"restart{attempt}@example.com", "password": "secret-pw"})
+                statuses.append(response.status_code)
+        finally:
+            del main.app.state.database
+    assert statuses == [200, 200]
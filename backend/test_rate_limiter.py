@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+OTP Rate Limiter Tests
+Checks the token bucket on every backend and that rejected send-otp
+requests never reach the OTP service. Set MONGODB_TEST_URL to run the
+Mongo backend against a real server; otherwise mongomock is used.
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies import rate_limit
+from app.models.otp import OTPRequest
+from app.services import rate_limiter
+from app.services.rate_limiter import MemoryRateLimitBackend, MongoRateLimitBackend, RateLimiter
+from mongo_standin import open_test_database
+
+def run_with_backend(name, scenario, monkeypatch=None):
+    async def run():
+        if name == "memory":
+            return await scenario(MemoryRateLimitBackend())
+        if name == "redis":
+            fakeredis = pytest.importorskip("fakeredis")
+            pytest.importorskip("lupa")
+            monkeypatch.setattr(rate_limiter.aioredis, "from_url",
+                                lambda url, **kwargs: fakeredis.FakeAsyncRedis(**kwargs))
+            return await scenario(rate_limiter.RedisRateLimitBackend("redis://fake"))
+        if not os.getenv("MONGODB_TEST_URL"):
+            pytest.importorskip("mongomock")
+        async with open_test_database() as db:
+            return await scenario(MongoRateLimitBackend(db.rate_limits))
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("name", ["memory", "mongo", "redis"])
+def test_bucket_allows_capacity_then_rejects(name, monkeypatch):
+    async def scenario(backend):
+        results = [await backend.take("send-otp:email:a@example.com", 3, 3 / 900) for _ in range(5)]
+        other = await backend.take("send-otp:email:b@example.com", 3, 3 / 900)
+        return results, other
+
+    results, other = run_with_backend(name, scenario, monkeypatch)
+    assert results[:3] == [0.0, 0.0, 0.0]
+    # One token comes back every 300 seconds
+    assert all(290 < retry_after <= 300 for retry_after in results[3:])
+    assert other == 0.0
+
+def test_bucket_refills_over_time():
+    async def scenario(backend):
+        first = await backend.take("k", 1, 50.0)
+        rejected = await backend.take("k", 1, 50.0)
+        await asyncio.sleep(0.05)
+        return first, rejected, await backend.take("k", 1, 50.0)
+
+    first, rejected, refilled = run_with_backend("memory", scenario)
+    assert first == 0.0 and rejected > 0 and refilled == 0.0
+
+def test_rejected_requests_skip_the_endpoint(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_SEND_OTP_EMAIL", "2/900")
+    monkeypatch.setenv("RATE_LIMIT_SEND_OTP_IP", "4/900")
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    calls = []
+    app = FastAPI()
+    app.state.services = SimpleNamespace(rate_limiter=limiter)
+
+    # Same dependency the OTP routes use
+    @app.post("/send-otp", dependencies=[Depends(rate_limit("send-otp"))])
+    async def send_otp(request: OTPRequest):
+        calls.append(request.email)
+        return {"success": True}
+
+    client = TestClient(app)
+    statuses = [
+        client.post("/send-otp", json={"email": email, "purpose": "login"}).status_code
+        for email in ["a@example.com", "A@example.com", "a@example.com", "b@example.com", "c@example.com"]
+    ]
+    # Third hit on the same (case-insensitive) email; rejected requests still spend IP tokens
+    assert statuses == [200, 200, 429, 200, 429]
+    assert calls == ["a@example.com", "A@example.com", "b@example.com"]
+    response = client.post("/send-otp", json={"email": "d@example.com", "purpose": "login"})
+    assert int(response.headers["Retry-After"]) > 0
+    assert limiter.rejected_count == 3
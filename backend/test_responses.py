@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Tests
+Checks that the FAST_JSON path returns the same JSON as FastAPI's default
+validation and encoding, and encodes ObjectIds and datetimes
+"""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# FAST_JSON needs orjson, which is optional
+orjson = pytest.importorskip("orjson")
+
+from app.models.invoice import Invoice, InvoiceListResponse
+from app.utils import responses
+from app.utils.responses import FastJSONResponse, dump_trusted, model_body, respond
+
+CREATED = datetime(2025, 3, 4, 5, 6, 7, 891011)
+
+def invoice_doc(i: int) -> dict:
+    """An invoice as InvoiceService returns it"""
+    return {
+        "id": f"65f0000000000000000000{i:02d}", "user_id": "owner@example.com", "invoice_number": f"INV-{i}",
+        "date": "2025-03-04", "due_date": "2025-04-03", "client": "Acme Corp", "status": "sent",
+        "items": [{"description": "Consulting", "quantity": 2.0, "rate": 125.5, "amount": 251.0}],
+        "tax_rate": 10.0, "subtotal": 251.0, "tax_amount": 25.1, "total": 276.1,
+        "created_at": CREATED, "updated_at": CREATED,
+    }
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/invoices", response_model=InvoiceListResponse)
+    async def list_invoices():
+        page = {"invoices": [invoice_doc(i) for i in range(3)], "next_cursor": "abc",
+                "has_more": True, "limit": 3}
+        return respond(page, InvoiceListResponse)
+
+    @app.get("/invoice")
+    async def get_invoice():
+        return respond({"success": True, "invoice": model_body(Invoice, invoice_doc(0))})
+
+    return TestClient(app)
+
+@pytest.mark.parametrize("path", ["/invoices", "/invoice"])
+def test_fast_path_matches_default(monkeypatch, path):
+    client = make_client()
+    default = client.get(path)
+    monkeypatch.setattr(responses, "FAST_JSON", True)
+    fast = client.get(path)
+    assert fast.status_code == default.status_code == 200
+    assert fast.json() == default.json()
+    assert "dueDate" in fast.text and "due_date" not in fast.text
+
+def test_dump_trusted_fills_defaults_and_drops_extras():
+    doc = invoice_doc(1)
+    del doc["tax_amount"]
+    doc["client_lower"] = "acme corp"
+    body = dump_trusted(Invoice, doc)
+    assert body["taxAmount"] is None and body["notes"] is None
+    assert "clientLower" not in body and "client_lower" not in body
+    assert body["items"][0] == {"description": "Consulting", "quantity": 2.0, "rate": 125.5, "amount": 251.0}
+
+def test_encodes_object_ids_and_datetimes():
+    object_id = ObjectId()
+    body = FastJSONResponse({"_id": object_id, "created_at": CREATED, 1: "non-string key"}).body
+    assert orjson.loads(body) == {"_id": str(object_id), "created_at": CREATED.isoformat(), "1": "non-string key"}
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
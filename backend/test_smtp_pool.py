@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SMTP Connection Pool Tests
+Runs the pooled transport against a local aiosmtpd stand-in server
+"""
+
+import asyncio
+import smtplib
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+class RecordingHandler:
+    """Collects delivered messages and the session each arrived on"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 Message accepted for delivery"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+def make_pool(controller, size=2) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        host=controller.hostname,
+        port=controller.port,
+        use_tls=False,
+        size=size
+    )
+
+def make_message(to_email: str) -> MIMEText:
+    message = MIMEText("Your code is 123456")
+    message["Subject"] = "Verification Code"
+    message["From"] = "VoiceInvoice Team <noreply@voiceinvoice.test>"
+    message["To"] = to_email
+    return message
+
+def test_connections_are_reused(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, size=2)
+
+    async def run():
+        await asyncio.gather(*[
+            pool.send_message(make_message(f"user{i}@example.com")) for i in range(20)
+        ])
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert len(handler.messages) == 20
+    assert pool.connections_opened <= 2
+    assert len(handler.sessions) <= 2
+    assert handler.messages[0].mail_from == "noreply@voiceinvoice.test"
+
+def test_reconnects_after_server_drop():
+    handler = RecordingHandler()
+    first = Controller(handler, hostname="127.0.0.1", port=free_port())
+    first.start()
+    pool = make_pool(first, size=1)
+    replacement = Controller(handler, hostname="127.0.0.1", port=first.port)
+
+    async def run():
+        await pool.send_message(make_message("first@example.com"))
+        # Replace the server so the pooled connection goes stale
+        first.stop()
+        replacement.start()
+        await pool.send_message(make_message("second@example.com"))
+        await pool.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        replacement.stop()
+
+    assert [m.rcpt_tos for m in handler.messages] == [["first@example.com"], ["second@example.com"]]
+    assert pool.connections_opened == 2
+
+class RejectingHandler(RecordingHandler):
+    """Refuses every message with a permanent error"""
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "550 Mailbox unavailable"
+
+def test_rejection_is_raised_without_resending():
+    handler = RejectingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    pool = make_pool(controller, size=1)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(smtplib.SMTPDataError) as excinfo:
+                await pool.send_message(make_message("nobody@example.com"))
+            assert excinfo.value.smtp_code == 550
+        await pool.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        controller.stop()
+
+    # One DATA per send, and the connection stays pooled after a rejection
+    assert len(handler.messages) == 2
+    assert pool.connections_opened == 1
+
+def test_probe_reads_greeting_without_sending(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+    asyncio.run(pool.probe(timeout=2))
+    assert pool.connections_opened == 0
+    assert handler.messages == []
+
+    unreachable = SMTPConnectionPool(host="127.0.0.1", port=free_port(), use_tls=False)
+    with pytest.raises(OSError):
+        asyncio.run(unreachable.probe(timeout=2))
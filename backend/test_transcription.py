@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Streaming Transcription Tests
+Drives the WebSocket endpoint and the worker pool with the fake speech engine,
+as a signed-in user
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.routes import transcription
+from app.services.speech_engine import FakeSpeechEngine, create_speech_engine
+from app.services.transcription_pool import TranscriptionPool
+from app.services.transcription_service import TranscriptionService
+from app.utils.security import create_token_pair
+
+ONE_SECOND = b"\x00\x00" * 16000
+TOKEN = create_token_pair("owner@example.com", "jti-1")["access_token"]
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+class SlowEngine(FakeSpeechEngine):
+    """Fake engine that takes a while per decode and counts the calls"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    def open_stream(self, sample_rate=16000):
+        stream = super().open_stream(sample_rate)
+        accept = stream.accept
+
+        def slow_accept(pcm):
+            self.calls += 1
+            time.sleep(self.delay)
+            return accept(pcm)
+
+        stream.accept = slow_accept
+        return stream
+
+@pytest.fixture
+def client_for(monkeypatch):
+    def make(engine, **options):
+        monkeypatch.setattr(transcription, "transcription_service", TranscriptionService(engine, **options))
+        app = FastAPI()
+        app.include_router(transcription.router)
+        return TestClient(app, headers=AUTH)
+    return make
+
+def test_partials_arrive_while_recording(client_for):
+    engine = FakeSpeechEngine("create an invoice for acme", words_per_second=2)
+    with client_for(engine).websocket_connect("/api/transcriptions/stream") as ws:
+        ws.send_bytes(ONE_SECOND)
+        # Decoded before the recording has ended
+        assert ws.receive_json() == {"type": "partial", "text": "create an"}
+        ws.send_bytes(ONE_SECOND)
+        assert ws.receive_json() == {"type": "partial", "text": "create an invoice for"}
+        ws.send_json({"type": "stop"})
+        final = ws.receive_json()
+
+    assert final["type"] == "final"
+    assert final["text"] == "create an invoice for acme"
+    assert final["audioSeconds"] == 2.0
+    assert final["truncated"] is False
+
+def test_slow_engine_catches_up_by_batching_frames(client_for):
+    engine = SlowEngine(delay=0.05)
+    with client_for(engine).websocket_connect("/api/transcriptions/stream") as ws:
+        for _ in range(40):
+            ws.send_bytes(ONE_SECOND[:3200])
+        ws.send_json({"type": "stop"})
+        events = []
+        while not events or events[-1]["type"] != "final":
+            events.append(ws.receive_json())
+
+    assert events[-1]["text"] == " ".join(engine.words)
+    assert events[-1]["audioSeconds"] == 4.0
+    assert engine.calls < 40
+
+def test_session_stops_at_max_duration(client_for):
+    with client_for(FakeSpeechEngine(), max_seconds=1.5).websocket_connect(
+        "/api/transcriptions/stream"
+    ) as ws:
+        ws.send_bytes(ONE_SECOND)
+        ws.send_bytes(ONE_SECOND)
+        events = []
+        while not events or events[-1]["type"] != "final":
+            events.append(ws.receive_json())
+
+    assert events[-1]["audioSeconds"] == 1.5
+    assert events[-1]["truncated"] is True
+
+@pytest.fixture
+def pool_client(monkeypatch):
+    def make(**settings):
+        # The fake engine is refused outside development
+        monkeypatch.setenv("ENVIRONMENT", "development")
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+        pool = TranscriptionPool("fake")
+        monkeypatch.setattr(transcription, "transcription_pool", pool)
+
+        @asynccontextmanager
+        async def lifespan(app):
+            await pool.start()
+            yield
+            await pool.stop()
+
+        app = FastAPI(lifespan=lifespan)
+        app.include_router(transcription.router)
+        return TestClient(app, headers=AUTH), pool
+    return make
+
+def wait_for_job(client, job_id: str) -> dict:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/transcriptions/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+def test_pool_batches_short_clips(pool_client):
+    client, pool = pool_client(STT_WORKERS=1, STT_BATCH_WINDOW_MS=200)
+    with client:
+        ids = []
+        for _ in range(6):
+            response = client.post("/api/transcriptions", content=ONE_SECOND)
+            assert response.status_code == 202
+            assert response.headers["location"] == f"/api/transcriptions/{response.json()['id']}"
+            ids.append(response.json()["id"])
+        jobs = [wait_for_job(client, job_id) for job_id in ids]
+
+    assert {job["status"] for job in jobs} == {"completed"}
+    assert jobs[0]["text"] == FakeSpeechEngine.DEFAULT_TRANSCRIPT
+    assert jobs[0]["audioSeconds"] == 1.0
+    assert pool.batch_count < 6
+
+def test_pool_rejects_when_queue_is_full(pool_client):
+    client, pool = pool_client(STT_WORKERS=1, STT_MAX_PENDING=2, STT_BATCH_WINDOW_MS=0,
+                               STT_FAKE_REALTIME_FACTOR=0.2)
+    with client:
+        statuses = [client.post("/api/transcriptions", content=ONE_SECOND * 5).status_code
+                    for _ in range(10)]
+
+    assert 503 in statuses
+    assert pool.rejected_count == statuses.count(503)
+
+def test_unknown_transcription_is_404(pool_client):
+    client, _ = pool_client(STT_WORKERS=1)
+    with client:
+        assert client.get("/api/transcriptions/missing").status_code == 404
+
+def test_jobs_are_visible_only_to_their_owner(pool_client):
+    client, _ = pool_client(STT_WORKERS=1)
+    intruder = create_token_pair("intruder@example.com", "jti-2")["access_token"]
+    with client:
+        response = client.post("/api/transcriptions", content=ONE_SECOND)
+        job_id = response.json()["id"]
+        assert "owner" not in response.json()
+        job = wait_for_job(client, job_id)
+        other = client.get(f"/api/transcriptions/{job_id}", headers={"Authorization": f"Bearer {intruder}"})
+
+    assert job["status"] == "completed" and "owner" not in job
+    assert other.status_code == 404
+
+def test_pool_start_waits_for_every_worker(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    monkeypatch.setenv("STT_WORKERS", "3")
+    pool = TranscriptionPool("fake")
+
+    async def run():
+        await pool.start()
+        try:
+            # One warm-up call per process: each blocks until all have loaded
+            return len(pool._executor._processes)
+        finally:
+            await pool.stop()
+
+    assert asyncio.run(run()) == 3
+
+def test_anonymous_requests_are_refused(client_for):
+    client = client_for(FakeSpeechEngine())
+    client.headers.clear()
+    assert client.post("/api/transcriptions", content=ONE_SECOND).status_code in (401, 403)
+    assert client.get("/api/transcriptions/missing").status_code in (401, 403)
+    for url in ("/api/transcriptions/stream", "/api/transcriptions/stream?token=not-a-jwt"):
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
+        assert closed.value.code == 1008
+
+def test_stream_accepts_token_in_query(client_for):
+    client = client_for(FakeSpeechEngine("hello", words_per_second=2))
+    client.headers.clear()
+    with client.websocket_connect(f"/api/transcriptions/stream?token={TOKEN}") as ws:
+        ws.send_json({"type": "stop"})
+        assert ws.receive_json()["type"] == "final"
+
+def test_fake_engine_only_runs_in_development(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    with pytest.raises(RuntimeError, match="ENVIRONMENT=development"):
+        create_speech_engine("fake")
+    pool = TranscriptionPool("fake")
+    with pytest.raises(RuntimeError, match="ENVIRONMENT=development"):
+        asyncio.run(pool.start())
+    assert pool._executor is None
+
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    assert isinstance(create_speech_engine("fake"), FakeSpeechEngine)
+
+def test_service_works_again_after_shutdown():
+    service = TranscriptionService(FakeSpeechEngine("hello"), threads=1)
+    for _ in range(2):
+        # A new event loop each time, as with consecutive app lifespans
+        async def run():
+            session = service.open_session()
+            await session.feed(ONE_SECOND)
+            await session.end()
+            return [event async for event in session.results()]
+
+        assert asyncio.run(run())[-1]["text"] == "hello"
+        service.shutdown()
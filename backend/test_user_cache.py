@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+User Profile Cache Tests
+Checks hits, write-through invalidation and cross-worker invalidation by
+polling. Set MONGODB_TEST_URL to run against a real server; otherwise mongomock is used.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+if not os.getenv("MONGODB_TEST_URL"):
+    pytest.importorskip("mongomock")
+
+from app.models.user import UserCreate
+from app.services.user_cache import CACHE_MISS, UserCache, UserCacheInvalidator
+from app.services.user_service import UserService
+from mongo_standin import open_test_database
+
+def run_with_service(scenario):
+    async def run():
+        async with open_test_database() as db:
+            service = UserService(db)
+            service.hasher.rounds = 4
+            service.cache = UserCache(max_size=100, ttl_seconds=60)
+            return await scenario(service, db)
+    return asyncio.run(run())
+
+def test_profile_is_cached_and_invalidated_on_writes():
+    async def scenario(service, db):
+        assert await service.get_user("new@example.com") is None
+        assert await service.get_user("new@example.com") is None
+        assert service.cache.hits == 1
+
+        # The cached "no such user" must not outlive the insert
+        await service.create_user(UserCreate(email="new@example.com", password="secret123"))
+        user = await service.get_user("new@example.com")
+        assert user["is_verified"] is False
+        assert "password_hash" not in user
+
+        await service.verify_user("new@example.com")
+        assert (await service.get_user("new@example.com"))["is_verified"] is True
+        return service.cache.stats()
+
+    stats = run_with_service(scenario)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+
+def test_read_racing_an_invalidation_is_not_cached():
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    version = cache.version
+    cache.invalidate("race@example.com")
+    cache.fill("race@example.com", {"email": "race@example.com"}, version)
+    assert cache.stats()["size"] == 0
+
+def test_entries_expire_and_size_is_bounded(monkeypatch):
+    cache = UserCache(max_size=2, ttl_seconds=30)
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        cache.fill(email, {"email": email}, cache.version)
+    assert cache.stats()["size"] == 2
+    assert cache.get("c@example.com") == {"email": "c@example.com"}
+
+    now = time.monotonic()
+    monkeypatch.setattr("app.services.user_cache.time.monotonic", lambda: now + 31)
+    assert cache.get("c@example.com") is CACHE_MISS
+    assert cache.stats()["size"] == 1
+
+def test_polling_invalidates_changes_from_other_workers():
+    async def scenario(service, db):
+        await service.create_user(UserCreate(email="poll@example.com", password="secret123"))
+        await service.get_user("poll@example.com")
+
+        invalidator = UserCacheInvalidator(db.users, service.cache)
+        invalidator.poll_interval_seconds = 0.05
+        await invalidator.start()
+        # Another worker verifies the user behind this process's back
+        await db.users.update_one(
+            {"email": "poll@example.com"},
+            {"$set": {"is_verified": True, "updated_at": datetime.utcnow()}}
+        )
+        await asyncio.sleep(0.3)
+        await invalidator.stop()
+        return invalidator.mode, await service.get_user("poll@example.com")
+
+    mode, user = run_with_service(scenario)
+    if not os.getenv("MONGODB_TEST_URL"):
+        assert mode == "polling"
+    assert user["is_verified"] is True
+
+def test_consecutive_polls_invalidate_a_change_once():
+    async def scenario(service, db):
+        await service.create_user(UserCreate(email="once@example.com", password="secret123"))
+        invalidator = UserCacheInvalidator(db.users, service.cache)
+        invalidator.poll_interval_seconds = 60
+        start = datetime.utcnow() - timedelta(seconds=1)
+        await db.users.update_one({"email": "once@example.com"}, {"$set": {"updated_at": datetime.utcnow()}})
+
+        before = service.cache.invalidations
+        last_seen, seen = await invalidator._poll_once(start, {})
+        first = service.cache.invalidations - before
+        # The next poll overlaps the first but finds nothing new
+        last_seen, seen = await invalidator._poll_once(last_seen, seen)
+        second = service.cache.invalidations - before - first
+        # A later change to the same user is picked up again
+        await db.users.update_one({"email": "once@example.com"},
+                                  {"$set": {"updated_at": datetime.utcnow() + timedelta(seconds=1)}})
+        await invalidator._poll_once(last_seen, seen)
+        third = service.cache.invalidations - before - first - second
+        return first, second, third
+
+    assert run_with_service(scenario) == (1, 0, 1)
@@ -3,6 +3,7 @@ import AuthWrapper from './pages/AuthWrapper';
 import MainAppPage from './pages/MainAppPage';
 import UseCasesPage from './pages/UseCasesPage';
 import { initializeEmailService } from './utils/emailService';
+import { logout } from './utils/authToken';
 import type { AuthState } from './types';
 import backgroundImage from './assets/3293677.png';
 
@@ -48,6 +49,7 @@ function App() {
   const handleLogout = () => {
     // Clear any stored data
     localStorage.removeItem('rememberedEmail');
+    logout();
 
     setAuthState({
       isAuthenticated: false,
@@ -66,6 +66,33 @@ export const verifyOTP = async (email: string, otp_code: string, purpose: 'login
   }
 };
 
+export interface LoginResponse {
+  success: boolean;
+  message: string;
+  access_token: string;
+  refresh_token: string;
+  token_type: string;
+  expires_in: number;
+}
+
+// Password login; returns the bearer tokens the invoice API requires
+export const loginUser = async (email: string, password: string): Promise<LoginResponse> => {
+  const response = await fetch(`${API_BASE_URL}/api/users/login`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ email, password }),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+};
+
 // Health check function
 export const checkAPIHealth = async (): Promise<boolean> => {
   try {
@@ -1,5 +1,6 @@
 import type { User } from '../types';
-import { sendOTP, verifyOTP } from './apiService';
+import { sendOTP, verifyOTP, loginUser } from './apiService';
+import { setAuthTokens } from './authToken';
 
 // Check if we should use the backend API
 const USE_BACKEND_API = import.meta.env.VITE_USE_BACKEND_API === 'true';
@@ -117,6 +118,10 @@ export const completeLogin = async (email: string, otp: string): Promise<{ succe
         // Clear pending authentication
         pendingAuth.delete(email);
 
+        // Exchange the password for the bearer tokens the invoice API requires
+        const login = await loginUser(email, pending.password);
+        setAuthTokens(login);
+
         return { success: true, user: pending.user };
       } else {
         return { success: false, error: otpResult.message };
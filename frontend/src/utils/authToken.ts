@@ -0,0 +1,83 @@
+// Bearer tokens issued by POST /api/users/login and rotated by /api/users/refresh
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+const ACCESS_TOKEN_KEY = 'accessToken';
+const REFRESH_TOKEN_KEY = 'refreshToken';
+
+export interface TokenPair {
+  access_token: string;
+  refresh_token: string;
+}
+
+// Session storage: tokens are dropped when the tab closes
+export const setAuthTokens = (tokens: TokenPair): void => {
+  sessionStorage.setItem(ACCESS_TOKEN_KEY, tokens.access_token);
+  sessionStorage.setItem(REFRESH_TOKEN_KEY, tokens.refresh_token);
+};
+
+export const getAuthToken = (): string | null => sessionStorage.getItem(ACCESS_TOKEN_KEY);
+
+export const clearAuthTokens = (): void => {
+  sessionStorage.removeItem(ACCESS_TOKEN_KEY);
+  sessionStorage.removeItem(REFRESH_TOKEN_KEY);
+};
+
+// Revokes the refresh token on the server (best effort) and forgets both tokens
+export const logout = (): void => {
+  const refreshToken = sessionStorage.getItem(REFRESH_TOKEN_KEY);
+  clearAuthTokens();
+  if (refreshToken) {
+    fetch(`${API_BASE_URL}/api/users/logout`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    }).catch(() => undefined);
+  }
+};
+
+// Concurrent 401s share one refresh; each refresh token is single use
+let refreshing: Promise<boolean> | null = null;
+
+const refreshTokens = (): Promise<boolean> => {
+  const refreshToken = sessionStorage.getItem(REFRESH_TOKEN_KEY);
+  if (!refreshToken) return Promise.resolve(false);
+  refreshing ??= (async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/users/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      });
+      if (!response.ok) {
+        clearAuthTokens();
+        return false;
+      }
+      setAuthTokens(await response.json());
+      return true;
+    } catch {
+      return false;
+    } finally {
+      refreshing = null;
+    }
+  })();
+  return refreshing;
+};
+
+/**
+ * fetch with the current access token; on 401 refreshes the pair once and retries
+ */
+export const authFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const send = () => {
+    const headers = new Headers(init.headers);
+    const token = getAuthToken();
+    if (token) headers.set('Authorization', `Bearer ${token}`);
+    return fetch(url, { ...init, headers });
+  };
+
+  const response = await send();
+  if (response.status === 401 && await refreshTokens()) {
+    return send();
+  }
+  return response;
+};
@@ -1,4 +1,5 @@
 import type { InvoiceData, InvoiceItem } from '../types';
+import { authFetch } from './authToken';
 
 // Check if we should use the backend API
 const USE_BACKEND_API = import.meta.env.VITE_USE_BACKEND_API === 'true';
@@ -51,6 +52,18 @@ export interface InvoiceListResponse {
   totalPages: number;
 }
 
+// One page as returned by GET /api/invoices (keyset pagination)
+interface InvoicePage {
+  invoices: Invoice[];
+  nextCursor: string | null;
+  hasMore: boolean;
+  limit: number;
+  total?: number;
+}
+
+// Cursor for each page already visited, per filter combination
+const pageCursors = new Map<string, (string | null)[]>();
+
 // Invoice-related API calls
 export const invoiceService = {
   /**
@@ -59,12 +72,10 @@ export const invoiceService = {
   createInvoice: async (invoiceData: Omit<Invoice, 'id' | 'createdAt' | 'updatedAt'>): Promise<{ success: boolean; invoice?: Invoice; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices`, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
           body: JSON.stringify(invoiceData),
         });
@@ -105,12 +116,10 @@ export const invoiceService = {
   getInvoice: async (invoiceId: string): Promise<{ success: boolean; invoice?: Invoice; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
           method: 'GET',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
         });
 
@@ -177,10 +186,18 @@ export const invoiceService = {
   getInvoices: async (filters?: InvoiceFilters): Promise<{ success: boolean; data?: InvoiceListResponse; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const queryParams = new URLSearchParams();
-        
-        if (filters) {
-          Object.entries(filters).forEach(([key, value]) => {
+        // The API pages with cursors; map page numbers onto the cursors seen so far
+        const { page = 1, ...query } = filters || {};
+        const limit = query.limit || 10;
+        const cacheKey = JSON.stringify(query);
+        const cursors = pageCursors.get(cacheKey) || [null];
+        pageCursors.set(cacheKey, cursors);
+
+        let pageIndex = Math.min(page, cursors.length) - 1;
+        for (;;) {
+          const isTarget = pageIndex === page - 1;
+          const queryParams = new URLSearchParams();
+          Object.entries({ ...query, limit, includeTotal: isTarget }).forEach(([key, value]) => {
             if (value !== undefined && value !== null) {
               if (Array.isArray(value)) {
                 value.forEach(v => queryParams.append(key, v));
@@ -189,23 +206,34 @@ export const invoiceService = {
               }
             }
           });
-        }
+          const cursor = cursors[pageIndex];
+          if (cursor) queryParams.append('cursor', cursor);
+
+          const response = await authFetch(`${API_BASE_URL}/api/invoices?${queryParams}`, {
+            method: 'GET',
+            headers: {
+              'Content-Type': 'application/json',
+            },
+          });
 
-        const response = await fetch(`${API_BASE_URL}/api/invoices?${queryParams}`, {
-          method: 'GET',
-          headers: {
-            'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
-          },
-        });
+          if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+          }
 
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
+          const result: InvoicePage = await response.json();
+          if (result.nextCursor) cursors[pageIndex + 1] = result.nextCursor;
+          if (isTarget || !result.hasMore) {
+            const total = result.total ?? pageIndex * limit + result.invoices.length;
+            const data: InvoiceListResponse = {
+              invoices: result.invoices,
+              total,
+              page: pageIndex + 1,
+              totalPages: Math.max(1, Math.ceil(total / limit))
+            };
+            return { success: true, data };
+          }
+          pageIndex++;
         }
-
-        const data = await response.json();
-        return { success: true, data };
       } catch (error) {
         console.error('Get invoices failed:', error);
         return { 
@@ -281,12 +309,10 @@ export const invoiceService = {
   updateInvoice: async (invoiceId: string, updates: Partial<Invoice>): Promise<{ success: boolean; invoice?: Invoice; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
           method: 'PUT',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
           body: JSON.stringify(updates),
         });
@@ -333,12 +359,10 @@ export const invoiceService = {
   deleteInvoice: async (invoiceId: string): Promise<{ success: boolean; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/${invoiceId}`, {
           method: 'DELETE',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
         });
 
@@ -370,12 +394,10 @@ export const invoiceService = {
   sendInvoice: async (invoiceId: string, recipientEmail?: string): Promise<{ success: boolean; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/${invoiceId}/send`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/${invoiceId}/send`, {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
           body: JSON.stringify({ recipientEmail }),
         });
@@ -420,12 +442,8 @@ export const invoiceService = {
   generatePDF: async (invoiceId: string): Promise<{ success: boolean; pdfUrl?: string; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/${invoiceId}/pdf`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/${invoiceId}/pdf`, {
           method: 'GET',
-          headers: {
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
-          },
         });
 
         if (!response.ok) {
@@ -484,18 +502,54 @@ Status: ${invoice.invoice.status.toUpperCase()}
     }
   },
 
+  /**
+   * Download PDFs for every invoice matching the filters as one ZIP
+   */
+  exportInvoices: async (filters?: Omit<InvoiceFilters, 'page' | 'limit' | 'sortBy' | 'sortOrder'>): Promise<{ success: boolean; zipUrl?: string; error?: string }> => {
+    if (!USE_BACKEND_API) {
+      return { success: false, error: 'Export requires the backend API' };
+    }
+    try {
+      const queryParams = new URLSearchParams();
+      Object.entries(filters || {}).forEach(([key, value]) => {
+        if (value !== undefined && value !== null) {
+          if (Array.isArray(value)) {
+            value.forEach(v => queryParams.append(key, v));
+          } else {
+            queryParams.append(key, value.toString());
+          }
+        }
+      });
+
+      const response = await authFetch(`${API_BASE_URL}/api/invoices/export?${queryParams}`, {
+        method: 'GET',
+      });
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const zipBlob = await response.blob();
+      return { success: true, zipUrl: URL.createObjectURL(zipBlob) };
+    } catch (error) {
+      console.error('Export invoices failed:', error);
+      return {
+        success: false,
+        error: 'Failed to export invoices. Please try again.'
+      };
+    }
+  },
+
   /**
    * Get invoice statistics
    */
   getInvoiceStats: async (): Promise<{ success: boolean; stats?: any; error?: string }> => {
     if (USE_BACKEND_API) {
       try {
-        const response = await fetch(`${API_BASE_URL}/api/invoices/stats`, {
+        const response = await authFetch(`${API_BASE_URL}/api/invoices/stats`, {
           method: 'GET',
           headers: {
             'Content-Type': 'application/json',
-            // Add authorization header when implementing JWT
-            // 'Authorization': `Bearer ${getAuthToken()}`
           },
         });
 
@@ -551,6 +605,7 @@ export const {
   sendInvoice,
   markAsPaid,
   generatePDF,
+  exportInvoices,
   getInvoiceStats
 } = invoiceService;
 
@@ -1,3 +1,5 @@
+import { getAuthToken } from './authToken';
+
 // Mock voice transcription function
 export const mockTranscribeVoice = async (_audioBlob: Blob): Promise<string> => {
   // Simulate processing delay
@@ -16,6 +18,72 @@ Total Due: $850`;
   return mockInvoiceText;
 };
 
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const STREAM_SAMPLE_RATE = 16000;
+
+export interface TranscriptionStream {
+  // Stop recording and resolve with the final transcript
+  stop: () => Promise<string>;
+}
+
+// Stream microphone audio to the backend and receive partial transcripts while recording
+export const streamTranscription = (
+  mediaStream: MediaStream,
+  onPartial: (text: string) => void
+): TranscriptionStream => {
+  // WebSockets cannot carry an Authorization header, so the token goes in the query
+  const params = new URLSearchParams({
+    sampleRate: String(STREAM_SAMPLE_RATE),
+    token: getAuthToken() ?? '',
+  });
+  const socket = new WebSocket(
+    `${API_BASE_URL.replace(/^http/, 'ws')}/api/transcriptions/stream?${params}`
+  );
+  socket.binaryType = 'arraybuffer';
+  // Audio captured before the socket opens is sent once it does
+  const pending: ArrayBuffer[] = [];
+  socket.onopen = () => pending.splice(0).forEach((frame) => socket.send(frame));
+
+  // The browser resamples to 16 kHz; frames are sent as 16-bit PCM
+  const audioContext = new AudioContext({ sampleRate: STREAM_SAMPLE_RATE });
+  const source = audioContext.createMediaStreamSource(mediaStream);
+  const processor = audioContext.createScriptProcessor(4096, 1, 1);
+  processor.onaudioprocess = (event) => {
+    const samples = event.inputBuffer.getChannelData(0);
+    const pcm = new Int16Array(samples.length);
+    for (let i = 0; i < samples.length; i++) {
+      const s = Math.max(-1, Math.min(1, samples[i]));
+      pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+    }
+    if (socket.readyState === WebSocket.CONNECTING) pending.push(pcm.buffer);
+    else if (socket.readyState === WebSocket.OPEN) socket.send(pcm.buffer);
+  };
+  source.connect(processor);
+  processor.connect(audioContext.destination);
+
+  const finalText = new Promise<string>((resolve, reject) => {
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type === 'partial') onPartial(event.text);
+      else if (event.type === 'final') resolve(event.text);
+      else if (event.type === 'error') reject(new Error(event.message));
+    };
+    socket.onerror = () => reject(new Error('Transcription connection failed'));
+  });
+
+  return {
+    stop: async () => {
+      processor.disconnect();
+      source.disconnect();
+      await audioContext.close();
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ type: 'stop' }));
+      }
+      return finalText;
+    },
+  };
+};
+
 // Check if browser supports media recording
 export const checkMediaRecordingSupport = (): boolean => {
   try {